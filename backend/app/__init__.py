@@ -1,6 +1,7 @@
 from flask import Flask
 from flask_cors import CORS
 import os
+import sys
 
 def create_app(config_name='default'):
     """Flask 애플리케이션 팩토리"""
@@ -16,4 +17,9 @@ def create_app(config_name='default'):
     from app.routes import api_bp
     app.register_blueprint(api_bp, url_prefix='/api')
     
+    # 보행 네트워크 그래프를 백그라운드에서 미리 로딩 (/api/ready 로 상태 확인)
+    sys.path.append(os.path.join(os.path.dirname(__file__), 'services', 'walk_graph'))
+    from walk_graph import start_warm_up
+    start_warm_up()
+    
     return app
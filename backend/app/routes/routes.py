@@ -1,22 +1,77 @@
-from flask import request, jsonify, send_file
+from flask import request, jsonify, send_file, Response
 from app.routes import api_bp
+import io
 import json
 import os
 import subprocess
-import papermill as pm
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'path_image'))
-from image_path_enhanced import generate_custom_route
+from image_path_enhanced import (
+    template_route_geojson, contour_route_geojson, contour_from_strokes,
+    extract_contour_from_image, decode_image, contour_from_image
+)
+from template_index import TEMPLATE_DIR
+
+# 경로 추천 엔진 import
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'path_reccomendation'))
+from recommend_engine import recommend_routes, save_results
+
+# 공유 보행 네트워크 그래프 import
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'walk_graph'))
+from walk_graph import readiness
+
+# 보행 네트워크 벡터 타일 import
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'tiles'))
+from vector_tiles import TILE_MIMETYPE, get_tile, valid_tile
+
+# 경로 응답 압축 인코딩 import
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'route_encoding'))
+from route_encoding import encode_route_geojson, parse_route_format, compress_body
 
 # 개인화 서비스 import
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'personalization'))
 from personalization import get_personalized_messages
+from personalized_route_generator import generate_personalized_route as build_personalized_route
+
+# 음악 생성 워커 import
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'musicgen'))
+from music import DEFAULT_SECONDS, MAX_STREAM_SECONDS, walk_prompt, tokens_for_seconds
+from music_worker import get_music_worker
+from music_library import get_music_library
+from music_loop import MOOD_FILES, get_loop_track
+from audio_files import AUDIO_MAX_AGE_S, get_audio_cache, mood_audio
 
 # 시간대별 경로 추천 서비스 import
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'services', 'personalization_duration'))
 from duration_route import generate_duration_based_route
 
+def route_response(payload, geojson_key=None, status=200):
+    """
+    경로 응답 (압축 응답 모드 협상)
+    
+    - ?format=polyline|delta: GeoJSON LineString 좌표 인코딩 (?zoom= 단순화, ?contour=1 윤곽선 포함)
+    - Accept-Encoding: br/gzip 이면 본문 압축
+    """
+    try:
+        options = parse_route_format(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if options is not None:
+        if geojson_key is None:
+            payload = encode_route_geojson(payload, **options)
+        else:
+            payload = {**payload, geojson_key: encode_route_geojson(payload[geojson_key], **options)}
+    
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    body, encoding = compress_body(body, request.accept_encodings)
+    response = Response(body, status=status, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 @api_bp.route('/health', methods=['GET'])
 def health_check():
     """헬스 체크 엔드포인트"""
@@ -25,6 +80,15 @@ def health_check():
         'message': 'Soomgil API is running'
     })
 
+@api_bp.route('/ready', methods=['GET'])
+def readiness_check():
+    """레디니스 체크 엔드포인트 (보행 네트워크 그래프 로딩 여부)"""
+    status = readiness()
+    return jsonify({
+        'status': 'ready' if status['ready'] else 'warming',
+        **status
+    }), 200 if status['ready'] else 503
+
 @api_bp.route('/generate-path', methods=['POST'])
 def generate_path():
     """경로 생성 (기존 로직 통합)"""
@@ -33,27 +97,12 @@ def generate_path():
         start_lat = data.get("lat")
         start_lon = data.get("lon")
         
-        # 1. path.ipynb 실행
-        pm.execute_notebook(
-            'backend/app/services/path_reccomendation/path.ipynb',
-            'backend/app/services/path_reccomendation/path_out.ipynb',  # 출력 노트북
-            parameters=dict(start_lat=start_lat, start_lon=start_lon)
-        )
+        # 1. 경로 추천 엔진 실행
+        result = recommend_routes(start_lat, start_lon)
+        save_results(result)
         
-        # 2. description.ipynb 실행
-        pm.execute_notebook(
-            'backend/app/services/path_description/description.ipynb',
-            'backend/app/services/path_description/description_out.ipynb',
-            parameters=dict(start_lat=start_lat, start_lon=start_lon, walk_km=walk_km, season=season)
-        )
+        return route_response(result['geojson'])
         
-        # 3. 결과 반환
-        geojson_path = "app/services/path_reccomendation/results_path.geojson"
-        if os.path.exists(geojson_path):
-            return send_file(geojson_path, mimetype="application/json")
-        else:
-            return jsonify({"error": "경로 생성 실패"}), 500
-            
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -62,7 +111,8 @@ def get_path():
     """생성된 경로 조회"""
     path = "app/services/path_reccomendation/results_path.geojson"
     if os.path.exists(path):
-        return send_file(path, mimetype="application/json")
+        with open(path, "r", encoding="utf-8") as f:
+            return route_response(json.load(f))
     else:
         return jsonify({"error": "geojson 파일 없음"}), 404
 
@@ -79,22 +129,81 @@ def get_description():
 
 @api_bp.route('/generate-music', methods=['POST'])
 def generate_music():
-    """음악 생성"""
+    """음악 생성 (상주 MusicGen 워커)"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         mood = data.get("mood", "mysterious and cinematic")
+        seconds = float(data.get("seconds", DEFAULT_SECONDS))
+        
+        prompt = walk_prompt(mood)
+        max_new_tokens = tokens_for_seconds(seconds)
+        print(f"🎵 음악 생성 요청: {prompt} ({seconds:.0f}s)")
+        
+        # 같은 프롬프트(무드 × 날씨 구간 × 계절)로 생성한 음악이 라이브러리에 있으면 바로 응답
+        library = get_music_library()
+        wav = library.get(prompt, max_new_tokens)
+        if wav is not None:
+            response = send_file(io.BytesIO(wav), mimetype="audio/wav", download_name="generated_music.wav")
+            response.headers['X-Music-Cache'] = 'hit'
+            return response
+        
+        # 상주 MusicGen 워커에 생성 요청 (모델은 워커 프로세스에서 한 번만 로딩)
+        result = get_music_worker().generate(prompt, max_new_tokens)
+        library.put(prompt, max_new_tokens, result['wav'])
+        
+        response = send_file(io.BytesIO(result['wav']), mimetype="audio/wav",
+                             download_name=os.path.basename(result['path']))
+        response.headers['X-Music-Job'] = result['job_id']
+        response.headers['X-Music-Cache'] = 'miss'
+        return response
+            
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@api_bp.route('/generate-music/stats', methods=['GET'])
+def music_stats():
+    """음악 생성 지표 (라이브러리 적중률, 워커 상태)"""
+    return jsonify({
+        'library': get_music_library().stats(),
+        'worker': get_music_worker().status(),
+    })
+
+def _stream_body(first, chunks):
+    """
+    스트리밍 응답 본문 (클라이언트 연결이 끊겨 응답이 닫히면 chunks 도 바로 닫아서
+    워커 생성 작업 취소가 GC 를 기다리지 않고 실행되도록 함)
+    """
+    try:
+        yield first
+        yield from chunks
+    finally:
+        chunks.close()
+
+@api_bp.route('/generate-music/stream', methods=['GET', 'POST'])
+def stream_music():
+    """
+    산책 길이만큼 이어서 생성하는 음악 스트리밍 (세그먼트가 생성될 때마다 WAV 본문으로 전송)
+    
+    파라미터: mood, minutes (또는 seconds)
+    """
+    try:
+        data = request.get_json(silent=True) or request.args
+        mood = data.get("mood", "mysterious and cinematic")
+        seconds = float(data.get("seconds") or float(data.get("minutes", 30)) * 60)
+        if seconds <= 0 or seconds > MAX_STREAM_SECONDS:
+            return jsonify({"error": f"길이는 0초 초과 {MAX_STREAM_SECONDS}초 이하여야 합니다"}), 400
         
-        # music.py를 mood 파라미터로 실행
-        result = subprocess.run([
-            "python", "app/services/musicgen/music.py", mood
-        ])
+        prompt = walk_prompt(mood)
+        print(f"🎵 음악 스트리밍 요청: {prompt} ({seconds:.0f}s)")
+        job_id, chunks = get_music_worker().stream(prompt, seconds)
+        # 첫 세그먼트(WAV 헤더)까지는 여기서 기다려서 실패하면 JSON 오류로 응답
+        first = next(chunks)
+        
+        response = Response(_stream_body(first, chunks), mimetype="audio/wav")
+        response.headers['X-Music-Job'] = job_id
+        response.headers['Cache-Control'] = 'no-store'
+        return response
         
-        music_path = "app/services/musicgen/generated_music.wav"
-        if os.path.exists(music_path):
-            return send_file(music_path, mimetype="audio/wav")
-        else:
-            return jsonify({"error": "음악 생성 실패"}), 500
-            
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -158,28 +267,48 @@ def generate_duration_route():
 
 @api_bp.route('/music/<mood>', methods=['GET'])
 def get_music_by_mood(mood):
-    """무드에 따른 음악 파일 제공"""
+    """
+    무드에 따른 음악 파일 제공 (ETag / If-None-Match, Range 지원)
+    
+    - format=auto|wav|m4a|mp3|ogg: 오프라인 인코딩 변형 (auto 는 있으면 m4a/mp3, 없으면 WAV)
+    - minutes (또는 seconds) 를 주면 결과 음원을 루프 확장해서 산책 길이만큼 스트리밍 (WAV)
+    """
     try:
-        # 무드에 따른 음악 파일 매핑
-        mood_mapping = {
-            '활기찬': '활기찬.wav',
-            '잔잔한': '잔잔한.wav',
-            '상쾌한': '경쾌한.wav',
-            '몽환적': '몽환적.wav'
-        }
-        
-        filename = mood_mapping.get(mood)
-        if not filename:
+        if mood not in MOOD_FILES:
             return jsonify({"error": "지원하지 않는 무드입니다"}), 400
         
-        # 현재 파일의 절대 경로를 기준으로 상대 경로 계산
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        music_path = os.path.join(current_dir, "..", "services", "musicgen", "results", filename)
-        if os.path.exists(music_path):
-            return send_file(music_path, mimetype="audio/wav")
-        else:
-            return jsonify({"error": "음악 파일을 찾을 수 없습니다"}), 404
+        seconds = request.args.get('seconds', type=float)
+        minutes = request.args.get('minutes', type=float)
+        if seconds is None and minutes is None:
+            try:
+                music_path, mimetype, _ = mood_audio(mood, request.args.get('format', 'auto'))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            except FileNotFoundError:
+                return jsonify({"error": "음악 파일을 찾을 수 없습니다"}), 404
             
+            # 메모리 캐시에서 제공 (파일이 바뀌면 다시 읽음)
+            audio = get_audio_cache().get(music_path)
+            return send_file(
+                io.BytesIO(audio.data), mimetype=mimetype, etag=audio.etag, conditional=True,
+                max_age=AUDIO_MAX_AGE_S, last_modified=audio.stamp[0] / 1e9
+            )
+        
+        try:
+            track = get_loop_track(mood, seconds if seconds is not None else minutes * 60)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        response = Response(track.chunks(), mimetype="audio/wav")
+        response.content_length = track.content_length
+        response.headers['X-Music-Duration'] = track.seconds
+        response.set_etag(track.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = AUDIO_MAX_AGE_S
+        return response.make_conditional(request, accept_ranges=True, complete_length=track.content_length)
+    
+    except HTTPException:
+        # 만족할 수 없는 Range (416) 등
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -242,45 +371,22 @@ def recommend_route():
             "highlights": ["느티나무 거리", "작은 공원", "산책로"]
         }
         
-        # 1. 경로 생성 (실제 노트북 실행)
+        # 1. 경로 생성 (경로 추천 엔진 직접 호출)
+        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        geojson_data = mock_geojson
         try:
-            print("🔧 실제 노트북으로 경로 생성")
-            
-            # 현재 작업 디렉토리를 프로젝트 루트로 변경
-            original_cwd = os.getcwd()
-            # backend/app/routes/routes.py에서 프로젝트 루트로 이동
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-            os.chdir(project_root)
-            print(f"📁 작업 디렉토리 변경: {os.getcwd()}")
+            print("🔧 경로 추천 엔진으로 경로 생성")
+            result = recommend_routes(lat, lon, walk_km=walk_km, season=season)
+            geojson_data = result['geojson']
+            print("✅ 경로 생성 완료")
             
-            # 출력 폴더 생성
-            output_dir = os.path.join(project_root, 'backend/app/services/path_reccomendation')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # IPython 보안 설정 변경
-            os.environ['IPYTHON_ALLOW_OPEN_FD'] = '1'
-            
-            # 노트북 실행
-            pm.execute_notebook(
-                'backend/app/services/path_reccomendation/path.ipynb',
-                'backend/app/services/path_reccomendation/path_out.ipynb',
-                parameters=dict(start_lat=lat, start_lon=lon, walk_km=walk_km, season=season)  # 계산된 거리와 현재 계절 사용
-            )
-            
-            # 원래 디렉토리로 복원
-            os.chdir(original_cwd)
-            print("✅ 경로 생성 노트북 실행 완료")
+            # description.py가 읽는 poi_tree_list.json 저장
+            save_results(result)
             
             # 2. 경로 설명 생성 (description.py 실행)
             try:
                 print("📝 description.py로 경로 설명 생성")
                 
-                # 현재 작업 디렉토리를 프로젝트 루트로 변경
-                original_cwd = os.getcwd()
-                project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-                os.chdir(project_root)
-                print(f"📁 작업 디렉토리 변경: {os.getcwd()}")
-                
                 # 출력 폴더 생성
                 output_dir = os.path.join(project_root, 'backend/app/services/path_description')
                 os.makedirs(output_dir, exist_ok=True)
@@ -291,8 +397,6 @@ def recommend_route():
                     'backend/app/services/path_description/description.py'
                 ], check=True, cwd=project_root, env=dict(os.environ, PROJECT_ROOT=project_root))
                 
-                # 원래 디렉토리로 복원
-                os.chdir(original_cwd)
                 print("✅ 경로 설명 생성 완료")
                 
             except Exception as e:
@@ -300,26 +404,11 @@ def recommend_route():
                 print("🔄 Mock 설명으로 폴백")
             
         except Exception as e:
-            print(f"❌ 경로 생성 노트북 실행 실패: {e}")
+            print(f"❌ 경로 생성 실패: {e}")
             print("🔄 Mock 데이터로 폴백")
         
-
-        
-        # 3. 실제 결과 파일 읽기
+        # 설명 파일 읽기
         try:
-            print("📖 실제 결과 파일 읽기")
-            
-            # GeoJSON 파일 읽기
-            geojson_path = os.path.join(project_root, "backend/app/services/path_reccomendation/results_path.geojson")
-            if os.path.exists(geojson_path):
-                with open(geojson_path, 'r', encoding='utf-8') as f:
-                    geojson_data = json.load(f)
-                print("✅ GeoJSON 파일 읽기 완료")
-            else:
-                print(f"⚠️ GeoJSON 파일 없음: {geojson_path}")
-                geojson_data = mock_geojson
-            
-            # 설명 파일 읽기
             desc_json = os.path.join(project_root, "backend/app/services/path_description/description_results.json")
             if os.path.exists(desc_json):
                 with open(desc_json, 'r', encoding='utf-8') as f:
@@ -331,23 +420,37 @@ def recommend_route():
                 
         except Exception as e:
             print(f"❌ 파일 읽기 실패: {e}")
-            geojson_data = mock_geojson
             description_data = mock_description
         
         # 3. 결과 반환
         print("✅ 실제/폴백 데이터 반환")
         
-        return jsonify({
+        return route_response({
             'route_id': f"route_{int(lat*1000)}_{int(lon*1000)}",
             'geojson': geojson_data,
             'description': description_data,
             'estimated_duration': duration
-        })
+        }, 'geojson')
             
     except Exception as e:
         print(f"❌ 전체 에러: {e}")
         return jsonify({"error": str(e)}), 500
 
+@api_bp.route('/tiles/<int:z>/<int:x>/<int:y>.mvt', methods=['GET'])
+def vector_tile(z, x, y):
+    """보행 네트워크 벡터 타일 (edges: 유형/수목/도로명, nodes: osmid)"""
+    if not valid_tile(z, x, y):
+        return jsonify({"error": "지원하지 않는 타일 좌표입니다"}), 404
+    try:
+        tile, version = get_tile(z, x, y)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    
+    response = Response(tile, status=200 if tile else 204, mimetype=TILE_MIMETYPE)
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    response.set_etag(f"{version}-{z}-{x}-{y}")
+    return response.make_conditional(request)
+
 @api_bp.route('/statistics', methods=['GET'])
 def get_statistics():
     """시스템 통계 정보"""
@@ -365,92 +468,58 @@ def get_statistics():
 
 @api_bp.route('/upload', methods=['POST'])
 def upload_image():
-    """이미지 업로드 및 커스텀 경로 생성"""
+    """이미지 업로드 및 커스텀 경로 생성 (template 지정 시 미리 계산한 템플릿 경로 반환)"""
     try:
-        if 'file' not in request.files:
-            return jsonify({"error": "파일이 없습니다"}), 400
-        
-        file = request.files['file']
-        if file.filename == '':
-            return jsonify({"error": "파일이 선택되지 않았습니다"}), 400
-        
-        # 파일 저장
-        filename = secure_filename(file.filename)
-        upload_dir = os.path.join(os.path.dirname(__file__), '..', 'services', 'path_image', 'uploads')
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        file_path = os.path.join(upload_dir, filename)
-        file.save(file_path)
-        
-        # 흰 배경 추가
-        try:
-            from PIL import Image
-            import numpy as np
-            
-            # 이미지 로드
-            img = Image.open(file_path)
+        target_len = int(request.form.get('target_len', 5000))
+        template = secure_filename(request.form.get('template', ''))
+        
+        if template:
+            # 기본 제공 템플릿: 미리 계산한 인덱스에서 바로 반환
+            geojson_data = template_route_geojson(template, target_len)
+            if geojson_data is not None:
+                print(f"⚡ 템플릿 경로 반환: {template} ({target_len}m)")
+                return route_response({
+                    'success': True,
+                    'result': geojson_data,
+                    'cached': True,
+                    'message': '커스텀 경로가 성공적으로 생성되었습니다.'
+                }, 'result')
             
-            # RGBA 모드인 경우 RGB로 변환 (흰 배경 추가)
-            if img.mode == 'RGBA':
-                # 흰 배경 이미지 생성
-                white_bg = Image.new('RGB', img.size, (255, 255, 255))
-                # 원본 이미지를 흰 배경 위에 합성
-                white_bg.paste(img, mask=img.split()[-1])  # 알파 채널을 마스크로 사용
-                img = white_bg
+            # 인덱스에 없으면 템플릿 이미지로 계산
+            file_path = os.path.join(TEMPLATE_DIR, f"{template}.png")
+            if not os.path.exists(file_path):
+                return jsonify({"error": "템플릿이 없습니다"}), 404
+            image_name = template
+            contour = extract_contour_from_image(file_path)
+        else:
+            if 'file' not in request.files:
+                return jsonify({"error": "파일이 없습니다"}), 400
             
-            # RGB로 변환 (투명도가 있는 경우)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
+            file = request.files['file']
+            if file.filename == '':
+                return jsonify({"error": "파일이 선택되지 않았습니다"}), 400
             
-            # 저장
-            img.save(file_path, 'PNG')
-            print(f"✅ 흰 배경 추가 완료: {file_path}")
+            # 디스크에 저장하지 않고 메모리에서 디코딩 (투명 배경은 흰색으로 합성)
+            image_name = os.path.splitext(secure_filename(file.filename))[0] or 'drawing'
+            try:
+                contour = contour_from_image(decode_image(file.read()))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            print(f"✅ 이미지 윤곽선 추출 완료: {image_name} ({len(contour)}개 포인트)")
             
-        except Exception as e:
-            print(f"⚠️ 흰 배경 추가 실패 (계속 진행): {e}")
-        
-        print(f"✅ 이미지 업로드 완료: {file_path}")
-        print(f"📁 파일 존재 여부: {os.path.exists(file_path)}")
-        print(f"📁 파일 크기: {os.path.getsize(file_path)} bytes")
-        
-        # 커스텀 경로 생성
+        # 커스텀 경로 생성 (같은 모양 + 목표 거리 + 그래프 버전이면 경로 캐시에서 반환)
         try:
-            # 현재 작업 디렉토리를 프로젝트 루트로 변경
-            original_cwd = os.getcwd()
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-            os.chdir(project_root)
+            geojson_data, _, cache_hit = contour_route_geojson(contour, target_len, image_name)
             
-            # path_image 시스템 실행
-            output_dir = os.path.join(project_root, 'backend/app/services/path_image/outputs')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            # 작업 디렉토리를 path_image 폴더로 변경
-            path_image_dir = os.path.join(project_root, 'backend/app/services/path_image')
-            os.chdir(path_image_dir)
-            
-            try:
-                print(f"🖼️ generate_custom_route 호출: {file_path}")
-                geojson_path = generate_custom_route(
-                    image_path=file_path,
-                    target_len=5000,  # 5km
-                    output_dir=output_dir
-                )
-            finally:
-                # 원래 디렉토리로 복원
-                os.chdir(original_cwd)
-            
-            if geojson_path and os.path.exists(geojson_path):
-                # GeoJSON 파일 읽기
-                with open(geojson_path, 'r', encoding='utf-8') as f:
-                    geojson_data = json.load(f)
-                
-                print(f"✅ 커스텀 경로 생성 완료: {geojson_path}")
+            if geojson_data['properties']['route_points'] > 0:
+                print(f"✅ 커스텀 경로 생성 완료{' (캐시)' if cache_hit else ''}")
                 
-                return jsonify({
+                return route_response({
                     'success': True,
                     'result': geojson_data,
+                    'cached': cache_hit,
                     'message': '커스텀 경로가 성공적으로 생성되었습니다.'
-                })
+                }, 'result')
             else:
                 return jsonify({"error": "경로 생성에 실패했습니다"}), 500
                 
@@ -464,6 +533,45 @@ def upload_image():
         print(f"❌ 업로드 실패: {e}")
         return jsonify({"error": f"업로드 중 오류 발생: {str(e)}"}), 500
 
+@api_bp.route('/upload-strokes', methods=['POST'])
+def upload_strokes():
+    """
+    캔버스 획(폴리라인) JSON 으로 커스텀 경로 생성 (PNG 저장/윤곽선 추출 생략)
+
+    요청: {"strokes": [[[x, y], ...], ...], "target_len": 5000, "name": "drawing"}
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        strokes = data.get('strokes') or data.get('points')
+        if not strokes:
+            return jsonify({"error": "획 좌표(strokes)가 없습니다"}), 400
+        target_len = int(data.get('target_len', 5000))
+        name = secure_filename(str(data.get('name', 'drawing'))) or 'drawing'
+        
+        try:
+            contour = contour_from_strokes(strokes)
+        except (ValueError, TypeError) as e:
+            return jsonify({"error": f"잘못된 획 좌표: {e}"}), 400
+        print(f"✅ 획 윤곽선 변환 완료: {len(contour)}개 포인트")
+        
+        geojson_data, _, cache_hit = contour_route_geojson(contour, target_len, name)
+        if geojson_data['properties']['route_points'] == 0:
+            return jsonify({"error": "경로 생성에 실패했습니다"}), 500
+        
+        print(f"✅ 커스텀 경로 생성 완료{' (캐시)' if cache_hit else ''}")
+        return route_response({
+            'success': True,
+            'result': geojson_data,
+            'cached': cache_hit,
+            'message': '커스텀 경로가 성공적으로 생성되었습니다.'
+        }, 'result')
+        
+    except Exception as e:
+        print(f"❌ 경로 생성 실패: {e}")
+        import traceback
+        print(f"상세 에러: {traceback.format_exc()}")
+        return jsonify({"error": f"경로 생성 중 오류 발생: {str(e)}"}), 500
+
 @api_bp.route('/find-destination-edge', methods=['POST'])
 def find_destination_edge():
     """목적지와 일치하는 엣지를 찾고 현재 위치에서 가장 가까운 엣지 선택"""
@@ -546,44 +654,17 @@ def generate_personalized_route():
         if not all([start_lat, start_lon, destination_lat, destination_lon, destination_name]):
             return jsonify({"error": "시작점, 목적지 좌표, 목적지명이 모두 필요합니다"}), 400
         
-        # 현재 작업 디렉토리를 프로젝트 루트로 변경
-        original_cwd = os.getcwd()
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-        os.chdir(project_root)
-        
-        # personalized_route_generator.py 실행
-        subprocess.run([
-            'python', 
-            'backend/app/services/personalization/personalized_route_generator.py'
-        ], check=True, cwd=project_root, env=dict(os.environ, 
-            START_LAT=str(start_lat),
-            START_LON=str(start_lon),
-            DEST_LAT=str(destination_lat),
-            DEST_LON=str(destination_lon),
-            DEST_NAME=destination_name
-        ))
-        
-        # 원래 디렉토리로 복원
-        os.chdir(original_cwd)
-        
-        # 결과 파일 경로
-        geojson_path = os.path.join(project_root, "backend/app/services/personalization/personalized_route.geojson")
-        description_path = os.path.join(project_root, "backend/app/services/personalization/personalized_description.json")
-        
-        if os.path.exists(geojson_path):
-            with open(geojson_path, 'r', encoding='utf-8') as f:
-                geojson_data = json.load(f)
-            
-            description_data = {}
-            if os.path.exists(description_path):
-                with open(description_path, 'r', encoding='utf-8') as f:
-                    description_data = json.load(f)
-            
-            return jsonify({
+        # 개인화 경로 생성 (공유 그래프 사용)
+        geojson_data, description_data = build_personalized_route(
+            start_lat, start_lon, destination_lat, destination_lon, destination_name
+        )
+        
+        if geojson_data:
+            return route_response({
                 'success': True,
                 'geojson': geojson_data,
-                'description': description_data.get('description', f'{destination_name}까지의 개인화된 경로입니다.')
-            })
+                'description': (description_data or {}).get('description', f'{destination_name}까지의 개인화된 경로입니다.')
+            }, 'geojson')
         else:
             return jsonify({"error": "개인화된 경로 생성에 실패했습니다"}), 500
             
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from music_loop import MOOD_FILES, RESULTS_DIR
+
+# 결과 음원 제공: 메모리 LRU 캐시(바이트 상한) + 오프라인 인코딩 압축 변형(encode_audio.py) 선택
+# (Range / If-None-Match 는 라우트에서 ETag 와 함께 send_file conditional 로 처리)
+
+ENCODED_DIR = os.environ.get('SOOMGIL_AUDIO_ENCODED_DIR', os.path.join(RESULTS_DIR, 'encoded'))
+AUDIO_CACHE_BYTES = int(float(os.environ.get('SOOMGIL_AUDIO_CACHE_MB', 64)) * 1024 * 1024)
+AUDIO_MAX_AGE_S = int(os.environ.get('SOOMGIL_AUDIO_MAX_AGE', 86400))
+
+# 형식 → (MIME, ffmpeg 인코딩 옵션)
+AUDIO_VARIANTS = {
+    'm4a': ('audio/mp4', ['-c:a', 'aac', '-b:a', '96k', '-movflags', '+faststart']),
+    'mp3': ('audio/mpeg', ['-c:a', 'libmp3lame', '-b:a', '128k']),
+    'ogg': ('audio/ogg', ['-c:a', 'libopus', '-b:a', '64k']),
+}
+# format=auto: 모든 브라우저에서 재생되는 형식 순서, 인코딩 파일이 없으면 원본 WAV
+AUTO_FORMATS = ('m4a', 'mp3')
+AUDIO_FORMATS = ('auto', 'wav') + tuple(AUDIO_VARIANTS)
+
+AudioFile = namedtuple('AudioFile', ['path', 'data', 'etag', 'stamp'])
+
+
+def encoded_path(wav_path, fmt):
+    """WAV 원본의 인코딩 변형 파일 경로"""
+    stem = os.path.splitext(os.path.basename(wav_path))[0]
+    return os.path.join(ENCODED_DIR, f"{stem}.{fmt}")
+
+
+def mood_audio(mood, fmt='auto'):
+    """
+    무드 음원 파일 선택
+
+    Returns:
+        (경로, MIME, 형식) - 원본보다 오래된 인코딩 파일은 사용하지 않음
+    Raises:
+        KeyError: 지원하지 않는 무드, ValueError: 지원하지 않는 형식, FileNotFoundError: 파일 없음
+    """
+    filename = MOOD_FILES[mood]
+    if fmt not in AUDIO_FORMATS:
+        raise ValueError(f"지원하지 않는 음악 형식: {fmt} ({', '.join(AUDIO_FORMATS)})")
+    wav_path = os.path.join(RESULTS_DIR, filename)
+    if not os.path.exists(wav_path):
+        raise FileNotFoundError(wav_path)
+
+    candidates = AUTO_FORMATS + ('wav',) if fmt == 'auto' else (fmt,)
+    for candidate in candidates:
+        if candidate == 'wav':
+            return wav_path, 'audio/wav', 'wav'
+        path = encoded_path(wav_path, candidate)
+        if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(wav_path):
+            return path, AUDIO_VARIANTS[candidate][0], candidate
+    raise FileNotFoundError(encoded_path(wav_path, fmt))
+
+
+class AudioFileCache:
+    """
+    음원 파일 메모리 캐시 (전체 바이트 수 기준 LRU)
+
+    - 요청마다 stat 으로 (mtime, 크기)를 확인해서 파일이 바뀌면 다시 읽음
+    - ETag 는 내용 해시
+    - max_file_bytes 보다 큰 파일은 캐시하지 않음 (한 파일이 캐시를 모두 밀어내지 않도록)
+    """
+
+    def __init__(self, max_bytes=AUDIO_CACHE_BYTES, max_file_bytes=None):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes if max_file_bytes is not None else max_bytes // 4
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached.stamp == stamp:
+                self._files.move_to_end(path)
+                self.hits += 1
+                return cached
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        audio = AudioFile(path, data, hashlib.blake2b(data, digest_size=12).hexdigest(), stamp)
+        with self._lock:
+            self.misses += 1
+            old = self._files.pop(path, None)
+            if old is not None:
+                self.size -= len(old.data)
+            if len(data) <= self.max_file_bytes:
+                self._files[path] = audio
+                self.size += len(data)
+                while self.size > self.max_bytes:
+                    _, evicted = self._files.popitem(last=False)
+                    self.size -= len(evicted.data)
+        return audio
+
+    def stats(self):
+        with self._lock:
+            return {
+                'files': len(self._files),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """프로세스 공용 음원 캐시"""
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None:
+            _audio_cache = AudioFileCache()
+        return _audio_cache
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+무드 음원 제공 벤치마크: 변경 전(디스크 WAV send_file) vs 현재 /api/music/<mood>
+
+로컬 HTTP 서버 두 개(변경 전 라우트만 있는 앱, 현재 앱)를 띄우고 재생 시나리오마다
+전송 바이트와 TTFB(첫 본문 바이트까지), 전체 응답 시간을 비교합니다.
+압축 변형은 encode_audio.py 로 미리 만들어 두어야 format=auto 에 반영됩니다.
+
+사용법: python bench_audio.py [무드] [반복 횟수]
+"""
+
+import http.client
+import logging
+import os
+import sys
+import threading
+import time
+from urllib.parse import quote
+from flask import Flask, send_file
+from werkzeug.serving import make_server
+from music_loop import MOOD_FILES, RESULTS_DIR
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(CURRENT_DIR, '..', '..', '..')
+
+# (이름, 쿼리, 헤더) - If-None-Match 값 '{etag}' 는 첫 응답의 ETag 로 채움
+SCENARIOS = (
+    ('first play', '', {}),
+    ('replay (If-None-Match)', '', {'If-None-Match': '{etag}'}),
+    ('range probe 0-1', '', {'Range': 'bytes=0-1'}),
+    ('seek (second half)', '', {'Range': 'bytes={half}-'}),
+)
+CURRENT_ONLY = (
+    ('format=wav', '?format=wav', {}),
+    ('30 min loop', '?minutes=30', {'Range': 'bytes=0-1048575'}),
+    ('30 min loop seek', '?minutes=30', {'Range': 'bytes=100000000-101048575'}),
+)
+
+
+def baseline_app():
+    """변경 전 라우트: 요청마다 디스크의 WAV 를 send_file"""
+    app = Flask(__name__)
+
+    @app.route('/api/music/<mood>')
+    def get_music_by_mood(mood):
+        return send_file(os.path.join(RESULTS_DIR, MOOD_FILES[mood]), mimetype="audio/wav")
+
+    return app
+
+
+def current_app():
+    sys.path.append(BACKEND_DIR)
+    from app import create_app
+    return create_app()
+
+
+def serve(app):
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch(port, path, headers):
+    """(상태, 본문 바이트, TTFB 초, 전체 초, ETag)"""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    started = time.perf_counter()
+    conn.request('GET', path, headers=headers)
+    response = conn.getresponse()
+    first = response.read(1)
+    ttfb = time.perf_counter() - started
+    rest = response.read()
+    total = time.perf_counter() - started
+    conn.close()
+    return response.status, len(first) + len(rest), ttfb, total, response.getheader('ETag')
+
+
+def run(port, path, query, headers, context, repeat):
+    headers = {key: value.format(**context) for key, value in headers.items()}
+    results = [fetch(port, path + query, headers) for _ in range(repeat)]
+    status, size = results[-1][0], results[-1][1]
+    ttfb = sorted(result[2] for result in results)[len(results) // 2]
+    total = sorted(result[3] for result in results)[len(results) // 2]
+    return status, size, ttfb, total
+
+
+def main(mood='잔잔한', repeat=20):
+    path = f"/api/music/{quote(mood)}"
+    servers = {'before': serve(baseline_app()), 'after': serve(current_app())}
+    contexts = {}
+    for name, server in servers.items():
+        _, size, _, _, etag = fetch(server.server_port, path, {})
+        contexts[name] = {'etag': etag, 'half': size // 2}
+
+    print(f"🎵 {mood}, 반복 {repeat}회 (중앙값)")
+    header = f"{'status':>7}{'bytes':>10}{'ttfb ms':>9}{'total ms':>10}"
+    print(f"{'':<26}{'before':^36}{'after':^36}")
+    print(f"{'scenario':<26}{header}{header}{'bytes':>9}")
+    for name, query, headers in SCENARIOS + CURRENT_ONLY:
+        cells = {}
+        for server_name, server in servers.items():
+            if server_name == 'before' and (name, query, headers) in CURRENT_ONLY:
+                cells[server_name] = None
+                continue
+            cells[server_name] = run(server.server_port, path, query, headers, contexts[server_name], repeat)
+        before, after = cells['before'], cells['after']
+        columns = [
+            f"{cell[0]:>7}{cell[1]:>10}{cell[2] * 1000:>9.2f}{cell[3] * 1000:>10.2f}" if cell else f"{'-':>36}"
+            for cell in (before, after)
+        ]
+        ratio = f"x{before[1] / after[1]:.1f}" if before and after and after[1] else ""
+        print(f"{name:<26}{columns[0]}{columns[1]}{ratio:>9}")
+
+    for server in servers.values():
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else '잔잔한',
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20)
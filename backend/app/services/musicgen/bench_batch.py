@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+MusicGen 배치 크기별 처리량 벤치마크 (CPU)
+
+서로 다른 프롬프트를 배치 크기 1/2/4/8 로 묶어 한 번의 generate 로 생성하고,
+CPU 시간(프로세스 전체 스레드 합) 1분당 생성 곡 수와 벽시계 기준 처리량을 비교합니다.
+워커의 마이크로 배치 크기(SOOMGIL_MUSIC_MAX_BATCH)를 정할 때 사용합니다.
+
+사용법: python bench_batch.py [토큰 수] [반복 횟수]
+"""
+
+import sys
+import time
+import torch
+from music import TOKENS_PER_SEC, generate_prompt, set_torch_threads, load_musicgen, generate_audio
+from music_worker import MUSIC_THREADS, MUSIC_INTEROP_THREADS
+
+BATCH_SIZES = (1, 2, 4, 8)
+MOODS = ("energetic and uplifting", "calm and peaceful", "fresh and bright", "dreamy and mysterious")
+WEATHERS = ("clear sky", "light rain")
+
+
+def bench_prompts(count):
+    """무드 × 날씨 조합으로 서로 다른 프롬프트 count 개"""
+    combos = [(mood, weather) for weather in WEATHERS for mood in MOODS]
+    return [
+        generate_prompt({"weather": weather, "season": "autumn", "activity": "walking", "mood": mood})
+        for mood, weather in (combos[i % len(combos)] for i in range(count))
+    ]
+
+
+def main(max_new_tokens=256, repeat=2):
+    set_torch_threads(MUSIC_THREADS, MUSIC_INTEROP_THREADS)
+    processor, model = load_musicgen(device="cpu")
+    sampling_rate = model.config.audio_encoder.sampling_rate
+
+    print(f"🖥️ torch 스레드 {torch.get_num_threads()}, 토큰 {max_new_tokens} "
+          f"(≈{max_new_tokens / TOKENS_PER_SEC:.1f}s 오디오), 반복 {repeat}")
+    # 첫 호출 오버헤드(메모리 할당 등) 제외
+    generate_audio(processor, model, bench_prompts(1), 16)
+
+    print(f"{'batch':>5} {'wall s':>8} {'cpu s':>8} {'tracks/cpu-min':>15} {'tracks/wall-min':>16} "
+          f"{'audio s/wall s':>15} {'speedup':>8}")
+    base = None
+    for batch_size in BATCH_SIZES:
+        prompts = bench_prompts(batch_size)
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        for _ in range(repeat):
+            audios = generate_audio(processor, model, prompts, max_new_tokens)
+        wall = (time.perf_counter() - wall_started) / repeat
+        cpu = (time.process_time() - cpu_started) / repeat
+        audio_s = sum(len(audio) for audio in audios) / sampling_rate
+        per_cpu_min = batch_size / cpu * 60
+        base = base or per_cpu_min
+        print(f"{batch_size:>5} {wall:>8.1f} {cpu:>8.1f} {per_cpu_min:>15.2f} {batch_size / wall * 60:>16.2f} "
+              f"{audio_s / wall:>15.2f} {per_cpu_min / base:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 256,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2)
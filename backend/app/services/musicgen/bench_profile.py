@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+MusicGen CPU 추론 프로필 벤치마크: 기존 설정 vs CPU 최적화 설정
+
+설정마다 별도 프로세스(spawn)에서 모델을 로딩하고 토큰 길이별로 생성해서
+벽시계 1초당 생성한 오디오 초(audio s / wall s)와 기존 설정 대비 배율을 출력합니다.
+
+- current: float32, torch 기본 스레드, inference_mode 없이 generate (변경 전 music.py 와 같은 방식)
+- threads: float32, 스레드 명시 + inference_mode
+- cpu-int8: threads + 디코더 Linear 동적 int8 양자화 (워커 기본 프로필)
+
+사용법: python bench_profile.py [토큰 수 ...]
+"""
+
+import multiprocessing as mp
+import queue
+import sys
+import time
+from music import MODEL_NAME, generate_prompt, set_torch_threads, load_musicgen, generate_audio
+from music_worker import MUSIC_THREADS, MUSIC_INTEROP_THREADS
+
+TOKEN_LENGTHS = (128, 256, 512, 1024)
+REPEAT = 2
+
+# (이름, 추론 프로필, 스레드 명시, inference_mode)
+CONFIGS = (
+    ('current', 'default', False, False),
+    ('threads', 'default', True, True),
+    ('cpu-int8', 'cpu-int8', True, True),
+)
+
+PROMPT = generate_prompt({
+    "weather": "clear sky", "season": "autumn", "activity": "walking", "mood": "calm and peaceful"
+})
+
+
+def _nbytes(value):
+    """state_dict 값 크기 (양자화된 Linear 는 (int8 가중치, bias) 튜플)"""
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(item) for item in value)
+    return value.element_size() * value.nelement() if hasattr(value, 'nelement') else 0
+
+
+def _decoder_mb(model):
+    return sum(_nbytes(value) for value in model.decoder.state_dict().values()) / 1e6
+
+
+def _generate_current(processor, model, prompts, max_new_tokens):
+    """변경 전 방식: inference_mode 없이 generate"""
+    inputs = processor(text=list(prompts), padding=True, return_tensors="pt").to(model.device)
+    audio_values = model.generate(**inputs, max_new_tokens=max_new_tokens)
+    return [audio.cpu().numpy().squeeze() for audio in audio_values]
+
+
+def _bench_config(config, token_lengths, repeat, results):
+    """설정 하나 (별도 프로세스: 스레드 설정은 프로세스당 한 번만 가능)"""
+    name, profile, explicit_threads, inference_mode = config
+    import torch
+    if explicit_threads:
+        set_torch_threads(MUSIC_THREADS, MUSIC_INTEROP_THREADS)
+    started = time.perf_counter()
+    processor, model = load_musicgen(MODEL_NAME, device="cpu", profile=profile)
+    load_s = time.perf_counter() - started
+    sampling_rate = model.config.audio_encoder.sampling_rate
+    generate = generate_audio if inference_mode else _generate_current
+
+    # 첫 호출 오버헤드(메모리 할당, 양자화 커널 준비 등) 제외
+    generate(processor, model, [PROMPT], 16)
+    rows = []
+    for max_new_tokens in token_lengths:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            audio = generate(processor, model, [PROMPT], max_new_tokens)[0]
+        wall = (time.perf_counter() - started) / repeat
+        rows.append((max_new_tokens, len(audio) / sampling_rate, wall))
+    results.put((name, {
+        'threads': torch.get_num_threads(),
+        'interop_threads': torch.get_num_interop_threads(),
+        'load_s': load_s,
+        'decoder_mb': _decoder_mb(model),
+        'rows': rows,
+    }))
+
+
+def main(token_lengths=TOKEN_LENGTHS, repeat=REPEAT):
+    context = mp.get_context('spawn')
+    measured = {}
+    for config in CONFIGS:
+        results = context.Queue()
+        process = context.Process(target=_bench_config, args=(config, token_lengths, repeat, results))
+        process.start()
+        while True:
+            try:
+                name, info = results.get(timeout=1.0)
+                break
+            except queue.Empty:
+                if not process.is_alive():
+                    raise SystemExit(f"❌ {config[0]} 벤치마크 실패 (exit code {process.exitcode})")
+        process.join()
+        measured[name] = info
+        print(f"✅ {name}: 스레드 {info['threads']}/{info['interop_threads']}, 로딩 {info['load_s']:.1f}s, "
+              f"디코더 {info['decoder_mb']:.0f} MB")
+
+    print(f"\n{'tokens':>6} {'audio s':>8}" + ''.join(f"{name:>26}" for name, *_ in CONFIGS))
+    print(f"{'':>6} {'':>8}" + ''.join(f"{'wall s  audio s/wall s':>26}" for _ in CONFIGS))
+    for index, max_new_tokens in enumerate(token_lengths):
+        base = measured['current']['rows'][index]
+        base_rate = base[1] / base[2]
+        cells = []
+        for name, *_ in CONFIGS:
+            _, audio_s, wall = measured[name]['rows'][index]
+            rate = audio_s / wall
+            cells.append(f"{wall:>8.1f} {rate:>6.2f} (x{rate / base_rate:.2f})")
+        print(f"{max_new_tokens:>6} {base[1]:>8.1f}" + ''.join(f"{cell:>26}" for cell in cells))
+
+
+if __name__ == '__main__':
+    main(tuple(int(arg) for arg in sys.argv[1:]) or TOKEN_LENGTHS)
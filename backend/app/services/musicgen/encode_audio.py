@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+결과 음원(results/*.wav) 압축 변형 오프라인 인코딩 (ffmpeg)
+
+AUDIO_VARIANTS 형식마다 results/encoded/<이름>.<형식> 을 만들고 원본 대비 크기를 출력합니다.
+원본보다 새 파일이 이미 있으면 건너뜁니다 (--force 로 다시 인코딩).
+ffmpeg 경로는 SOOMGIL_FFMPEG 환경변수로 지정할 수 있습니다.
+
+사용법: python encode_audio.py [형식 ...] [--force]
+"""
+
+import os
+import subprocess
+import sys
+import time
+from audio_files import AUDIO_VARIANTS, ENCODED_DIR, encoded_path
+from music_loop import MOOD_FILES, RESULTS_DIR
+
+FFMPEG = os.environ.get('SOOMGIL_FFMPEG', 'ffmpeg')
+
+
+def encode(wav_path, fmt, force=False):
+    """WAV 하나를 fmt 로 인코딩 (임시 파일에 쓴 뒤 교체). 인코딩했으면 경로, 최신이면 None"""
+    output_path = encoded_path(wav_path, fmt)
+    if not force and os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(wav_path):
+        return None
+    os.makedirs(ENCODED_DIR, exist_ok=True)
+    tmp_path = f"{output_path}.tmp.{fmt}"
+    command = [FFMPEG, '-hide_banner', '-loglevel', 'error', '-y', '-i', wav_path,
+               *AUDIO_VARIANTS[fmt][1], tmp_path]
+    subprocess.run(command, check=True)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def main(formats, force=False):
+    for fmt in formats:
+        if fmt not in AUDIO_VARIANTS:
+            raise SystemExit(f"❌ 지원하지 않는 형식: {fmt} ({', '.join(AUDIO_VARIANTS)})")
+    wav_paths = sorted({os.path.join(RESULTS_DIR, filename) for filename in MOOD_FILES.values()})
+
+    for wav_path in wav_paths:
+        wav_size = os.path.getsize(wav_path)
+        print(f"🎵 {os.path.basename(wav_path)} ({wav_size / 1e6:.2f} MB)")
+        for fmt in formats:
+            started = time.time()
+            try:
+                output_path = encode(wav_path, fmt, force)
+            except FileNotFoundError:
+                raise SystemExit(f"❌ ffmpeg 를 찾을 수 없습니다: {FFMPEG} (SOOMGIL_FFMPEG 로 경로 지정)")
+            except subprocess.CalledProcessError as e:
+                print(f"   ❌ {fmt}: 인코딩 실패 (exit code {e.returncode})")
+                continue
+            size = os.path.getsize(encoded_path(wav_path, fmt))
+            state = f"{time.time() - started:.1f}s" if output_path else "최신"
+            print(f"   ✅ {fmt:<4} {size / 1e6:6.2f} MB  (원본의 {size / wav_size:5.1%}, {state})")
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if arg != '--force']
+    main(args or list(AUDIO_VARIANTS), force='--force' in sys.argv[1:])
@@ -1,23 +1,83 @@
+#!/usr/bin/env python3
+"""
+날씨/계절/무드 기반 MusicGen 산책 음악 생성
+
+API 서버는 music_worker.py 의 상주 워커 프로세스로 이 모듈의 함수를 사용하고,
+직접 실행하면 한 곡을 생성해서 musicgen_output/ 에 저장합니다.
+
+사용법: python music.py [무드] [길이(초)]
+"""
+
 # 필요한 모듈 불러오기
+import io
+import math
 import os
+import struct
+import sys
+import threading
 import time
 import requests
 from datetime import datetime
 from dotenv import load_dotenv
-import torch
 import numpy as np
 import scipy.io.wavfile
-from transformers import AutoProcessor, MusicgenForConditionalGeneration
 
 # 환경변수 불러오기 (.env에서 OPENWEATHER_API_KEY 읽음)
 load_dotenv()
 API_KEY = os.environ.get("OPENWEATHER_API_KEY")
 BASE_URL = "http://api.openweathermap.org/data/2.5/weather"
 
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.environ.get('SOOMGIL_MUSIC_OUTPUT_DIR', os.path.join(CURRENT_DIR, 'musicgen_output'))
+MODEL_NAME = os.environ.get('SOOMGIL_MUSICGEN_MODEL', 'facebook/musicgen-small')
+# 추론 프로필: 'cpu-int8' 은 CPU 에서 디코더 Linear 레이어를 동적 int8 양자화 (GPU 에서는 무시), 'default' 는 float32
+MUSIC_PROFILES = ('default', 'cpu-int8')
+MUSIC_PROFILE = os.environ.get('SOOMGIL_MUSIC_PROFILE', 'cpu-int8')
+
+# 음악 생성 파라미터
+DEFAULT_MOOD = "energetic and uplifting"
+DEFAULT_SECONDS = 20
+MAX_TOKENS_MODEL = 1024
+# EnCodec 32kHz 프레임 레이트 (토큰 50개 = 1초, 모델 로딩 후에는 model.config 값 사용)
+TOKENS_PER_SEC = 50
+
+# 연속 생성(스트리밍): 세그먼트 길이, 다음 세그먼트 조건으로 쓰는 이전 끝부분 길이, 이음매 crossfade 길이
+SEGMENT_SECONDS = 10
+CONTEXT_SECONDS = 2
+CROSSFADE_SECONDS = 0.05
+MAX_STREAM_SECONDS = 3600
+# 스트리밍은 세그먼트마다 피크 정규화를 할 수 없어서 첫 세그먼트 기준 고정 이득 사용
+STREAM_PEAK = 0.95
+
+# 화면 무드(한글) → 프롬프트 무드
+MOOD_PROMPTS = {
+    "활기찬": "energetic and uplifting",
+    "잔잔한": "calm and peaceful",
+    "상쾌한": "fresh and bright",
+    "몽환적": "dreamy and mysterious",
+}
+
+# OpenWeather 날씨 설명 → 프롬프트 날씨 구간 (앞에서부터 키워드가 들어 있는 첫 구간, 없으면 DEFAULT_WEATHER)
+# 프롬프트 종류를 무드 × 구간 × 계절로 줄여서 생성 음악 라이브러리 적중률을 높임
+WEATHER_BUCKETS = (
+    ("stormy", ("thunder", "storm", "squall", "tornado")),
+    ("snowy", ("snow", "sleet")),
+    ("rainy", ("rain", "drizzle", "shower")),
+    ("foggy", ("mist", "fog", "haze", "smoke", "dust", "sand", "ash")),
+    ("cloudy", ("cloud", "overcast")),
+    ("clear sky", ("clear",)),
+)
+SEASONS = ("spring", "summer", "autumn", "winter")
+
+# 날씨 캐시 (요청마다 외부 API 를 기다리지 않도록)
+WEATHER_TTL_S = 600
+WEATHER_TIMEOUT_S = 3
+DEFAULT_WEATHER = "clear sky"
+
 # 날씨 정보 가져오기 (영어로)
 def get_weather(city="Seoul", country="KR"):
     url = f"{BASE_URL}?q={city},{country}&appid={API_KEY}&units=metric&lang=en"
-    response = requests.get(url)
+    response = requests.get(url, timeout=WEATHER_TIMEOUT_S)
     data = response.json()
 
     if response.status_code == 200:
@@ -30,6 +90,28 @@ def get_weather(city="Seoul", country="KR"):
     else:
         raise Exception(f"Weather API error: {data}")
 
+_weather_cache = {}
+_weather_lock = threading.Lock()
+
+def current_weather(city="Seoul", country="KR"):
+    """
+    WEATHER_TTL_S 동안 캐시한 날씨 (API 실패 시 마지막 값 또는 기본값)
+    """
+    key = (city, country)
+    with _weather_lock:
+        cached = _weather_cache.get(key)
+        if cached and time.time() - cached[0] < WEATHER_TTL_S:
+            return cached[1]
+        try:
+            weather = get_weather(city, country)
+        except Exception as e:
+            print(f"⚠️ 날씨 조회 실패, {'이전 값' if cached else '기본값'} 사용: {e}")
+            weather = cached[1] if cached else {
+                "temperature": None, "description": DEFAULT_WEATHER, "season": get_season()
+            }
+        _weather_cache[key] = (time.time(), weather)
+        return weather
+
 # 계절 정보 구하기
 def get_season():
     month = datetime.now().month
@@ -50,45 +132,205 @@ def generate_prompt(user_input):
     mood = user_input.get("mood")
     return f"A {mood} {activity} track for a {weather} day in {season}, with natural and ambient sounds."
 
-# 실행
-weather_info = get_weather(city="Seoul", country="KR")
+def weather_bucket(description):
+    """OpenWeather 날씨 설명 → WEATHER_BUCKETS 구간 이름"""
+    description = (description or "").lower()
+    for bucket, keywords in WEATHER_BUCKETS:
+        if any(keyword in description for keyword in keywords):
+            return bucket
+    return DEFAULT_WEATHER
 
-user_input = {
-    "weather": weather_info["description"],  # 영어라 그대로 사용
-    "season": weather_info["season"],
-    "activity": "walking",
-    "mood": "energetic and uplifting"
-}
+def mood_prompt(mood, weather, season):
+    """무드 + 날씨 + 계절 → 산책 음악 프롬프트 (날씨는 구간으로 정규화, 한글 무드는 영어로)"""
+    mood = mood or DEFAULT_MOOD
+    return generate_prompt({
+        "weather": weather_bucket(weather),
+        "season": season,
+        "activity": "walking",
+        "mood": MOOD_PROMPTS.get(mood, mood)
+    })
+
+def walk_prompt(mood=DEFAULT_MOOD):
+    """현재 날씨/계절 + 무드로 산책 음악 프롬프트 생성"""
+    weather_info = current_weather(city="Seoul", country="KR")
+    return mood_prompt(mood, weather_info["description"], weather_info["season"])
 
-prompt = generate_prompt(user_input)
-print("✅ 생성된 프롬프트:", prompt)
+def tokens_for_seconds(seconds, tokens_per_sec=TOKENS_PER_SEC):
+    """오디오 길이(초) → max_new_tokens (모델 한계 MAX_TOKENS_MODEL)"""
+    return max(1, min(int(round(seconds * tokens_per_sec)), MAX_TOKENS_MODEL))
 
 # MusicGen 모델 불러오기
-processor = AutoProcessor.from_pretrained("facebook/musicgen-small")
-musicgen_model = MusicgenForConditionalGeneration.from_pretrained("facebook/musicgen-small")
-musicgen_model.to("cuda" if torch.cuda.is_available() else "cpu")
+def load_musicgen(model_name=MODEL_NAME, device=None, profile=MUSIC_PROFILE):
+    """(processor, model) 로딩 (프로세스당 한 번)"""
+    import torch
+    from transformers import AutoProcessor, MusicgenForConditionalGeneration
 
-# 음악 생성 파라미터
-walk_minutes = 1
-tokens_per_sec = 16
-MAX_TOKENS_MODEL = 1024
+    if profile not in MUSIC_PROFILES:
+        raise ValueError(f"지원하지 않는 추론 프로필: {profile} ({', '.join(MUSIC_PROFILES)})")
+    processor = AutoProcessor.from_pretrained(model_name)
+    model = MusicgenForConditionalGeneration.from_pretrained(model_name)
+    model.to(device or ("cuda" if torch.cuda.is_available() else "cpu"))
+    model.eval()
+    if profile == 'cpu-int8' and model.device.type == 'cpu':
+        quantize_decoder(model)
+    return processor, model
+
+def quantize_decoder(model):
+    """
+    디코더(토큰 생성 트랜스포머 + lm_heads) Linear 레이어 동적 int8 양자화 (CPU 전용)
+
+    생성 시간 대부분이 토큰마다 도는 디코더 행렬곱이라 여기만 양자화하고,
+    텍스트 인코더(T5)와 오디오 디코더(EnCodec)는 float32 유지
+    """
+    import torch
+    from torch.ao.quantization import quantize_dynamic
+
+    quantize_dynamic(model.decoder, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
+
+def set_torch_threads(threads, interop_threads=1):
+    """
+    torch intra-op(행렬 연산 병렬화) / inter-op(연산 간 병렬화) 스레드 수 명시
+
+    inter-op 은 프로세스에서 첫 병렬 연산 전에만 바꿀 수 있어서 모델 로딩 전에 호출
+    """
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(interop_threads)
+
+def generate_audio(processor, model, prompts, max_new_tokens):
+    """
+    프롬프트 목록 → 오디오 배열 목록 (float32, 모노)
+    """
+    import torch
+
+    inputs = processor(text=list(prompts), padding=True, return_tensors="pt").to(model.device)
+    with torch.inference_mode():
+        audio_values = model.generate(**inputs, max_new_tokens=max_new_tokens)
+    return [audio.cpu().numpy().squeeze() for audio in audio_values]
+
+def generate_continuation(processor, model, prompt, context, sampling_rate, max_new_tokens):
+    """
+    이전 오디오 끝부분(context) 에 이어서 생성
+
+    Returns:
+        context 를 다시 디코딩한 부분 + 새로 생성한 부분 (float32, 모노)
+    """
+    import torch
+
+    inputs = processor(audio=context, sampling_rate=sampling_rate, text=[prompt],
+                       padding=True, return_tensors="pt").to(model.device)
+    with torch.inference_mode():
+        audio_values = model.generate(**inputs, max_new_tokens=max_new_tokens)
+    return audio_values[0].cpu().numpy().squeeze()
+
+class SegmentStream:
+    """
+    산책 길이만큼 세그먼트 단위로 이어서 생성하는 스트림 상태
+
+    - 첫 세그먼트는 텍스트만으로, 이후 세그먼트는 직전 CONTEXT_SECONDS 오디오에 이어서 생성
+      (MAX_TOKENS_MODEL 제한 없이 긴 곡 생성, 세그먼트가 끝날 때마다 바로 전송)
+    - 이음매: 세그먼트 끝 CROSSFADE_SECONDS 는 보류했다가 다음 세그먼트가 다시 디코딩한 같은 구간과 crossfade
+    - 전체 길이는 total_samples 로 고정 (마지막 세그먼트에서 자르거나 무음으로 채움)
+    """
+
+    def __init__(self, prompt, seconds, sampling_rate, frame_rate, segment_seconds=SEGMENT_SECONDS,
+                 context_seconds=CONTEXT_SECONDS, crossfade_seconds=CROSSFADE_SECONDS):
+        self.prompt = prompt
+        self.sampling_rate = sampling_rate
+        self.hop = int(round(sampling_rate / frame_rate))
+        self.total_samples = int(round(min(seconds, MAX_STREAM_SECONDS) * sampling_rate))
+        self.segment_tokens = min(int(segment_seconds * frame_rate), MAX_TOKENS_MODEL)
+        # context 는 프레임 경계에 맞춰서 다시 인코딩해도 길이가 같도록
+        self.context_samples = int(context_seconds * frame_rate) * self.hop
+        self.fade_samples = int(crossfade_seconds * sampling_rate)
+        self.emitted = 0
+        self.index = 0
+        self.tail = None
+        self.held = np.zeros(0, dtype=np.float32)
+        self.gain = None
+
+    @property
+    def done(self):
+        return self.emitted >= self.total_samples
+
+    def next_segment(self, processor, model):
+        """다음 세그먼트 생성 → 16bit PCM 바이트"""
+        remaining = self.total_samples - self.emitted
+        tokens = min(self.segment_tokens, math.ceil((remaining + self.fade_samples) / self.hop) + 1)
+        if self.tail is None:
+            audio = generate_audio(processor, model, [self.prompt], tokens)[0]
+            timeline = audio
+        else:
+            output = generate_continuation(processor, model, self.prompt, self.tail, self.sampling_rate, tokens)
+            start = len(self.tail)
+            fade = len(self.held)
+            ramp = np.linspace(0.0, 1.0, fade, dtype=np.float32)
+            joined = self.held * (1 - ramp) + output[start - fade:start] * ramp
+            audio = np.concatenate((joined, output[start:]))
+            timeline = np.concatenate((self.tail[:len(self.tail) - fade], audio))
+        self.tail = timeline[-self.context_samples:]
+
+        if self.gain is None:
+            peak = np.max(np.abs(audio)) if audio.size else 0
+            self.gain = STREAM_PEAK / peak if peak > 0 else 1.0
+
+        if len(audio) > remaining:
+            # 마지막 세그먼트: 전체 길이에 맞춰 자름
+            audio, self.held = audio[:remaining], np.zeros(0, dtype=np.float32)
+        elif len(audio) > self.fade_samples:
+            # crossfade 구간은 다음 세그먼트와 합칠 때까지 보류
+            audio, self.held = audio[:-self.fade_samples], audio[-self.fade_samples:]
+        else:
+            # 생성 결과가 비정상적으로 짧으면 남은 길이를 무음으로 채우고 종료
+            audio, self.held = np.zeros(remaining, dtype=np.float32), np.zeros(0, dtype=np.float32)
+        self.emitted += len(audio)
+        self.index += 1
+        return pcm16(audio, self.gain)
+
+def pcm16(audio_array, gain=1.0):
+    """고정 이득 적용 후 16bit PCM 바이트 (클리핑)"""
+    return (np.clip(audio_array * gain, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+
+def wav_header(num_samples, sampling_rate, channels=1, sample_width=2):
+    """PCM WAV 헤더 (스트리밍 응답 맨 앞에 보냄)"""
+    data_size = num_samples * channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, channels,
+        sampling_rate, sampling_rate * channels * sample_width, channels * sample_width,
+        sample_width * 8, b'data', data_size
+    )
+
+def to_int16(audio_array):
+    """피크 정규화 후 16bit PCM"""
+    peak = np.max(np.abs(audio_array)) if audio_array.size else 0
+    normalized = audio_array / peak if peak > 0 else audio_array
+    return (normalized * 32767).astype(np.int16)
+
+def wav_bytes(audio_array, sampling_rate):
+    """오디오 배열 → WAV 파일 바이트 (메모리)"""
+    buffer = io.BytesIO()
+    scipy.io.wavfile.write(buffer, rate=sampling_rate, data=to_int16(audio_array))
+    return buffer.getvalue()
+
+# 실행
+if __name__ == '__main__':
+    mood = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MOOD
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SECONDS
+
+    prompt = walk_prompt(mood)
+    print("✅ 생성된 프롬프트:", prompt)
+
+    processor, musicgen_model = load_musicgen()
+    sampling_rate = musicgen_model.config.audio_encoder.sampling_rate
+    tokens_per_generate = tokens_for_seconds(seconds, musicgen_model.config.audio_encoder.frame_rate)
+    print(f"✅ 생성 토큰: {tokens_per_generate} tokens")
+
+    # 오디오 생성
+    audio_array = generate_audio(processor, musicgen_model, [prompt], tokens_per_generate)[0]
 
-tokens_per_generate = min(walk_minutes * 60 * tokens_per_sec, MAX_TOKENS_MODEL)
-print(f"✅ 생성 토큰: {tokens_per_generate} tokens")
-
-# 오디오 생성
-inputs = processor(text=[prompt], return_tensors="pt").to(musicgen_model.device)
-audio_values = musicgen_model.generate(**inputs, max_new_tokens=tokens_per_generate)
-audio_array = audio_values[0].cpu().numpy()
-if audio_array.ndim > 1:
-    audio_array = audio_array.squeeze()
-
-normalized = audio_array / np.max(np.abs(audio_array))
-int16_audio = (normalized * 32767).astype(np.int16)
-
-# 파일 저장
-output_dir = "musicgen_output"
-os.makedirs(output_dir, exist_ok=True)
-output_path = os.path.join(output_dir, "generated_music.wav")
-scipy.io.wavfile.write(output_path, rate=32000, data=int16_audio)
-print(f"✅ 음악 생성 완료! 저장됨 → {output_path}")
\ No newline at end of file
+    # 파일 저장
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    output_path = os.path.join(OUTPUT_DIR, "generated_music.wav")
+    scipy.io.wavfile.write(output_path, rate=sampling_rate, data=to_int16(audio_array))
+    print(f"✅ 음악 생성 완료! 저장됨 → {output_path}")
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import threading
+from music import CURRENT_DIR, MODEL_NAME, MUSIC_PROFILE
+
+# 생성 음악 라이브러리: (모델, 추론 프로필, 프롬프트, 토큰 수) 키의 WAV 디스크 캐시 (LRU + 용량 제한)
+# 프롬프트가 무드 × 날씨 구간 × 계절 조합으로 정해지므로 같은 조합 요청은 추론 없이 바로 응답
+
+LIBRARY_DIR = os.environ.get('SOOMGIL_MUSIC_LIBRARY_DIR', os.path.join(CURRENT_DIR, 'library'))
+LIBRARY_MAX_BYTES = int(float(os.environ.get('SOOMGIL_MUSIC_LIBRARY_MB', 512)) * 1024 * 1024)
+
+# 생성 방식(샘플링 설정, 후처리 등)이 바뀌면 올려서 기존 항목을 무효화
+LIBRARY_FORMAT_VERSION = 1
+
+
+def library_key(prompt, max_new_tokens, model_name=MODEL_NAME, profile=MUSIC_PROFILE):
+    """모델 + 추론 프로필 + 토큰 수 + 프롬프트 해시 (양자화 여부에 따라 결과가 달라서 프로필 포함)"""
+    digest = hashlib.sha256(
+        f"{LIBRARY_FORMAT_VERSION}:{model_name}:{profile}:{int(max_new_tokens)}:{prompt}".encode('utf-8')
+    )
+    return digest.hexdigest()[:32]
+
+
+class MusicLibrary:
+    """
+    생성 음악 디스크 캐시
+
+    - 항목: <키>.wav 파일 하나
+    - LRU: 조회/저장 시 파일 mtime 갱신, 전체 크기가 max_bytes 를 넘으면 오래된 것부터 삭제
+    - hits/misses: 이 프로세스의 조회 결과 (적중률 지표)
+    """
+
+    def __init__(self, library_dir=LIBRARY_DIR, max_bytes=LIBRARY_MAX_BYTES, model_name=MODEL_NAME,
+                 profile=MUSIC_PROFILE):
+        self.library_dir = library_dir
+        self.max_bytes = max_bytes
+        self.model_name = model_name
+        self.profile = profile
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, prompt, max_new_tokens):
+        key = library_key(prompt, max_new_tokens, self.model_name, self.profile)
+        return os.path.join(self.library_dir, f"{key}.wav")
+
+    def _entries(self):
+        """[(mtime, size, 경로), ...] 오래된 순"""
+        if not os.path.isdir(self.library_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.library_dir):
+            if name.endswith('.wav'):
+                path = os.path.join(self.library_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def contains(self, prompt, max_new_tokens):
+        """적중률 집계 없이 항목 존재 여부 (사전 생성에서 사용)"""
+        return os.path.exists(self._path(prompt, max_new_tokens))
+
+    def get(self, prompt, max_new_tokens):
+        """저장된 WAV 바이트 또는 None"""
+        path = self._path(prompt, max_new_tokens)
+        with self._lock:
+            try:
+                with open(path, 'rb') as f:
+                    wav = f.read()
+                os.utime(path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return wav
+
+    def put(self, prompt, max_new_tokens, wav):
+        """WAV 저장 후 용량 제한에 맞게 오래된 항목 삭제"""
+        with self._lock:
+            os.makedirs(self.library_dir, exist_ok=True)
+            path = self._path(prompt, max_new_tokens)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(wav)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            entries = self._entries()
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_music_library = None
+_music_library_lock = threading.Lock()
+
+
+def get_music_library():
+    """프로세스 공유 MusicLibrary"""
+    global _music_library
+    with _music_library_lock:
+        if _music_library is None:
+            _music_library = MusicLibrary()
+        return _music_library
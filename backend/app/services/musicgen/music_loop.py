@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+무드별 결과 음원(results/*.wav)을 산책 길이만큼 이어 붙이는 루프 확장 (모델 추론 없이 NumPy 만 사용)
+
+- 루프 지점: 곡 끝부분 구간과 가장 닮은 앞부분 위치를 정규화 상호상관(FFT)으로 찾음
+- 이음매: 두 구간을 crossfade 해서 루프 한 바퀴(unit)로 미리 만들어 둠
+- 라우드니스: RMS 기준 목표 레벨로 맞추고 피크 제한 (무드별 음량 차이 제거)
+- 출력: WAV 헤더 + 인트로 + unit 반복 + 페이드아웃 꼬리 조각을 순서대로 스트리밍,
+  조각은 무드별 / (무드, 길이 구간)별로 캐시
+
+사용법: python music_loop.py [무드] [길이(분)] [출력 파일]
+"""
+
+import hashlib
+import math
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import scipy.io.wavfile
+from music import pcm16, wav_header
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(CURRENT_DIR, 'results')
+
+# 무드 → 결과 음원 파일
+MOOD_FILES = {
+    '활기찬': '활기찬.wav',
+    '잔잔한': '잔잔한.wav',
+    '상쾌한': '경쾌한.wav',
+    '몽환적': '몽환적.wav',
+}
+
+# 루프 지점 탐색: 비교 구간 길이, 루프 끝 후보 범위/간격, 곡 끝에서 버리는 길이(생성 음원 끝부분 잘림 방지),
+# 루프 최소 길이
+LOOP_WINDOW_SECONDS = 0.5
+LOOP_END_SEARCH_SECONDS = 3.5
+LOOP_END_STEP_SECONDS = 0.1
+LOOP_TAIL_SKIP_SECONDS = 0.5
+LOOP_MIN_SECONDS = 8.0
+CROSSFADE_SECONDS = 0.25
+# 상관계수가 이보다 낮으면 선형 대신 등전력(equal-power) crossfade
+LINEAR_FADE_MIN_CORR = 0.5
+
+# 라우드니스 정규화 (RMS dBFS) 및 피크 제한
+TARGET_RMS_DBFS = -18.0
+PEAK_LIMIT = 0.95
+
+# 출력 길이는 BUCKET_SECONDS 단위로 올림 (캐시 키), 끝 FADE_OUT_SECONDS 는 페이드아웃
+BUCKET_SECONDS = 60
+MAX_LOOP_SECONDS = 4 * 3600
+FADE_OUT_SECONDS = 3.0
+TRACK_CACHE_SIZE = 32
+
+
+def read_wav(path):
+    """WAV → (float32 모노 [-1, 1], 샘플레이트)"""
+    sampling_rate, data = scipy.io.wavfile.read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if np.issubdtype(data.dtype, np.integer):
+        data = data.astype(np.float32) / np.iinfo(data.dtype).max
+    return data.astype(np.float32), sampling_rate
+
+
+def normalized_xcorr(signal, templates):
+    """
+    템플릿마다 signal[k:k + window] 와의 정규화 상호상관 (k = 0 .. len(signal) - window)
+
+    signal 스펙트럼과 구간 에너지(누적합)는 한 번만 계산해서 모든 템플릿에 재사용
+    """
+    window = templates.shape[1]
+    size = 1 << int(math.ceil(math.log2(len(signal) + window)))
+    spectrum = np.fft.rfft(signal, size)
+    energy = np.concatenate(([0.0], np.cumsum(signal.astype(np.float64) ** 2)))
+    local = np.sqrt(np.maximum(energy[window:] - energy[:-window], 0.0))
+    for template in templates:
+        numerator = np.fft.irfft(spectrum * np.conj(np.fft.rfft(template, size)), size)[:len(local)]
+        denom = local * np.linalg.norm(template)
+        yield np.where(denom > 1e-9, numerator / np.where(denom > 1e-9, denom, 1.0), 0.0)
+
+
+def find_loop(audio, sampling_rate, window_s=LOOP_WINDOW_SECONDS, end_search_s=LOOP_END_SEARCH_SECONDS,
+              tail_skip_s=LOOP_TAIL_SKIP_SECONDS, min_loop_s=LOOP_MIN_SECONDS):
+    """
+    루프 지점 (start, end, 상관계수)
+
+    곡 끝 tail_skip_s 앞쪽 end_search_s 구간의 end 후보마다 audio[end - window:end] 와 가장 닮은
+    audio[start - window:start] 를 찾아 상관이 가장 높은 쌍 선택
+    (end 에서 start 로 되돌아가도 직전 구간이 이어짐, 루프 길이 최소 min_loop_s)
+    """
+    window = int(window_s * sampling_rate)
+    step = int(LOOP_END_STEP_SECONDS * sampling_rate)
+    last_end = len(audio) - int(tail_skip_s * sampling_rate)
+    ends = np.arange(last_end, max(last_end - int(end_search_s * sampling_rate), window), -step)
+    min_loop = int(min_loop_s * sampling_rate)
+    if len(ends) == 0 or last_end - min_loop <= window:
+        raise ValueError("루프를 만들기에 음원이 너무 짧습니다")
+
+    templates = np.stack([audio[end - window:end] for end in ends])
+    best = (-np.inf, 0, 0)
+    for end, corr in zip(ends, normalized_xcorr(audio[:last_end - min_loop], templates)):
+        # 이 end 에서 가능한 start 는 end - min_loop 이하
+        valid = corr[:max(end - min_loop - window + 1, 0)]
+        if len(valid):
+            offset = int(np.argmax(valid))
+            if valid[offset] > best[0]:
+                best = (float(valid[offset]), offset + window, int(end))
+    if best[2] == 0:
+        raise ValueError("루프를 만들기에 음원이 너무 짧습니다")
+    return best[1], best[2], best[0]
+
+
+def crossfade_ramps(length, corr):
+    """(fade_out, fade_in) 곡선: 닮은 구간은 선형, 덜 닮으면 등전력"""
+    ramp = np.linspace(0.0, 1.0, length, dtype=np.float32)
+    if corr >= LINEAR_FADE_MIN_CORR:
+        return 1.0 - ramp, ramp
+    return np.cos(ramp * np.pi / 2), np.sin(ramp * np.pi / 2)
+
+
+def loudness_gain(audio, target_dbfs=TARGET_RMS_DBFS, peak_limit=PEAK_LIMIT):
+    """RMS 를 target_dbfs 로 맞추는 이득 (피크가 peak_limit 를 넘지 않도록 제한)"""
+    rms = float(np.sqrt(np.mean(audio.astype(np.float64) ** 2))) if audio.size else 0.0
+    peak = float(np.max(np.abs(audio))) if audio.size else 0.0
+    if rms <= 0 or peak <= 0:
+        return 1.0
+    return min(10 ** (target_dbfs / 20) / rms, peak_limit / peak)
+
+
+def duration_bucket(seconds, bucket_s=BUCKET_SECONDS):
+    """요청 길이 → 캐시 길이 구간 (bucket_s 단위 올림, MAX_LOOP_SECONDS 이하)"""
+    if not seconds > 0:
+        raise ValueError("길이는 0보다 커야 합니다")
+    return int(min(math.ceil(seconds / bucket_s) * bucket_s, MAX_LOOP_SECONDS))
+
+
+class LoopSource:
+    """
+    무드 음원 하나의 루프 조각 (정규화된 PCM16 바이트)
+
+    재생 순서: intro = audio[:end - fade] + crossfade, 이후 unit = audio[start:end - fade] + crossfade 반복
+    (crossfade = audio[end - fade:end] 페이드아웃 + audio[start - fade:start] 페이드인)
+    """
+
+    def __init__(self, path, crossfade_s=CROSSFADE_SECONDS):
+        self.path = path
+        self.stamp = os.stat(path).st_mtime_ns
+        audio, self.sampling_rate = read_wav(path)
+        self.start, self.end, self.corr = find_loop(audio, self.sampling_rate)
+        fade = min(int(crossfade_s * self.sampling_rate), self.start)
+        fade_out, fade_in = crossfade_ramps(fade, self.corr)
+        joined = audio[self.end - fade:self.end] * fade_out + audio[self.start - fade:self.start] * fade_in
+
+        self.gain = loudness_gain(audio[:self.end])
+        self.intro = np.concatenate((audio[:self.end - fade], joined))
+        self.unit = np.concatenate((audio[self.start:self.end - fade], joined))
+        self.intro_pcm = pcm16(self.intro, self.gain)
+        self.unit_pcm = pcm16(self.unit, self.gain)
+
+    def render(self, position, count):
+        """루프 재생 순서에서 position 부터 count 샘플 (float32, 이득 적용 전)"""
+        index = np.arange(position, position + count)
+        after = index >= len(self.intro)
+        samples = np.empty(count, dtype=np.float32)
+        samples[~after] = self.intro[index[~after]]
+        samples[after] = self.unit[(index[after] - len(self.intro)) % len(self.unit)]
+        return samples
+
+    def plan(self, total_samples, fade_out_s=FADE_OUT_SECONDS):
+        """
+        total_samples 길이 출력 조각 계획
+
+        Returns:
+            (반복 조각 목록 [(이름, 바이트)], 꼬리 시작 위치) - 페이드아웃 구간이 시작되기 전에 끝나는
+            intro/unit 만 그대로 쓰고 나머지는 꼬리로 렌더링
+        """
+        tail_start = total_samples - min(int(fade_out_s * self.sampling_rate), total_samples)
+        pieces, position = [], 0
+        if len(self.intro) <= tail_start:
+            pieces.append(('intro', self.intro_pcm))
+            position = len(self.intro)
+            repeats = (tail_start - position) // len(self.unit)
+            pieces.extend([('unit', self.unit_pcm)] * repeats)
+            position += repeats * len(self.unit)
+        return pieces, position
+
+    def tail(self, position, total_samples, fade_out_s=FADE_OUT_SECONDS):
+        """position 부터 끝까지 (마지막 fade_out_s 는 페이드아웃) PCM16 바이트"""
+        samples = self.render(position, total_samples - position)
+        fade = min(int(fade_out_s * self.sampling_rate), len(samples))
+        if fade:
+            samples[-fade:] *= np.linspace(1.0, 0.0, fade, dtype=np.float32)
+        return pcm16(samples, self.gain)
+
+
+class LoopTrack:
+    """(무드, 길이 구간) 출력: 헤더 + 반복 조각 + 꼬리, 전체 바이트 수, ETag (원본 파일/길이 기준)"""
+
+    def __init__(self, source, seconds):
+        self.seconds = seconds
+        self.sampling_rate = source.sampling_rate
+        self.total_samples = int(seconds * source.sampling_rate)
+        self.header = wav_header(self.total_samples, source.sampling_rate)
+        pieces, position = source.plan(self.total_samples)
+        self.pieces = [pcm for _, pcm in pieces] + [source.tail(position, self.total_samples)]
+        self.content_length = len(self.header) + sum(len(pcm) for pcm in self.pieces)
+        self.etag = hashlib.blake2b(f"{source.path}|{source.stamp}|{seconds}".encode('utf-8'),
+                                    digest_size=12).hexdigest()
+
+    def chunks(self):
+        """스트리밍 응답 본문 (캐시된 바이트를 그대로 내보냄)"""
+        yield self.header
+        yield from self.pieces
+
+
+_sources = {}
+_tracks = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_loop_source(mood):
+    """무드별 LoopSource (최초 1회 분석, 이후 메모리 캐시)"""
+    filename = MOOD_FILES.get(mood)
+    if not filename:
+        raise KeyError(mood)
+    path = os.path.join(RESULTS_DIR, filename)
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _sources.get(mood)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    started = time.time()
+    source = LoopSource(path)
+    print(f"🔁 루프 분석: {mood} ({len(source.unit) / source.sampling_rate:.1f}s 루프, "
+          f"상관 {source.corr:.2f}, 이득 {source.gain:.2f}, {(time.time() - started) * 1000:.0f}ms)")
+    with _lock:
+        _sources[mood] = (mtime, source)
+        for key in [key for key in _tracks if key[0] == mood]:
+            del _tracks[key]
+    return source
+
+
+def get_loop_track(mood, seconds):
+    """(무드, 길이 구간) 루프 트랙 (LRU 캐시)"""
+    source = get_loop_source(mood)
+    key = (mood, duration_bucket(seconds))
+    with _lock:
+        track = _tracks.get(key)
+        if track is not None:
+            _tracks.move_to_end(key)
+            return track
+    track = LoopTrack(source, key[1])
+    with _lock:
+        _tracks[key] = track
+        while len(_tracks) > TRACK_CACHE_SIZE:
+            _tracks.popitem(last=False)
+    return track
+
+
+if __name__ == '__main__':
+    mood = sys.argv[1] if len(sys.argv) > 1 else '잔잔한'
+    minutes = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    output_path = sys.argv[3] if len(sys.argv) > 3 else f"loop_{mood}_{minutes:g}min.wav"
+
+    started = time.time()
+    track = get_loop_track(mood, minutes * 60)
+    print(f"✅ 트랙 준비: {track.seconds}s ({track.content_length / 1e6:.1f} MB), "
+          f"{(time.time() - started) * 1000:.0f}ms")
+    started = time.time()
+    get_loop_track(mood, minutes * 60)
+    print(f"✅ 캐시 조회: {(time.time() - started) * 1000:.2f}ms")
+
+    with open(output_path, 'wb') as f:
+        for chunk in track.chunks():
+            f.write(chunk)
+    print(f"✅ 저장됨 → {output_path}")
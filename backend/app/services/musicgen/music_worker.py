@@ -0,0 +1,408 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from music import (
+    OUTPUT_DIR, MODEL_NAME, MUSIC_PROFILE, SegmentStream,
+    load_musicgen, set_torch_threads, generate_audio, wav_bytes, wav_header
+)
+
+# MusicGen 상주 워커: 별도 프로세스에서 processor/모델을 한 번만 로딩하고 작업 큐로 생성 요청 처리
+# (요청마다 인터프리터 시작 + torch/transformers import + 모델 로딩을 반복하지 않음)
+
+# torch 스레드 설정 (intra-op: 행렬 연산 병렬화, inter-op: 연산 간 병렬화는 생성 루프에서 효과가 없어 1)
+MUSIC_THREADS = int(os.environ.get('SOOMGIL_MUSIC_THREADS', os.cpu_count() or 1))
+MUSIC_INTEROP_THREADS = int(os.environ.get('SOOMGIL_MUSIC_INTEROP_THREADS', 1))
+MUSIC_DEVICE = os.environ.get('SOOMGIL_MUSIC_DEVICE') or None
+
+# 마이크로 배치: 첫 작업 도착 후 이 시간 동안 같은 max_new_tokens 작업을 모아 한 번에 generate
+MUSIC_BATCH_WINDOW_S = float(os.environ.get('SOOMGIL_MUSIC_BATCH_WINDOW_MS', 50)) / 1000
+MUSIC_MAX_BATCH = int(os.environ.get('SOOMGIL_MUSIC_MAX_BATCH', 4))
+
+# 작업별 결과 파일 보관 개수 (오래된 것부터 삭제)
+MAX_OUTPUT_FILES = int(os.environ.get('SOOMGIL_MUSIC_KEEP_FILES', 50))
+# 생성 대기 시간 제한 (초)
+MUSIC_JOB_TIMEOUT_S = float(os.environ.get('SOOMGIL_MUSIC_TIMEOUT', 600))
+
+
+def _drain_jobs(jobs, backlog, cancelled):
+    """
+    큐에 쌓인 메시지를 기다리지 않고 모두 꺼내 backlog 뒤에 붙이고 취소 메시지는 cancelled 에 모음
+    (backlog 에 스트림 작업이 남아 있어도 새 작업과 취소 요청을 놓치지 않도록)
+
+    Returns:
+        종료 신호(None)를 받았으면 True
+    """
+    while True:
+        try:
+            message = jobs.get_nowait()
+        except queue.Empty:
+            return False
+        if message is None:
+            return True
+        if 'cancel' in message:
+            cancelled.add(message['cancel'])
+        else:
+            backlog.append(message)
+
+
+def _collect_batch(jobs, backlog, cancelled, window_s, max_batch):
+    """
+    다음 배치: 첫 작업과 max_new_tokens 가 같은 작업을 backlog/큐에서 최대 max_batch 개 모음
+    (다른 길이 작업은 backlog 에 남겨 다음 배치로, 스트림 작업은 항상 단독 배치)
+
+    큐의 {'cancel': 작업 ID} 메시지는 cancelled 에 모아서 해당 작업을 건너뜀
+
+    Returns:
+        (batch, stop) - 종료 신호(None)를 받으면 stop=True
+    """
+    if _drain_jobs(jobs, backlog, cancelled):
+        return [], True
+    first = None
+    while first is None:
+        message = backlog.pop(0) if backlog else jobs.get()
+        if message is None:
+            return [], True
+        if 'cancel' in message:
+            cancelled.add(message['cancel'])
+        elif message['id'] in cancelled:
+            cancelled.discard(message['id'])
+        else:
+            first = message
+    if first.get('stream'):
+        return [first], False
+
+    tokens = first['max_new_tokens']
+    batch, rest = [first], []
+    for job in backlog:
+        if not job.get('stream') and job['max_new_tokens'] == tokens and len(batch) < max_batch:
+            batch.append(job)
+        else:
+            rest.append(job)
+    backlog[:] = rest
+
+    deadline = time.monotonic() + window_s
+    while len(batch) < max_batch:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            job = jobs.get(timeout=remaining)
+        except queue.Empty:
+            break
+        if job is None:
+            return batch, True
+        if 'cancel' in job:
+            cancelled.add(job['cancel'])
+        elif not job.get('stream') and job['max_new_tokens'] == tokens:
+            batch.append(job)
+        else:
+            backlog.append(job)
+    return batch, False
+
+
+def _stream_segment(job, processor, model, sampling_rate, frame_rate, results):
+    """스트림 작업 세그먼트 하나 생성 후 전송 (남은 세그먼트가 있으면 True)"""
+    if 'state' not in job:
+        job['state'] = SegmentStream(job['prompt'], job['seconds'], sampling_rate, frame_rate)
+    state = job['state']
+    started = time.time()
+    pcm = state.next_segment(processor, model)
+    results.put(('segment', job['id'], {
+        'index': state.index - 1,
+        'pcm': pcm,
+        'last': state.done,
+        'sampling_rate': sampling_rate,
+        'total_samples': state.total_samples,
+        'elapsed_s': time.time() - started,
+    }))
+    return not state.done
+
+
+def _worker_main(jobs, results, model_name, device, profile, threads, interop_threads, batch_window_s, max_batch):
+    """워커 프로세스: 모델 로딩 후 작업 큐에서 배치 단위로 꺼내 생성 (None 이면 종료)"""
+    import torch
+    set_torch_threads(threads, interop_threads)
+
+    started = time.time()
+    try:
+        processor, model = load_musicgen(model_name, device, profile)
+    except Exception as e:
+        results.put(('failed', None, f"모델 로딩 실패: {e}"))
+        return
+    sampling_rate = model.config.audio_encoder.sampling_rate
+    frame_rate = model.config.audio_encoder.frame_rate
+    results.put(('ready', None, {
+        'model': model_name,
+        'device': str(model.device),
+        'profile': profile,
+        'sampling_rate': sampling_rate,
+        'frame_rate': frame_rate,
+        'threads': torch.get_num_threads(),
+        'interop_threads': torch.get_num_interop_threads(),
+        'batch_window_s': batch_window_s,
+        'max_batch': max_batch,
+        'load_s': round(time.time() - started, 2),
+    }))
+
+    # 종료 신호를 받아도 backlog 에 남은 작업은 마저 처리 (스트림은 중단)
+    backlog, cancelled, stop = [], set(), False
+    while not stop or backlog:
+        batch, stopped = _collect_batch(jobs, backlog, cancelled, 0 if stop else batch_window_s, max_batch)
+        stop = stop or stopped
+        if not batch:
+            continue
+        if batch[0].get('stream'):
+            job = batch[0]
+            try:
+                # 세그먼트 하나씩 생성하고, 그동안 들어온 작업/취소 요청을 먼저 backlog 에 받은 뒤
+                # 스트림을 맨 뒤로 보내서 다른 작업과 번갈아 처리 (취소된 스트림은 다음 차례에 건너뜀)
+                more = _stream_segment(job, processor, model, sampling_rate, frame_rate, results)
+                stop = _drain_jobs(jobs, backlog, cancelled) or stop
+                if more and not stop:
+                    backlog.append(job)
+            except Exception as e:
+                results.put(('error', job['id'], str(e)))
+            continue
+        started = time.time()
+        try:
+            audios = generate_audio(processor, model, [job['prompt'] for job in batch], batch[0]['max_new_tokens'])
+        except Exception as e:
+            for job in batch:
+                results.put(('error', job['id'], str(e)))
+            continue
+        elapsed = time.time() - started
+        for job, audio in zip(batch, audios):
+            results.put(('done', job['id'], {
+                'wav': wav_bytes(audio, sampling_rate),
+                'audio_s': len(audio) / sampling_rate,
+                'elapsed_s': elapsed,
+                'batch_size': len(batch),
+            }))
+
+
+class MusicWorker:
+    """
+    MusicGen 워커 프로세스 관리 (API 프로세스 쪽)
+
+    - submit(): 작업 큐에 넣고 Future 반환, 결과 큐는 디스패처 스레드가 받아서 Future 완료
+    - 워커는 동시에 들어온 같은 길이 작업을 배치 하나로 생성 (batch_window_s, max_batch)
+    - stream(): 산책 길이만큼 세그먼트 단위로 이어서 생성하고 세그먼트가 끝날 때마다 PCM 전달
+    - 결과: {'job_id', 'prompt', 'wav' (메모리 WAV 바이트), 'path' (작업별 파일), 'audio_s', 'elapsed_s'}
+    - 워커가 죽으면 대기 중인 작업은 실패 처리하고 다음 submit 때 다시 시작
+    """
+
+    def __init__(self, model_name=MODEL_NAME, device=MUSIC_DEVICE, profile=MUSIC_PROFILE, threads=MUSIC_THREADS,
+                 interop_threads=MUSIC_INTEROP_THREADS, output_dir=OUTPUT_DIR,
+                 batch_window_s=MUSIC_BATCH_WINDOW_S, max_batch=MUSIC_MAX_BATCH):
+        self.model_name = model_name
+        self.device = device
+        self.profile = profile
+        self.threads = threads
+        self.interop_threads = interop_threads
+        self.batch_window_s = batch_window_s
+        self.max_batch = max_batch
+        self.output_dir = output_dir
+        self.info = None
+        self.error = None
+        self.completed = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._streams = {}
+        self._process = None
+        self._jobs = None
+        self._results = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """워커 프로세스 시작 (이미 실행 중이면 무시)"""
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                return
+            # torch 가 이미 스레드를 만든 프로세스를 fork 하지 않도록 spawn 사용
+            context = multiprocessing.get_context('spawn')
+            self._jobs = context.Queue()
+            self._results = context.Queue()
+            self._ready.clear()
+            self.error = None
+            self._process = context.Process(
+                target=_worker_main, name='musicgen-worker', daemon=True,
+                args=(self._jobs, self._results, self.model_name, self.device, self.profile, self.threads,
+                      self.interop_threads, self.batch_window_s, self.max_batch)
+            )
+            self._process.start()
+            threading.Thread(
+                target=self._dispatch, args=(self._process, self._results),
+                name='musicgen-dispatcher', daemon=True
+            ).start()
+            print(f"🎵 MusicGen 워커 시작 (pid {self._process.pid}, {self.profile}, 스레드 {self.threads})")
+
+    def submit(self, prompt, max_new_tokens):
+        """생성 작업 등록 → Future"""
+        self.start()
+        job = {'id': uuid.uuid4().hex[:12], 'prompt': prompt, 'max_new_tokens': int(max_new_tokens)}
+        future = Future()
+        with self._lock:
+            self._pending[job['id']] = (job, future)
+        self._jobs.put(job)
+        return future
+
+    def generate(self, prompt, max_new_tokens, timeout=MUSIC_JOB_TIMEOUT_S):
+        """생성 작업 등록 후 결과 대기"""
+        return self.submit(prompt, max_new_tokens).result(timeout=timeout)
+
+    def stream(self, prompt, seconds, timeout=MUSIC_JOB_TIMEOUT_S):
+        """
+        연속 생성 스트림 작업 등록
+
+        Returns:
+            (작업 ID, 바이트 제너레이터) - 첫 세그먼트가 나오면 WAV 헤더(전체 길이) 다음 PCM 을 세그먼트마다 반환,
+            제너레이터를 중간에 닫으면(클라이언트 연결 종료) 워커에 취소 요청
+        """
+        self.start()
+        job = {'id': uuid.uuid4().hex[:12], 'prompt': prompt, 'stream': True, 'seconds': float(seconds)}
+        segments = queue.Queue()
+        with self._lock:
+            self._streams[job['id']] = segments
+        self._jobs.put(job)
+
+        def _iterate():
+            finished = False
+            try:
+                while not finished:
+                    try:
+                        kind, payload = segments.get(timeout=timeout)
+                    except queue.Empty:
+                        raise RuntimeError("음악 생성 시간 초과")
+                    if kind == 'error':
+                        raise RuntimeError(f"음악 생성 실패: {payload}")
+                    if payload['index'] == 0:
+                        yield wav_header(payload['total_samples'], payload['sampling_rate'])
+                    finished = payload['last']
+                    yield payload['pcm']
+            finally:
+                with self._lock:
+                    self._streams.pop(job['id'], None)
+                if not finished:
+                    self._jobs.put({'cancel': job['id']})
+                    print(f"⏹️ 음악 스트림 취소: {job['id']}")
+
+        return job['id'], _iterate()
+
+    def _dispatch(self, process, results):
+        """결과 큐 → Future 완료 (워커 프로세스가 끝나면 대기 작업 실패 처리 후 종료)"""
+        while True:
+            try:
+                kind, job_id, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                self._fail_pending(f"MusicGen 워커 종료 (exit code {process.exitcode})")
+                return
+            if kind == 'ready':
+                self.info = payload
+                self._ready.set()
+                print(f"✅ MusicGen 모델 로딩 완료: {payload}")
+            elif kind == 'failed':
+                self.error = payload
+                print(f"❌ {payload}")
+                self._fail_pending(payload)
+                return
+            elif job_id in self._streams:
+                self._deliver_segment(job_id, kind, payload)
+            else:
+                with self._lock:
+                    job, future = self._pending.pop(job_id, (None, None))
+                if future is None:
+                    continue
+                if kind == 'error':
+                    future.set_exception(RuntimeError(f"음악 생성 실패: {payload}"))
+                    continue
+                try:
+                    future.set_result(self._save_result(job, payload))
+                except Exception as e:
+                    future.set_exception(e)
+
+    def _deliver_segment(self, job_id, kind, payload):
+        with self._lock:
+            segments = self._streams.get(job_id)
+        if segments is None:
+            return
+        segments.put((kind, payload))
+        if kind == 'segment':
+            print(f"🎵 스트림 {job_id} 세그먼트 {payload['index']} ({payload['elapsed_s']:.1f}s 소요"
+                  f"{', 완료' if payload['last'] else ''})")
+            if payload['last']:
+                self.completed += 1
+
+    def _save_result(self, job, payload):
+        """작업별 WAV 파일 저장 (공유 generated_music.wav 대신)"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{job['id']}.wav")
+        with open(path, 'wb') as f:
+            f.write(payload['wav'])
+        self._prune_outputs()
+        self.completed += 1
+        print(f"✅ 음악 생성 완료 ({payload['audio_s']:.1f}s 오디오, {payload['elapsed_s']:.1f}s 소요, "
+              f"배치 {payload['batch_size']}) → {path}")
+        return {'job_id': job['id'], 'prompt': job['prompt'], 'path': path, **payload}
+
+    def _prune_outputs(self):
+        files = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in os.scandir(self.output_dir)
+            if entry.name.endswith('.wav')
+        )
+        for _, path in files[:max(0, len(files) - MAX_OUTPUT_FILES)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _fail_pending(self, message):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            streams = list(self._streams.values())
+        for _, future in pending.values():
+            future.set_exception(RuntimeError(message))
+        for segments in streams:
+            segments.put(('error', message))
+
+    def stop(self, timeout=10):
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None and process.is_alive():
+            self._jobs.put(None)
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+    def status(self):
+        with self._lock:
+            running = self._process is not None and self._process.is_alive()
+            pending = len(self._pending)
+            streams = len(self._streams)
+        return {
+            'running': running,
+            'ready': self._ready.is_set(),
+            'pending': pending,
+            'streams': streams,
+            'completed': self.completed,
+            'info': self.info,
+            'error': self.error,
+        }
+
+
+_music_worker = None
+_music_worker_lock = threading.Lock()
+
+
+def get_music_worker():
+    """프로세스 공유 MusicWorker (첫 작업 때 워커 프로세스 시작)"""
+    global _music_worker
+    with _music_worker_lock:
+        if _music_worker is None:
+            _music_worker = MusicWorker()
+        return _music_worker
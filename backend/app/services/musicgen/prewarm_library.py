@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+생성 음악 라이브러리 사전 생성 (무드 × 날씨 구간 × 계절)
+
+/api/generate-music 이 만들 수 있는 프롬프트 조합 중 라이브러리에 없는 것만 생성해서 저장합니다.
+CPU 코어를 프로세스 여러 개로 나눠 쓰고(프로세스마다 모델 로딩, torch 스레드 = 코어 수 / 프로세스 수),
+각 프로세스는 같은 길이 프롬프트를 배치로 묶어 생성합니다.
+
+사용법: python prewarm_library.py [길이(초)] [프로세스 수] [--current-season]
+"""
+
+import multiprocessing as mp
+import os
+import sys
+import time
+from music import (
+    DEFAULT_SECONDS, MODEL_NAME, MOOD_PROMPTS, SEASONS, WEATHER_BUCKETS,
+    get_season, mood_prompt, tokens_for_seconds, set_torch_threads, load_musicgen, generate_audio, wav_bytes
+)
+from music_library import get_music_library
+from music_worker import MUSIC_MAX_BATCH
+
+# 화면 무드 + /api/generate-music 기본 무드
+PREWARM_MOODS = tuple(MOOD_PROMPTS) + ("mysterious and cinematic",)
+# 프로세스 수 기본값: 코어 THREADS_PER_PROCESS 개당 하나
+THREADS_PER_PROCESS = 4
+
+_processor = None
+_model = None
+
+
+def _init_worker(model_name, threads):
+    """풀 프로세스: torch 스레드 설정 후 모델 로딩"""
+    global _processor, _model
+    set_torch_threads(threads, 1)
+    _processor, _model = load_musicgen(model_name, device="cpu")
+
+
+def _generate(task):
+    prompts, max_new_tokens = task
+    started = time.time()
+    audios = generate_audio(_processor, _model, prompts, max_new_tokens)
+    sampling_rate = _model.config.audio_encoder.sampling_rate
+    return prompts, [wav_bytes(audio, sampling_rate) for audio in audios], time.time() - started
+
+
+def prewarm_prompts(seasons=SEASONS):
+    """무드 × 날씨 구간 × 계절 프롬프트 (중복 제거, 순서 유지)"""
+    prompts = [
+        mood_prompt(mood, bucket, season)
+        for season in seasons for bucket, _ in WEATHER_BUCKETS for mood in PREWARM_MOODS
+    ]
+    return list(dict.fromkeys(prompts))
+
+
+def main(seconds=DEFAULT_SECONDS, processes=None, current_season=False):
+    cores = os.cpu_count() or 1
+    processes = processes or max(1, cores // THREADS_PER_PROCESS)
+    threads = max(1, cores // processes)
+    max_new_tokens = tokens_for_seconds(seconds)
+    library = get_music_library()
+
+    prompts = prewarm_prompts((get_season(),) if current_season else SEASONS)
+    missing = [prompt for prompt in prompts if not library.contains(prompt, max_new_tokens)]
+    print(f"🎵 프롬프트 {len(prompts)}개 중 {len(missing)}개 생성 ({max_new_tokens} tokens, "
+          f"프로세스 {processes} × 스레드 {threads}, 배치 {MUSIC_MAX_BATCH})")
+    if not missing:
+        return
+
+    tasks = [(missing[i:i + MUSIC_MAX_BATCH], max_new_tokens) for i in range(0, len(missing), MUSIC_MAX_BATCH)]
+    started, done = time.time(), 0
+    with mp.get_context('spawn').Pool(processes, _init_worker, (MODEL_NAME, threads)) as pool:
+        for batch_prompts, wavs, elapsed in pool.imap_unordered(_generate, tasks):
+            for prompt, wav in zip(batch_prompts, wavs):
+                library.put(prompt, max_new_tokens, wav)
+            done += len(batch_prompts)
+            print(f"   ✅ {done}/{len(missing)} (배치 {len(batch_prompts)}개 {elapsed:.1f}s)")
+
+    stats = library.stats()
+    print(f"✅ 사전 생성 완료: {time.time() - started:.1f}s, 라이브러리 {stats['entries']}개 "
+          f"({stats['bytes'] / 1e6:.1f} MB / {stats['max_bytes'] / 1e6:.0f} MB)")
+
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    main(float(args[0]) if len(args) > 0 else DEFAULT_SECONDS,
+         int(args[1]) if len(args) > 1 else None,
+         current_season='--current-season' in sys.argv[1:])
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+이미지 경로 배치 탐색 벤치마크: 순차 탐색(1 워커) vs 프로세스 풀 (2/4/8 워커)
+
+같은 윤곽선으로 find_optimal_route 를 워커 수별로 실행해서 소요 시간과
+순차 탐색 대비 결과(경로, Fréchet 점수)가 같은지 확인하고,
+단계적 탐색(optimize_placement)의 점수/평가 배치 수도 비교합니다.
+
+사용법: python bench_placement.py [이미지 경로] [목표 거리(m)]
+"""
+
+import os
+import sys
+import time
+from image_path_enhanced import (
+    extract_contour_from_image, load_network_data, calculate_bbox_info,
+    scale_contour, find_optimal_route, optimize_placement, placement_grid
+)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_IMAGE = os.path.join(CURRENT_DIR, 'test_image', 'heart2.png')
+WORKER_COUNTS = (2, 4, 8)
+
+
+def main(image_path=DEFAULT_IMAGE, target_len=5000):
+    contour = extract_contour_from_image(image_path)
+    nodes, wg = load_network_data()
+    bbox_info = calculate_bbox_info(nodes)
+    contour_scaled, px_to_m = scale_contour(contour, target_len, bbox_info)
+
+    print(f"🖼️ 이미지: {image_path} ({len(contour)}개 포인트), 목표 거리 {target_len}m")
+    print(f"🖥️ CPU: {os.cpu_count()}개")
+    print("=" * 60)
+
+    started = time.perf_counter()
+    base_path, _, base_score = find_optimal_route(contour_scaled, px_to_m, bbox_info, wg, target_len, workers=1)
+    base_s = time.perf_counter() - started
+    print(f" 1 worker    {base_s:8.2f} s   x1.00   score {base_score:.6f}   (sequential)")
+
+    for workers in WORKER_COUNTS:
+        started = time.perf_counter()
+        best_path, _, best_score = find_optimal_route(
+            contour_scaled, px_to_m, bbox_info, wg, target_len, workers=workers
+        )
+        elapsed = time.perf_counter() - started
+        same = best_path == base_path and best_score == base_score
+        print(f"{workers:>2} workers   {elapsed:8.2f} s   x{base_s / elapsed:4.2f}   "
+              f"score {best_score:.6f}   {'✅ same' if same else '❌ differs'}")
+
+    print("=" * 60)
+    started = time.perf_counter()
+    _, _, best_score, stats = optimize_placement(contour_scaled, px_to_m, bbox_info, wg, workers=1)
+    elapsed = time.perf_counter() - started
+    print(f"coarse-to-fine {elapsed:8.2f} s   x{base_s / elapsed:4.2f}   score {best_score:.6f} "
+          f"({'✅ ' if best_score <= base_score else '❌ '}grid {base_score:.6f})")
+    print(f"   build_route 호출: {stats['full']} (격자 {len(placement_grid(bbox_info))}), "
+          f"스냅 거리 근사 평가: {stats['coarse']}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_IMAGE,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 5000)
@@ -1,21 +1,40 @@
 import cv2
 import numpy as np
-import pandas as pd
-import geopandas as gpd
-import networkx as nx
 import folium
-from sklearn.neighbors import BallTree
 from geopy.distance import geodesic
 from IPython.display import IFrame
-from scipy.spatial.distance import euclidean
-from functools import lru_cache
 import json
 from datetime import datetime
 import os
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# 공유 보행 네트워크 그래프
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'walk_graph'))
+from walk_graph import get_walk_graph, add_load_hook
+from snapping import get_snapper
+from base_layer import MAP_DEBUG, debug_map
+from route_cache import get_route_cache, route_cache_key
+from template_index import get_template_index
 
 # GeoJSON 생성 함수들을 직접 정의 (geojson_generator.py 통합)
 
-def create_enhanced_geojson(best_path, best_contour, target_len, best_score, image_name="custom_image", center_lat=None, center_lon=None):
+def calculate_distance(coords):
+    """경로 거리 계산 (미터 단위)"""
+    if not coords or len(coords) < 2:
+        return 0
+    
+    total_distance = 0
+    for i in range(len(coords) - 1):
+        lat1, lon1 = coords[i]
+        lat2, lon2 = coords[i + 1]
+        # geodesic 거리 계산 (더 정확함)
+        distance = geodesic((lat1, lon1), (lat2, lon2)).meters
+        total_distance += distance
+    return total_distance
+
+def create_enhanced_geojson(best_path, best_contour, target_len, best_score, image_name="custom_image", center_lat=None, center_lon=None, search_stats=None, actual_distance=None):
     """
     향상된 GeoJSON 파일 생성 함수
     
@@ -27,27 +46,16 @@ def create_enhanced_geojson(best_path, best_contour, target_len, best_score, ima
         image_name: 이미지 파일명
         center_lat: 중심 위도
         center_lon: 중심 경도
+        search_stats: 배치 탐색 통계 (optimize_placement 반환값)
+        actual_distance: 미리 계산한 경로 거리 (미터, 없으면 계산)
     
     Returns:
         tuple: (geojson_data, timestamp)
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # 경로 거리 계산 (미터 단위)
-    def calculate_distance(coords):
-        if not coords or len(coords) < 2:
-            return 0
-        
-        total_distance = 0
-        for i in range(len(coords) - 1):
-            lat1, lon1 = coords[i]
-            lat2, lon2 = coords[i + 1]
-            # geodesic 거리 계산 (더 정확함)
-            distance = geodesic((lat1, lon1), (lat2, lon2)).meters
-            total_distance += distance
-        return total_distance
-    
-    actual_distance = calculate_distance(best_path) if best_path else 0
+    if actual_distance is None:
+        actual_distance = calculate_distance(best_path) if best_path else 0
     
     # 경로 Feature
     route_feature = {
@@ -99,7 +107,8 @@ def create_enhanced_geojson(best_path, best_contour, target_len, best_score, ima
             "center_lat": center_lat,
             "center_lon": center_lon,
             "route_points": len(best_path) if best_path else 0,
-            "contour_points": len(best_contour) if best_contour else 0
+            "contour_points": len(best_contour) if best_contour else 0,
+            "placements_evaluated": search_stats
         },
         "features": [route_feature, contour_feature]
     }
@@ -122,6 +131,9 @@ def print_route_summary(geojson_data):
     print(f"   - 실제 거리: {props['actual_distance_m']/1000:.2f}km")
     print(f"   - 총 포인트: {props['route_points']}개")
     print(f"   - Fréchet 거리: {props['frechet_score']:.6f}")
+    if props.get('placements_evaluated'):
+        stats = props['placements_evaluated']
+        print(f"   - 평가한 배치: 근사 {stats['coarse']}개, 경로 {stats['full']}개")
     print(f"   - 생성 시간: {props['generated_at']}")
     print(f"   - 이미지 소스: {props['image_source']}")
     print("=" * 50)
@@ -135,7 +147,26 @@ def extract_contour_from_image(image_path):
     img = cv2.imread(image_path)
     if img is None:
         raise ValueError(f"이미지를 불러올 수 없습니다: {image_path}")
-    
+    return contour_from_image(img)
+
+def decode_image(data):
+    """
+    업로드된 이미지 바이트 → BGR 배열 (디스크 저장 없이 메모리에서 디코딩)
+
+    캔버스 PNG 는 배경이 투명하므로 알파 채널을 흰 배경 위에 합성
+    """
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+    if img is None:
+        raise ValueError("이미지를 디코딩할 수 없습니다.")
+    if img.ndim == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    if img.shape[2] == 4:
+        alpha = img[:, :, 3:].astype(np.float32) / 255.0
+        return (img[:, :, :3] * alpha + 255.0 * (1.0 - alpha)).astype(np.uint8)
+    return img
+
+def contour_from_image(img):
+    """BGR 이미지 배열에서 가장 큰 윤곽선 추출"""
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
     kernel = np.ones((5,5), np.uint8)
@@ -152,27 +183,39 @@ def extract_contour_from_image(image_path):
     
     return contour
 
+def contour_from_strokes(strokes, epsilon=3.0):
+    """
+    캔버스 획(폴리라인) → 윤곽선 (extract_contour_from_image 와 같은 형식)
+
+    Args:
+        strokes: 획 하나 [[x, y], ...] 또는 획 목록 [[[x, y], ...], ...] (캔버스 픽셀 좌표)
+                 여러 획은 그린 순서대로 이어서 하나의 닫힌 윤곽선으로 사용
+        epsilon: 이미지 윤곽선과 같은 approxPolyDP 단순화 허용 오차 (픽셀)
+    Returns:
+        np.ndarray: (N, 2) 윤곽선
+    """
+    strokes = [np.asarray(stroke, dtype=np.float64) for stroke in strokes]
+    if strokes and strokes[0].ndim == 1:
+        strokes = [np.stack(strokes)]
+    points = np.concatenate([stroke.reshape(-1, 2) for stroke in strokes]) if strokes else np.zeros((0, 2))
+    if len(points) < 3 or not np.all(np.isfinite(points)):
+        raise ValueError("획 좌표가 3개 이상 필요합니다.")
+    
+    # 연속 중복 점 제거 후 이미지 윤곽선과 같은 방식으로 단순화
+    keep = np.concatenate(([True], np.any(np.diff(points, axis=0) != 0, axis=1)))
+    points = points[keep]
+    approx = cv2.approxPolyDP(points.astype(np.float32).reshape(-1, 1, 2), epsilon, True)
+    contour = approx.reshape(-1, 2).astype(np.float64)
+    if len(contour) < 3 or np.ptp(contour[:, 0]) == 0 or np.ptp(contour[:, 1]) == 0:
+        raise ValueError("획으로 윤곽선을 만들 수 없습니다.")
+    return contour
+
 def load_network_data():
-    """네트워크 데이터 로딩"""
-    # 상대 경로로 데이터 파일 접근
-    nodes_path = "../../../../data/04_final_data/final_nodes.csv"
-    edges_path = "../../../../data/04_final_data/final_edges.geojson"
+    """네트워크 데이터 로딩 (프로세스 공유 그래프 사용)"""
+    wg = get_walk_graph()
+    nodes = wg.nodes_frame()
     
-    print(f"📁 데이터 파일 경로:")
-    print(f"   - nodes: {nodes_path}")
-    print(f"   - edges: {edges_path}")
-    print(f"   - 존재 여부: {os.path.exists(nodes_path)}, {os.path.exists(edges_path)}")
-    
-    nodes = pd.read_csv(nodes_path)
-    edges = gpd.read_file(edges_path)
-    
-    G = nx.Graph()
-    for _, row in nodes.iterrows():
-        G.add_node(row["osmid"], x=row["lon"], y=row["lat"])
-    for _, row in edges.iterrows():
-        G.add_edge(row["u"], row["v"], weight=row["length"])
-    
-    return G, nodes, edges
+    return nodes, wg
 
 def calculate_bbox_info(nodes):
     """bbox 정보 계산"""
@@ -213,127 +256,420 @@ def scale_contour(contour, target_len, bbox_info):
     return contour_scaled, px_to_m
 
 def contour_to_geo(contour_scaled, px_to_m, bbox_info, dx=0, dy=0):
-    """윤곽선을 위경도로 변환"""
-    geo_points = []
+    """윤곽선을 위경도 (N, 2) [lat, lon] 배열로 변환"""
     center_lat, center_lon = bbox_info['center_lat'], bbox_info['center_lon']
     
-    for px, py in contour_scaled:
-        # 픽셀 → 미터
-        dx_m = (px - contour_scaled[:,0].mean()) * px_to_m
-        dy_m = (py - contour_scaled[:,1].mean()) * px_to_m
-        
-        # 미터 → 위경도 변환
-        lon = center_lon + (dx_m / (111320 * np.cos(np.radians(center_lat)))) + dx
-        lat = center_lat - (dy_m / 110540) + dy
-        
-        geo_points.append((lat, lon))
-    return geo_points
-
-def edge_cost(u, n, target_vec, G):
-    """엣지 비용 계산"""
-    ux, uy = G.nodes[u]["x"], G.nodes[u]["y"]
-    nx_, ny_ = G.nodes[n]["x"], G.nodes[n]["y"]
-    
-    vec = np.array([nx_ - ux, ny_ - uy])
-    if np.linalg.norm(vec) < 1e-6:
-        return 1e9
+    # 픽셀 → 미터 (윤곽선 중심 기준)
+    offset_m = (contour_scaled - contour_scaled.mean(0)) * px_to_m
     
-    cos_sim = np.dot(vec, target_vec) / (np.linalg.norm(vec) * np.linalg.norm(target_vec) + 1e-9)
-    dist = np.linalg.norm(vec)
-    
-    return dist * (1 - cos_sim)
+    # 미터 → 위경도 변환
+    lat = center_lat - offset_m[:, 1] / 110540 + dy
+    lon = center_lon + offset_m[:, 0] / (111320 * np.cos(np.radians(center_lat))) + dx
+    return np.column_stack((lat, lon))
 
-def build_route(contour_geo, G, nodes):
-    """경로 생성"""
-    coords = np.vstack((nodes["lat"], nodes["lon"])).T
-    tree = BallTree(np.radians(coords), metric="haversine")
-    
+class ArcDirections:
+    """
+    arc 별 방향 벡터/길이 (그래프 로딩 시 한 번 계산)
+
+    build_route 의 방향 비용은 노드 좌표 (x=lon, y=lat) 차이 벡터 기준:
+    cost = |vec| * (1 - cos(vec, target_vec)), 길이가 거의 0인 arc 는 1e9
+    """
+
+    def __init__(self, wg):
+        self.version = wg.version
+        src, dst = wg.arc_sources(), wg.indices
+        self.vec = np.column_stack((wg.lon[dst] - wg.lon[src], wg.lat[dst] - wg.lat[src]))
+        self.norm = np.hypot(self.vec[:, 0], self.vec[:, 1])
+        self.degenerate = self.norm < 1e-6
+
+    def costs(self, target_vec, arcs=slice(None)):
+        """target_vec 방향 기준 arc 비용 (arcs 로 일부 arc 만 계산 가능)"""
+        target_vec = np.asarray(target_vec, dtype=np.float64)
+        vec, norm = self.vec[arcs], self.norm[arcs]
+        cos_sim = (vec @ target_vec) / (norm * np.hypot(*target_vec) + 1e-9)
+        return np.where(self.degenerate[arcs], 1e9, norm * (1 - cos_sim))
+
+_arc_directions = {}
+
+def get_arc_directions(wg):
+    """그래프 버전별 ArcDirections (한 번만 계산)"""
+    key = wg.version or id(wg)
+    if key not in _arc_directions:
+        _arc_directions[key] = ArcDirections(wg)
+    return _arc_directions[key]
+
+# 공유 그래프 로딩 시 arc 방향 테이블도 같이 계산
+add_load_hook(get_arc_directions)
+
+# 구간 최단 경로 탐색 범위: 두 스냅 노드를 감싸는 bbox + 여유 (구간 길이 배수, 최소값)
+CORRIDOR_FACTOR = 1.0
+CORRIDOR_MIN_M = 300
+
+def segment_path(wg, directions, u, v):
+    """
+    노드 u → v 방향 비용 최단 경로 (노드 인덱스 리스트, 없으면 None)
+
+    두 노드 주변 통로(corridor) 창 안에서만 탐색하고, 통로 안에서 이어지지 않으면 전체 그래프에서 탐색
+    """
+    if u == v:
+        return [u]
+    target_vec = (wg.lon[v] - wg.lon[u], wg.lat[v] - wg.lat[u])
+    
+    lat = (wg.lat[u], wg.lat[v])
+    lon = (wg.lon[u], wg.lon[v])
+    margin_m = max(CORRIDOR_MIN_M, CORRIDOR_FACTOR * geodesic((lat[0], lon[0]), (lat[1], lon[1])).m)
+    margin_lat = margin_m / 110540
+    margin_lon = margin_m / (111320 * np.cos(np.radians(lat[0])))
+    view = wg.window_view(min(lat) - margin_lat, max(lat) + margin_lat,
+                          min(lon) - margin_lon, max(lon) + margin_lon)
+    path = view.arc_shortest_path(u, v, directions.costs(target_vec, view.arc_pos))
+    if path is None:
+        path = wg.arc_shortest_path(u, v, directions.costs(target_vec))
+    return path
+
+def build_route(contour_geo, wg, snapper):
+    """경로 생성: 윤곽선 (N, 2) [lat, lon] → 경로 노드 좌표 (M, 2) [lat, lon] (경로가 없으면 M = 0)"""
     contour_sampled = contour_geo[::max(1, len(contour_geo)//100)]
     
-    snapped_nodes = []
-    for lat, lon in contour_sampled:
-        _, idx = tree.query([np.radians([lat, lon])], k=1)
-        node = nodes.iloc[idx[0][0]]
-        snapped_nodes.append(node["osmid"])
+    # 샘플링한 윤곽선 점들을 공유 스냅 인덱스로 한 번에 스냅
+    snapped, _ = snapper.snap(contour_sampled)
+    directions = get_arc_directions(wg)
     
-    route_coords = []
-    for i in range(len(snapped_nodes) - 1):
-        u, v = snapped_nodes[i], snapped_nodes[i+1]
-        
-        ux, uy = G.nodes[u]["x"], G.nodes[u]["y"]
-        vx, vy = G.nodes[v]["x"], G.nodes[v]["y"]
-        target_vec = np.array([vx - ux, vy - uy])
-        
-        def weight_func(a, b, d):
-            return edge_cost(a, b, target_vec, G)
-        
-        try:
-            path = nx.dijkstra_path(G, u, v, weight=weight_func)
-            for n in path:
-                route_coords.append((G.nodes[n]["y"], G.nodes[n]["x"]))
-        except nx.NetworkXNoPath:
+    route_nodes = []
+    for u, v in zip(snapped[:-1].tolist(), snapped[1:].tolist()):
+        path = segment_path(wg, directions, u, v)
+        if path is None:
             continue
-    return route_coords
-
-@lru_cache(maxsize=None)
-def _c(i, j, P, Q):
-    """Fréchet distance 계산 (캐시된 버전)"""
-    if i == 0 and j == 0:
-        return euclidean(P[0], Q[0])
-    elif i > 0 and j == 0:
-        return max(_c(i-1, 0, P, Q), euclidean(P[i], Q[0]))
-    elif i == 0 and j > 0:
-        return max(_c(0, j-1, P, Q), euclidean(P[0], Q[j]))
-    elif i > 0 and j > 0:
-        return max(
-            min(_c(i-1, j, P, Q), _c(i-1, j-1, P, Q), _c(i, j-1, P, Q)),
-            euclidean(P[i], Q[j])
-        )
-    else:
+        route_nodes.append(path)
+    if not route_nodes:
+        return np.zeros((0, 2))
+    route_nodes = np.concatenate(route_nodes)
+    return np.column_stack((wg.lat[route_nodes], wg.lon[route_nodes]))
+
+def frechet_distance(P, Q, threshold=float("inf")):
+    """
+    이산 Fréchet distance 계산 (반복 + 벡터화 버전)
+
+    커플링 행렬을 반대각선(i + j = k) 단위로 채우므로 같은 대각선의 셀들은
+    서로 의존하지 않아 NumPy 로 한 번에 계산되고, 대각선 2개 분량
+    O(min(n, m)) 메모리만 사용함
+
+    Args:
+        P, Q: (N, 2), (M, 2) 좌표 배열
+        threshold: 조기 종료 기준 (현재 최고 점수). 커플링 경로는 연속한 두
+            반대각선 중 적어도 하나를 지나고 경로를 따라 값이 줄지 않으므로,
+            두 대각선의 최솟값이 threshold 이상이면 더 좋은 점수가 나올 수
+            없어 바로 inf 반환
+    Returns:
+        float: Fréchet distance (조기 종료 시 inf)
+    """
+    P = np.asarray(P, dtype=np.float64).reshape(-1, 2)
+    Q = np.asarray(Q, dtype=np.float64).reshape(-1, 2)
+    if len(P) == 0 or len(Q) == 0:
         return float("inf")
+    # Fréchet distance 는 대칭이므로 짧은 쪽을 열(Q)로 둬서 버퍼 크기를 min(n, m) 으로
+    if len(P) < len(Q):
+        P, Q = Q, P
+    n, m = len(P), len(Q)
 
-def frechet_distance(P, Q):
-    """Fréchet distance 계산"""
-    P = tuple(map(tuple, P))
-    Q = tuple(map(tuple, Q))
-    return _c(len(P)-1, len(Q)-1, P, Q)
+    # 버퍼[j + 1] = 해당 대각선의 (k - j, j) 셀 값, 버퍼[0] 은 j = -1 경계 (inf)
+    prev2 = np.full(m + 1, np.inf)
+    prev = np.full(m + 1, np.inf)
+    cur = np.full(m + 1, np.inf)
+    for k in range(n + m - 1):
+        j_lo, j_hi = max(0, k - n + 1), min(k, m - 1)
+        j = np.arange(j_lo, j_hi + 1)
+        d = np.hypot(*(P[k - j] - Q[j]).T)
 
-def find_optimal_route(contour_scaled, px_to_m, bbox_info, G, nodes, target_len):
-    """최적 경로 탐색"""
-    best_path = None
-    best_score = float("inf")
-    best_contour = None
-    
-    # 슬라이딩 탐색
+        cur.fill(np.inf)
+        if k == 0:
+            cur[1] = d[0]
+        else:
+            # (i-1, j), (i, j-1) 은 직전 대각선, (i-1, j-1) 은 두 대각선 전
+            best_prev = np.minimum(np.minimum(prev[j + 1], prev[j]), prev2[j])
+            cur[j + 1] = np.maximum(best_prev, d)
+
+        if min(prev.min(), cur.min()) >= threshold:
+            return float("inf")
+        prev2, prev, cur = prev, cur, prev2
+
+    return float(prev[m])
+
+def placement_grid(bbox_info, steps=15):
+    """
+    슬라이딩 탐색할 배치 목록 (dx 바깥, dy 안쪽 순서)
+
+    배치는 (dx, dy, scale, rotation) - 위경도 이동량, 중심 기준 배율, 회전 각도(도)
+    """
     dx_vals = np.linspace(bbox_info['min_lon'] - bbox_info['center_lon'], 
-                         bbox_info['max_lon'] - bbox_info['center_lon'], 15)
+                         bbox_info['max_lon'] - bbox_info['center_lon'], steps)
     dy_vals = np.linspace(bbox_info['min_lat'] - bbox_info['center_lat'], 
-                         bbox_info['max_lat'] - bbox_info['center_lat'], 15)
-    
-    for dx in dx_vals:
-        for dy in dy_vals:
-            shifted = contour_to_geo(contour_scaled, px_to_m, bbox_info, dx=dx, dy=dy)
-            route_coords = build_route(shifted, G, nodes)
-            if not route_coords:
-                continue
-            score = frechet_distance(np.array(shifted), np.array(route_coords))
-            if score < best_score:
-                best_score = score
-                best_path = route_coords
-                best_contour = shifted
-    
-    return best_path, best_contour, best_score
-
-def create_visualization(best_path, best_contour, edges, bbox_info, output_path="map.html"):
-    """시각화 생성"""
-    m = folium.Map(location=[bbox_info['center_lat'], bbox_info['center_lon']], 
-                   zoom_start=14, tiles="cartodbpositron")
-    
-    # 네트워크 전체 (회색)
-    for _, row in edges.iterrows():
-        coords_edge = list(row["geometry"].coords)
-        folium.PolyLine([(lat, lon) for lon, lat in coords_edge],
-                        color="gray", weight=1, opacity=0.3).add_to(m)
+                         bbox_info['max_lat'] - bbox_info['center_lat'], steps)
+    return [(dx, dy, 1.0, 0.0) for dx in dx_vals for dy in dy_vals]
+
+def transform_contour(contour_scaled, scale=1.0, rotation=0.0):
+    """윤곽선(픽셀)을 중심 기준으로 배율/회전 (중심은 그대로)"""
+    if scale == 1.0 and rotation == 0.0:
+        return contour_scaled
+    center = contour_scaled.mean(0)
+    theta = np.radians(rotation)
+    rot = np.array([[np.cos(theta), -np.sin(theta)],
+                    [np.sin(theta), np.cos(theta)]])
+    return (contour_scaled - center) @ rot.T * scale + center
+
+class ContourPlacer:
+    """
+    배치별 윤곽선 위경도 좌표
+
+    배율/회전별 기본 투영(이동량 0)은 한 번만 계산하고, 배치마다 이동량 벡터만 더함
+    """
+
+    def __init__(self, contour_scaled, px_to_m, bbox_info):
+        self.contour_scaled = contour_scaled
+        self.px_to_m = px_to_m
+        self.bbox_info = bbox_info
+        self._bases = {}
+
+    def base(self, scale=1.0, rotation=0.0):
+        key = (float(scale), float(rotation))
+        if key not in self._bases:
+            self._bases[key] = contour_to_geo(transform_contour(self.contour_scaled, scale, rotation),
+                                              self.px_to_m, self.bbox_info)
+        return self._bases[key]
+
+    def __call__(self, placement):
+        """배치 (dx, dy, scale, rotation) 에 놓인 윤곽선 (N, 2) [lat, lon]"""
+        dx, dy, scale, rotation = placement
+        return self.base(scale, rotation) + (dy, dx)
+
+def snapping_score(contour_geo, snapper):
+    """
+    배치의 빠른 근사 점수: 윤곽선 점들이 가장 가까운 노드까지 떨어진 거리의 90% 분위수 (m)
+
+    경로는 노드만 지나므로 이 거리는 Fréchet 거리의 하한에 가깝고,
+    윤곽선 일부가 네트워크가 성긴 곳에 걸칠수록 커짐
+    """
+    _, distances = snapper.snap(contour_geo)
+    return float(np.percentile(distances, 90))
+
+def evaluate_placements(contour_scaled, px_to_m, bbox_info, placements, wg, threshold=float("inf")):
+    """
+    (번호, 배치) 목록을 번호 순서대로 build_route + Fréchet 로 평가
+
+    Returns:
+        (best_score, best_index, best_path, best_contour)
+        - threshold 보다 좋은 배치가 없으면 (threshold, -1, None, None)
+    """
+    snapper = get_snapper(wg)
+    placer = ContourPlacer(contour_scaled, px_to_m, bbox_info)
+    best = (threshold, -1, None, None)
+    
+    for index, placement in placements:
+        shifted = placer(placement)
+        route_coords = build_route(shifted, wg, snapper)
+        if len(route_coords) == 0:
+            continue
+        score = frechet_distance(shifted, route_coords, threshold=best[0])
+        if score < best[0]:
+            best = (score, index, route_coords, shifted)
+    
+    return best
+
+def evaluate_each_placement(contour_scaled, px_to_m, bbox_info, placements, wg):
+    """
+    배치마다 build_route + Fréchet 점수 (지역별 점수가 모두 필요한 시작 배치 평가용)
+
+    Returns:
+        [(index, score, path, contour), ...] - 경로가 없는 배치는 (index, inf, None, None)
+    """
+    results = []
+    for index, placement in placements:
+        score, _, path, contour = evaluate_placements(contour_scaled, px_to_m, bbox_info, [(index, placement)], wg)
+        results.append((index, score, path, contour))
+    return results
+
+# 배치 탐색용 프로세스 풀 (워커 수별로 한 번만 생성)
+PLACEMENT_WORKERS = int(os.environ.get('SOOMGIL_PLACEMENT_WORKERS', os.cpu_count() or 1))
+_placement_pools = {}
+
+def _init_placement_worker():
+    """워커 프로세스 준비: 공유 그래프(스냅샷 mmap)와 스냅 인덱스, arc 방향 테이블"""
+    wg = get_walk_graph()
+    get_snapper(wg)
+    get_arc_directions(wg)
+
+def _evaluate_placement_chunk(args):
+    contour_scaled, px_to_m, bbox_info, placements, threshold = args
+    return evaluate_placements(contour_scaled, px_to_m, bbox_info, placements, get_walk_graph(), threshold)
+
+def _evaluate_each_placement_chunk(args):
+    contour_scaled, px_to_m, bbox_info, placements = args
+    return evaluate_each_placement(contour_scaled, px_to_m, bbox_info, placements, get_walk_graph())
+
+def get_placement_pool(workers):
+    """
+    워커 수별 ProcessPoolExecutor
+
+    요청 스레드에서 처음 필요할 때 만들어지고, 그 시점의 서버 프로세스에는 그래프 warm-up,
+    MusicGen 디스패처, 타일/오디오 캐시 락 등을 쥔 스레드가 돌고 있으므로 fork 하지 않음
+    (잠긴 락을 물려받은 워커가 멈출 수 있음). forkserver(없으면 spawn)로 깨끗한 프로세스에서
+    워커를 만들고, 각 워커는 그래프를 스냅샷 mmap 으로 로딩해서 페이지 캐시를 공유
+    """
+    if workers not in _placement_pools:
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        if context.get_start_method() == 'forkserver':
+            # 무거운 모듈(cv2, folium) import 는 forkserver 에서 한 번만
+            context.set_forkserver_preload([__name__])
+        _placement_pools[workers] = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_placement_worker
+        )
+    return _placement_pools[workers]
+
+def evaluate_placements_parallel(contour_scaled, px_to_m, bbox_info, placements, wg, workers=None,
+                                 threshold=float("inf")):
+    """
+    evaluate_placements 를 프로세스 풀에서 실행
+
+    workers > 1 이면 배치들을 워커 수만큼 번갈아 나눠서 (밀집/외곽 지역이 고르게 섞이도록)
+    평가하고, (점수, 배치 번호) 최솟값으로 합쳐서 순차 평가와 같은 결과를 반환
+    """
+    workers = min(workers or PLACEMENT_WORKERS, len(placements))
+    if workers <= 1:
+        return evaluate_placements(contour_scaled, px_to_m, bbox_info, placements, wg, threshold)
+    
+    chunks = [placements[i::workers] for i in range(workers)]
+    pool = get_placement_pool(workers)
+    results = pool.map(_evaluate_placement_chunk,
+                       [(contour_scaled, px_to_m, bbox_info, chunk, threshold) for chunk in chunks])
+    return min(results, key=lambda result: (result[0], result[1]))
+
+def evaluate_each_placement_parallel(contour_scaled, px_to_m, bbox_info, placements, wg, workers=None):
+    """
+    evaluate_each_placement 를 프로세스 풀에서 한 번에 실행
+
+    배치들을 워커 수만큼 번갈아 나눠 pool.map 한 번으로 평가하고, 입력 순서대로
+    [(score, path, contour), ...] 를 반환
+    """
+    workers = min(workers or PLACEMENT_WORKERS, len(placements))
+    indexed = list(enumerate(placements))
+    if workers <= 1:
+        results = evaluate_each_placement(contour_scaled, px_to_m, bbox_info, indexed, wg)
+    else:
+        chunks = [indexed[i::workers] for i in range(workers)]
+        pool = get_placement_pool(workers)
+        results = [result for chunk_results in pool.map(
+            _evaluate_each_placement_chunk, [(contour_scaled, px_to_m, bbox_info, chunk) for chunk in chunks]
+        ) for result in chunk_results]
+    return [result[1:] for result in sorted(results, key=lambda result: result[0])]
+
+def _as_coords(points):
+    """(N, 2) 배열 → GeoJSON/지도 출력용 [(lat, lon), ...] (없으면 None)"""
+    return None if points is None else [tuple(point) for point in points.tolist()]
+
+def find_optimal_route(contour_scaled, px_to_m, bbox_info, wg, target_len, workers=None):
+    """최적 경로 탐색 (15×15 격자 전수 탐색)"""
+    placements = list(enumerate(placement_grid(bbox_info)))
+    best_score, _, best_path, best_contour = evaluate_placements_parallel(
+        contour_scaled, px_to_m, bbox_info, placements, wg, workers
+    )
+    return _as_coords(best_path), _as_coords(best_contour), best_score
+
+# 단계적 배치 탐색 기본값
+SEARCH_SCALES = (0.9, 1.0, 1.1)
+SEARCH_ROTATIONS = (-30.0, -15.0, 0.0, 15.0, 30.0)
+
+def optimize_placement(contour_scaled, px_to_m, bbox_info, wg, steps=15, top_k=24, refine_k=3,
+                       refine_rounds=3, scales=SEARCH_SCALES, rotations=SEARCH_ROTATIONS, workers=None):
+    """
+    단계적(coarse-to-fine) 최적 경로 탐색
+
+    1. 격자 이동 × 배율 × 회전 배치 전체를 스냅 거리 점수(snapping_score)로만 빠르게 평가
+    2. 점수가 좋은 순서로 서로 한 격자 칸 이상 떨어진 top_k 개 지역을 고르고
+       지역별 시작 배치를 build_route + Fréchet 로 평가
+    3. Fréchet 점수가 좋은 refine_k 개 지역만 이동/배율/회전을 ±간격씩 바꿔 가며
+       build_route + Fréchet 로 국소 탐색 (나아지지 않으면 간격 절반)
+
+    Returns:
+        (best_path, best_contour, best_score, stats)
+        stats: {'coarse': 스냅 거리로만 평가한 배치 수, 'full': build_route + Fréchet 로 평가한 배치 수,
+                'best_placement': [dx, dy, scale, rotation]}
+    """
+    snapper = get_snapper(wg)
+    placer = ContourPlacer(contour_scaled, px_to_m, bbox_info)
+    
+    # 1. 스냅 거리로 전체 격자 평가
+    coarse = [(dx, dy, scale, rotation)
+              for dx, dy, _, _ in placement_grid(bbox_info, steps)
+              for scale in scales for rotation in rotations]
+    coarse_scores = np.array([
+        snapping_score(placer(placement), snapper)
+        for placement in coarse
+    ])
+    
+    # 2. 서로 다른 지역의 상위 top_k 개 시작 배치
+    step_x = (bbox_info['max_lon'] - bbox_info['min_lon']) / max(steps - 1, 1)
+    step_y = (bbox_info['max_lat'] - bbox_info['min_lat']) / max(steps - 1, 1)
+    seeds = []
+    for i in np.argsort(coarse_scores, kind='stable'):
+        candidate = coarse[i]
+        if all(abs(candidate[0] - seed[0]) > step_x * 1.5 or abs(candidate[1] - seed[1]) > step_y * 1.5
+               for seed in seeds):
+            seeds.append(candidate)
+        if len(seeds) == top_k:
+            break
+    
+    # 시작 배치는 지역별 점수가 모두 필요하므로 한 번의 풀 호출로 배치별 결과를 받음
+    seed_results = evaluate_each_placement_parallel(contour_scaled, px_to_m, bbox_info, seeds, wg, workers)
+    full_count = len(seeds)
+    regions = []
+    for seed, (score, path, contour) in zip(seeds, seed_results):
+        regions.append((score, seed, path, contour))
+    
+    # 3. 상위 refine_k 개 지역 국소 탐색
+    scale_step = np.diff(sorted(scales)).min() if len(scales) > 1 else 0.0
+    rotation_step = np.diff(sorted(rotations)).min() if len(rotations) > 1 else 0.0
+    refined = []
+    for region_score, current, path, contour in sorted(regions, key=lambda region: region[0])[:refine_k]:
+        if path is None:
+            continue
+        deltas = np.array([step_x, step_y, scale_step, rotation_step]) / 2
+        for _ in range(refine_rounds):
+            neighbors = []
+            for axis in range(4):
+                for sign in (-1, 1):
+                    if deltas[axis] > 0:
+                        neighbor = list(current)
+                        neighbor[axis] += sign * deltas[axis]
+                        neighbors.append(tuple(neighbor))
+            # 지역 최고 점수를 넘지 못하는 이웃은 Fréchet 계산 중간에 포기
+            score, index, neighbor_path, neighbor_contour = evaluate_placements_parallel(
+                contour_scaled, px_to_m, bbox_info, list(enumerate(neighbors)), wg, workers,
+                threshold=region_score
+            )
+            full_count += len(neighbors)
+            if index >= 0:
+                region_score, current, path, contour = score, neighbors[index], neighbor_path, neighbor_contour
+            else:
+                deltas /= 2
+        refined.append((region_score, current, path, contour))
+    
+    candidates = [region for region in refined + regions if region[2] is not None]
+    if not candidates:
+        return None, None, float("inf"), {'coarse': len(coarse), 'full': full_count, 'best_placement': None}
+    
+    best_score, best_placement, best_path, best_contour = min(candidates, key=lambda region: region[0])
+    stats = {
+        'coarse': len(coarse),
+        'full': full_count,
+        'best_placement': [float(v) for v in best_placement],
+    }
+    return _as_coords(best_path), _as_coords(best_contour), best_score, stats
+
+def create_visualization(best_path, best_contour, wg, bbox_info, output_path="map.html"):
+    """시각화 생성 (디버그용, 네트워크 전체는 그래프 버전별로 미리 직렬화한 레이어 재사용)"""
+    m = debug_map(wg, [bbox_info['center_lat'], bbox_info['center_lon']],
+                  zoom_start=14, tiles="cartodbpositron")
     
     # 빨강 윤곽선 (최적 위치)
     if best_contour:
@@ -348,7 +684,91 @@ def create_visualization(best_path, best_contour, edges, bbox_info, output_path=
     m.save(output_path)
     return output_path
 
-def generate_custom_route(image_path, target_len=5000, output_dir="./"):
+def solve_custom_route(contour, target_len=5000, use_cache=True, use_templates=True, workers=None):
+    """
+    윤곽선(픽셀) → 최적 배치 경로 (템플릿 인덱스, 경로 캐시 사용)
+
+    같은 모양(위치/크기 정규화한 윤곽선) + 목표 거리 + 그래프 버전이면 다시 탐색하지 않고
+    미리 계산한 템플릿 인덱스나 디스크 캐시 결과를 반환
+
+    Returns:
+        (route, cache_hit)
+        route: {'path': [(lat, lon), ...], 'contour': [(lat, lon), ...], 'score': Fréchet 점수,
+                'stats': 배치 탐색 통계, 'center': [center_lat, center_lon], 'distance_m': 경로 거리}
+    """
+    nodes, wg = load_network_data()
+    cache = get_route_cache() if use_cache else None
+    key = route_cache_key(contour, target_len, wg.version)
+    templates = get_template_index(wg.version) if use_templates else None
+    if templates is not None and templates.by_key(key) is not None:
+        print(f"⚡ 템플릿 인덱스 적중: {key}")
+        return templates.by_key(key), True
+    if cache is not None:
+        route = cache.get(wg.version, key)
+        if route is not None:
+            print(f"⚡ 경로 캐시 적중: {key}")
+            return route, True
+    
+    bbox_info = calculate_bbox_info(nodes)
+    contour_scaled, px_to_m = scale_contour(contour, target_len, bbox_info)
+    best_path, best_contour, best_score, search_stats = optimize_placement(
+        contour_scaled, px_to_m, bbox_info, wg, workers=workers
+    )
+    route = {
+        'path': best_path,
+        'contour': best_contour,
+        'score': best_score,
+        'stats': search_stats,
+        'center': [bbox_info['center_lat'], bbox_info['center_lon']],
+        'distance_m': calculate_distance(best_path) if best_path else 0,
+    }
+    if cache is not None and best_path:
+        cache.put(wg.version, key, route)
+    return route, False
+
+def custom_route_geojson(image_path, target_len=5000, use_cache=True):
+    """
+    이미지 → 커스텀 산책로 GeoJSON (파일 저장 없음)
+
+    Returns:
+        (geojson_data, route, cache_hit) - route 는 solve_custom_route 반환값
+    """
+    contour = extract_contour_from_image(image_path)
+    print(f"✅ 윤곽선 추출 완료: {len(contour)}개 포인트")
+    
+    image_name = os.path.basename(image_path).split('.')[0]
+    return contour_route_geojson(contour, target_len, image_name, use_cache)
+
+def contour_route_geojson(contour, target_len=5000, image_name="custom_image", use_cache=True):
+    """
+    윤곽선(픽셀) → 커스텀 산책로 GeoJSON
+
+    Returns:
+        (geojson_data, route, cache_hit) - route 는 solve_custom_route 반환값
+    """
+    route, cache_hit = solve_custom_route(contour, target_len, use_cache)
+    geojson_data, _ = create_enhanced_geojson(
+        route['path'], route['contour'], target_len, route['score'],
+        image_name, route['center'][0], route['center'][1], route['stats'], route['distance_m']
+    )
+    return geojson_data, route, cache_hit
+
+def template_route_geojson(name, target_len=5000):
+    """
+    기본 제공 템플릿 이름으로 미리 계산한 경로 GeoJSON (인덱스에 없으면 None)
+    """
+    _, wg = load_network_data()
+    templates = get_template_index(wg.version)
+    route = templates.by_name(name, target_len) if templates is not None else None
+    if route is None:
+        return None
+    geojson_data, _ = create_enhanced_geojson(
+        route['path'], route['contour'], target_len, route['score'],
+        name, route['center'][0], route['center'][1], route['stats'], route['distance_m']
+    )
+    return geojson_data
+
+def generate_custom_route(image_path, target_len=5000, output_dir="./", render_map=None):
     """
     메인 함수: 이미지에서 커스텀 산책로 생성
     
@@ -356,6 +776,7 @@ def generate_custom_route(image_path, target_len=5000, output_dir="./"):
         image_path: 입력 이미지 경로
         target_len: 목표 거리 (미터)
         output_dir: 출력 디렉토리
+        render_map: map_<이미지명>.html 생성 여부 (None 이면 SOOMGIL_MAP_DEBUG 설정 따름)
     
     Returns:
         str: 생성된 GeoJSON 파일 경로
@@ -365,28 +786,13 @@ def generate_custom_route(image_path, target_len=5000, output_dir="./"):
         print(f"📁 이미지 파일 존재 여부: {os.path.exists(image_path)}")
         print(f"📁 이미지 파일 크기: {os.path.getsize(image_path)} bytes")
         
-        # 1. 윤곽선 추출
-        contour = extract_contour_from_image(image_path)
-        print(f"✅ 윤곽선 추출 완료: {len(contour)}개 포인트")
-        
-        # 2. 네트워크 데이터 로딩
-        G, nodes, edges = load_network_data()
-        print("✅ 네트워크 데이터 로딩 완료")
-        
-        # 3. bbox 정보 계산
-        bbox_info = calculate_bbox_info(nodes)
-        print(f"✅ bbox 정보 계산 완료: 중심점 ({bbox_info['center_lat']:.6f}, {bbox_info['center_lon']:.6f})")
-        
-        # 4. 윤곽선 스케일링
-        contour_scaled, px_to_m = scale_contour(contour, target_len, bbox_info)
-        print(f"✅ 윤곽선 스케일링 완료: 목표 거리 {target_len}m")
-        
-        # 5. 최적 경로 탐색
+        # 1~5. 윤곽선 추출, 최적 경로 탐색 (경로 캐시 사용)
         print("🔍 최적 경로 탐색 중...")
-        best_path, best_contour, best_score = find_optimal_route(
-            contour_scaled, px_to_m, bbox_info, G, nodes, target_len
-        )
-        print(f"✅ 최적 경로 탐색 완료: Fréchet 거리 {best_score:.6f}")
+        geojson_data, route, cache_hit = custom_route_geojson(image_path, target_len)
+        best_path, best_contour, best_score = route['path'], route['contour'], route['score']
+        print(f"✅ 최적 경로 탐색 완료: Fréchet 거리 {best_score:.6f} "
+              f"(근사 평가 {route['stats']['coarse']}개, 경로 평가 {route['stats']['full']}개"
+              f"{', 캐시' if cache_hit else ''})")
         
         # 6. GeoJSON 저장 (generate_and_save_route 대신 직접 저장)
         image_name = os.path.basename(image_path).split('.')[0]
@@ -396,27 +802,25 @@ def generate_custom_route(image_path, target_len=5000, output_dir="./"):
         print(f"   - 윤곽선 포인트 수: {len(best_contour) if best_contour else 0}")
         print(f"   - Fréchet 점수: {best_score:.6f}")
         
-        geojson_data, timestamp = create_enhanced_geojson(
-            best_path, best_contour, target_len, best_score,
-            image_name, bbox_info['center_lat'], bbox_info['center_lon']
-        )
-        
         # 파일명 통일
         filename = "custom_route.geojson"
         geojson_path = os.path.join(output_dir, filename)
         
         with open(geojson_path, 'w', encoding='utf-8') as f:
-            json.dump(geojson_data, f, ensure_ascii=False, indent=2)
+            json.dump(geojson_data, f, ensure_ascii=False, separators=(',', ':'))
         
         print(f"✅ GeoJSON 파일이 저장되었습니다: {geojson_path}")
         
         # 경로 요약 출력
         print_route_summary(geojson_data)
         
-        # 7. 시각화 생성
-        map_path = os.path.join(output_dir, f"map_{image_name}.html")
-        create_visualization(best_path, best_contour, edges, bbox_info, map_path)
-        print(f"✅ 시각화 생성 완료: {map_path}")
+        # 7. 시각화 생성 (디버그 전용)
+        if MAP_DEBUG if render_map is None else render_map:
+            nodes, wg = load_network_data()
+            bbox_info = calculate_bbox_info(nodes)
+            map_path = os.path.join(output_dir, f"map_{image_name}.html")
+            create_visualization(best_path, best_contour, wg, bbox_info, map_path)
+            print(f"✅ 시각화 생성 완료: {map_path}")
         
         return geojson_path
         
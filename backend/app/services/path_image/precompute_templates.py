@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+기본 제공 모양 템플릿 경로 미리 계산
+
+test_image/ 의 모든 템플릿 × 목표 거리(2, 3, 5, 8km)에 대해 최적 배치 탐색을
+모든 코어에서 나눠 실행하고, 최적 배치/경로/Fréchet 점수를 template_index.json 에 저장합니다.
+/api/upload 는 템플릿 선택이나 같은 모양 업로드를 이 인덱스에서 바로 반환합니다.
+그래프 스냅샷이 바뀌면 다시 실행해야 합니다.
+
+사용법: python precompute_templates.py [워커 수]
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from image_path_enhanced import extract_contour_from_image, load_network_data, solve_custom_route
+from route_cache import route_cache_key
+from template_index import (
+    TEMPLATE_DIR, TEMPLATE_INDEX_PATH, TEMPLATE_TARGET_LENGTHS,
+    compact_route, template_names, reset_template_index
+)
+
+
+def _solve_template(job):
+    """(템플릿 이름, 목표 거리) 하나 계산 (워커 프로세스)"""
+    name, target_len = job
+    started = time.time()
+    contour = extract_contour_from_image(os.path.join(TEMPLATE_DIR, f"{name}.png"))
+    # 템플릿 잡 단위로 병렬 실행하므로 배치 탐색은 워커 안에서 순차 실행
+    route, _ = solve_custom_route(contour, target_len, use_cache=False, use_templates=False, workers=1)
+    _, wg = load_network_data()
+    return name, target_len, route_cache_key(contour, target_len, wg.version), route, time.time() - started
+
+
+def precompute_templates(workers=None, output_path=TEMPLATE_INDEX_PATH):
+    started = time.time()
+    _, wg = load_network_data()
+    jobs = [(name, target_len) for name in template_names() for target_len in TEMPLATE_TARGET_LENGTHS]
+    workers = workers or os.cpu_count() or 1
+    print(f"🧮 템플릿 {len(jobs) // len(TEMPLATE_TARGET_LENGTHS)}개 × 목표 거리 {len(TEMPLATE_TARGET_LENGTHS)}개 "
+          f"= {len(jobs)}개 계산 (워커 {workers}개)")
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    templates, routes = {}, {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for name, target_len, key, route, elapsed in pool.map(_solve_template, jobs):
+            entry = templates.setdefault(name, {'contour_keys': {}, 'compute_s': 0.0})
+            entry['compute_s'] = round(entry['compute_s'] + elapsed, 2)
+            if not route['path']:
+                print(f"❌ {name:<12} {target_len/1000:>4.1f}km  경로 없음 ({elapsed:.1f}s)")
+                continue
+            entry['contour_keys'][str(target_len)] = key
+            routes[key] = compact_route(route)
+            print(f"✅ {name:<12} {target_len/1000:>4.1f}km  Fréchet {route['score']:.6f}  "
+                  f"거리 {route['distance_m']/1000:.2f}km  배치 {route['stats']['full']}개  ({elapsed:.1f}s)")
+
+    index = {
+        'graph_version': wg.version,
+        'target_lengths': list(TEMPLATE_TARGET_LENGTHS),
+        'templates': templates,
+        'routes': routes,
+    }
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, output_path)
+    reset_template_index()
+
+    total_s = time.time() - started
+    print("=" * 60)
+    print(f"✅ 템플릿 인덱스 저장: {output_path} ({os.path.getsize(output_path) / 1024:.1f} KB, 경로 {len(routes)}개)")
+    print(f"   - 그래프 버전: {wg.version}")
+    print(f"   - 총 소요 시간: {total_s:.1f}s (잡 합계 {sum(t['compute_s'] for t in templates.values()):.1f}s)")
+    return index
+
+
+if __name__ == '__main__':
+    precompute_templates(int(sys.argv[1]) if len(sys.argv) > 1 else None)
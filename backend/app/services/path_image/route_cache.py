@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+
+# 이미지 경로 결과 디스크 캐시 (윤곽선 내용 주소 기반, LRU + 용량 제한)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get('SOOMGIL_ROUTE_CACHE_DIR', os.path.join(CURRENT_DIR, 'cache', 'routes'))
+CACHE_MAX_BYTES = int(float(os.environ.get('SOOMGIL_ROUTE_CACHE_MB', 64)) * 1024 * 1024)
+
+# 배치 탐색 알고리즘이 바뀌어 결과가 달라지면 올려서 기존 캐시를 무효화
+CACHE_FORMAT_VERSION = 1
+
+
+def normalize_contour(contour):
+    """
+    윤곽선(픽셀) 정규화: 중심 이동 후 둘레 길이로 나눔
+
+    scale_contour/contour_to_geo 결과는 윤곽선의 위치와 크기(균일 배율)에 무관하므로
+    같은 모양을 다른 크기/위치로 그린 이미지도 같은 키가 되도록 함 (점 순서는 유지)
+    """
+    contour = np.asarray(contour, dtype=np.float64).reshape(-1, 2)
+    centered = contour - contour.mean(0)
+    length = np.sum(np.hypot(*np.diff(contour, axis=0).T))
+    return np.round(centered / length if length > 0 else centered, 6) + 0.0
+
+
+def route_cache_key(contour, target_len, graph_version):
+    """정규화된 윤곽선 + 목표 거리 + 그래프 버전 해시"""
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_FORMAT_VERSION}:{graph_version}:{int(target_len)}:".encode('utf-8'))
+    digest.update(normalize_contour(contour).tobytes())
+    return digest.hexdigest()[:32]
+
+
+class RouteCache:
+    """
+    이미지 경로 결과 디스크 캐시
+
+    - 항목: <그래프 버전>_<키>.json 파일 하나
+    - LRU: 조회/저장 시 파일 mtime 갱신, 전체 크기가 max_bytes 를 넘으면 오래된 것부터 삭제
+    - 그래프 버전이 바뀌면 이전 버전 항목을 모두 삭제
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, version, key):
+        return os.path.join(self.cache_dir, f"{version}_{key}.json")
+
+    def _entries(self):
+        """[(mtime, size, 경로), ...] 오래된 순"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def _use_version(self, version):
+        """그래프 버전이 바뀌었으면 다른 버전 항목 삭제"""
+        if version == self._version:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        removed = 0
+        for _, _, path in self._entries():
+            if not os.path.basename(path).startswith(f"{version}_"):
+                self._remove(path)
+                removed += 1
+        if removed:
+            print(f"🗑️ 그래프 버전 변경으로 경로 캐시 {removed}개 삭제")
+        self._version = version
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def get(self, version, key):
+        """캐시된 결과 (dict) 또는 None"""
+        with self._lock:
+            self._use_version(version)
+            path = self._path(version, key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                os.utime(path)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def put(self, version, key, entry):
+        """결과 저장 후 용량 제한에 맞게 오래된 항목 삭제"""
+        with self._lock:
+            self._use_version(version)
+            path = self._path(version, key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            entries = self._entries() if os.path.isdir(self.cache_dir) else []
+            return {
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+_route_cache = None
+
+
+def get_route_cache():
+    """프로세스 공유 RouteCache"""
+    global _route_cache
+    if _route_cache is None:
+        _route_cache = RouteCache()
+    return _route_cache
@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+
+# 기본 제공 모양 템플릿(test_image) × 목표 거리별 미리 계산한 최적 배치 경로 인덱스
+# (precompute_templates.py 로 생성)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(CURRENT_DIR, 'test_image')
+TEMPLATE_INDEX_PATH = os.environ.get('SOOMGIL_TEMPLATE_INDEX', os.path.join(CURRENT_DIR, 'template_index.json'))
+TEMPLATE_TARGET_LENGTHS = (2000, 3000, 5000, 8000)
+
+# 좌표 소수점 자리 (1e-6도 ≈ 0.1m)
+COORD_DIGITS = 6
+
+
+def template_names(template_dir=TEMPLATE_DIR):
+    """템플릿 이미지 이름 목록 (확장자 제외)"""
+    return sorted(os.path.splitext(name)[0] for name in os.listdir(template_dir) if name.endswith('.png'))
+
+
+def compact_route(route):
+    """solve_custom_route 결과 → 인덱스 저장용 (좌표 반올림)"""
+    return {
+        'path': [[round(lat, COORD_DIGITS), round(lon, COORD_DIGITS)] for lat, lon in route['path']],
+        'contour': [[round(lat, COORD_DIGITS), round(lon, COORD_DIGITS)] for lat, lon in route['contour']],
+        'score': route['score'],
+        'stats': route['stats'],
+        'center': route['center'],
+        'distance_m': round(route['distance_m'], 1),
+    }
+
+
+class TemplateIndex:
+    """
+    템플릿 경로 인덱스
+
+    {"graph_version": ..., "templates": {이름: {"contour_keys": {목표 거리: 캐시 키}, ...}},
+     "routes": {캐시 키: 경로}}
+    캐시 키는 route_cache_key (정규화 윤곽선 + 목표 거리 + 그래프 버전) 와 같음
+    """
+
+    def __init__(self, data):
+        self.graph_version = data.get('graph_version')
+        self.templates = data.get('templates', {})
+        self.routes = data.get('routes', {})
+
+    def by_key(self, key):
+        return self.routes.get(key)
+
+    def by_name(self, name, target_len):
+        keys = self.templates.get(name, {}).get('contour_keys', {})
+        key = keys.get(str(int(target_len)))
+        return self.routes.get(key) if key else None
+
+    def names(self):
+        return sorted(self.templates)
+
+
+_template_index = None
+_template_index_lock = threading.Lock()
+
+
+def get_template_index(graph_version):
+    """
+    graph_version 용 템플릿 인덱스 (없거나 다른 그래프 버전으로 만든 인덱스면 None)
+    """
+    global _template_index
+    with _template_index_lock:
+        if _template_index is None:
+            if not os.path.exists(TEMPLATE_INDEX_PATH):
+                _template_index = TemplateIndex({})
+            else:
+                with open(TEMPLATE_INDEX_PATH, 'r', encoding='utf-8') as f:
+                    _template_index = TemplateIndex(json.load(f))
+                if _template_index.graph_version != graph_version:
+                    print(f"⚠️ 템플릿 인덱스 그래프 버전 불일치 ({_template_index.graph_version} != {graph_version}), "
+                          f"precompute_templates.py 를 다시 실행하세요.")
+        if _template_index.graph_version != graph_version:
+            return None
+        return _template_index
+
+
+def reset_template_index():
+    """인덱스 파일을 다시 읽도록 캐시 비움"""
+    global _template_index
+    with _template_index_lock:
+        _template_index = None
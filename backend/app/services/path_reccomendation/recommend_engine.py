@@ -0,0 +1,252 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# path.ipynb 로직을 Flask 앱에서 직접 호출할 수 있도록 옮긴 경로 추천 엔진
+# (노트북은 디버깅용 프론트엔드로만 사용)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.join(CURRENT_DIR, '..', '..', '..', '..')
+TREE_CHAR_PATH = os.path.join(PROJECT_ROOT, 'data', '02_intermediate', 'tree-characteristics.csv')
+
+# 공유 보행 네트워크 그래프
+sys.path.append(os.path.join(CURRENT_DIR, '..', 'walk_graph'))
+from walk_graph import get_walk_graph, add_load_hook, EDGE_TYPES, EDGE_TYPE_CODES
+from snapping import get_snapper
+
+# 추천 유형 리스트 (산, 강, 공원)
+POI_TYPES = ['mountain', 'river', 'park']
+
+# 계절 (tree-characteristics.csv 컬럼명)
+SEASONS = ('봄', '여름', '가을', '겨울')
+
+# 프로필(poi_type)별 도로 유형 가중치
+TYPE_WEIGHT_MAPS = {
+    'park': {'park': 0.01, 'river': 0.3, 'mountain': 0.3, 'tree-line': 0.5, 'road': 1.5},
+    'river': {'park': 0.3, 'river': 0.01, 'mountain': 0.3, 'tree-line': 0.5, 'road': 1.5},
+    'mountain': {'park': 0.3, 'river': 0.3, 'mountain': 0.01, 'tree-line': 0.5, 'road': 1.5},
+    'default': {'park': 0.3, 'river': 0.3, 'mountain': 0.3, 'tree-line': 0.5, 'road': 1.5},
+}
+PROFILES = tuple(TYPE_WEIGHT_MAPS)
+
+_tree_char_df = None
+_weight_tables = {}
+
+
+def load_tree_characteristics():
+    """수목 특성 데이터 (계절별 특징 여부) 로딩"""
+    global _tree_char_df
+    if _tree_char_df is None:
+        _tree_char_df = pd.read_csv(TREE_CHAR_PATH)
+    return _tree_char_df
+
+
+def get_seasonal_trees(tree_char_df, season):
+    """해당 계절에 특징이 있는 수목명 집합"""
+    return set(tree_char_df[tree_char_df[season] == 1]['수목명'])
+
+
+# 산책 반경에 맞는 서브그래프 (공유 그래프의 격자 창 마스크 뷰)
+def filter_graph_by_bbox_and_type(wg, start_lat, start_lon, walk_km, bbox_km=2.0):
+    lat_margin = bbox_km / 111.0
+    lon_margin = bbox_km / 88.0
+    min_lat, max_lat = start_lat - lat_margin, start_lat + lat_margin
+    min_lon, max_lon = start_lon - lon_margin, start_lon + lon_margin
+    return wg.window_view(min_lat, max_lat, min_lon, max_lon)
+
+
+class WeightTable:
+    """
+    계절 × 프로필별 엣지 매력도/가중치 테이블 (그래프 로딩 시 한 번 계산)
+
+    - scores[season, profile, edge]: 매력도 (유형 가중치 * 계절 수목 보정)
+    - weights[season, profile, edge]: 매력도 * 거리 (최단 경로 가중치)
+    """
+
+    def __init__(self, wg, tree_char_df):
+        self.version = wg.version
+        self.seasonal_trees = {season: get_seasonal_trees(tree_char_df, season) for season in SEASONS}
+
+        # 계절 수목이 하나라도 있는 엣지 (S, E)
+        seasonal_edges = np.stack([wg.edges_with_trees(wg.tree_ids_for(self.seasonal_trees[season]))
+                                   for season in SEASONS])
+        tree_modifier = np.where(seasonal_edges, 0.9, 1.1)
+        # 프로필별 유형 가중치 (P, E)
+        type_modifier = np.array([[TYPE_WEIGHT_MAPS[profile][t] for t in EDGE_TYPES]
+                                  for profile in PROFILES])[:, wg.edge_type]
+
+        self.scores = np.ascontiguousarray(tree_modifier[:, None, :] * type_modifier[None, :, :])
+        self.weights = np.ascontiguousarray(self.scores * wg.edge_length)
+        self.scores.flags.writeable = False
+        self.weights.flags.writeable = False
+
+    def scores_for(self, season, profile):
+        return self.scores[SEASONS.index(season), PROFILES.index(profile)]
+
+    def weights_for(self, season, profile):
+        return self.weights[SEASONS.index(season), PROFILES.index(profile)]
+
+
+def get_weight_table(wg):
+    """그래프 버전별 WeightTable (한 번만 계산)"""
+    key = wg.version or id(wg)
+    if key not in _weight_tables:
+        _weight_tables[key] = WeightTable(wg, load_tree_characteristics())
+    return _weight_tables[key]
+
+
+# 공유 그래프 로딩 시 가중치 테이블도 같이 계산
+add_load_hook(get_weight_table)
+
+
+def select_poi(wg, table, view, path_lengths, season, total_walk_km, poi_type, tolerance=0.2):
+    """공유 거리 탐색 결과에서 poi_type 반환점 노드(전역 인덱스) 선택 (없으면 None)"""
+    # 매력적인 산책로 찾기 (유형별 필터링 추가)
+    scores = table.scores_for(season, poi_type)
+    poi_edges = view.edges[wg.edge_type[view.edges] == EDGE_TYPE_CODES[poi_type]]
+    best_edges = poi_edges[np.argsort(scores[poi_edges], kind='stable')[:max(1, int(len(poi_edges) * 0.1))]]
+    pois = np.unique(np.concatenate((wg.edge_u[best_edges], wg.edge_v[best_edges])))
+    if len(pois) == 0:
+        print(f"error: 주변에 추천할 만한 {poi_type} 경로가 없습니다.")
+        return None
+
+    # 목표 편도 거리에 맞는 POI 후보군 필터링
+    target_one_way_m = total_walk_km * 1000 / 2  # 목표 거리를 절반으로 설정
+    poi_lengths = path_lengths[view.local(pois)]  # 도달할 수 없거나 탐색 반경 밖의 POI는 inf
+    candidates = np.abs(poi_lengths - target_one_way_m) <= target_one_way_m * tolerance
+    if not candidates.any():
+        print(f"error: {total_walk_km}km 왕복 거리에 맞는 {poi_type} 추천 경로를 찾지 못했습니다.")
+        return None
+
+    # 목표 편도 거리에 가장 근접한 산책로를 목적지로 선택
+    return pois[candidates][np.argmin(np.abs(poi_lengths[candidates] - target_one_way_m))]
+
+
+def recommend_paths(wg, table, start_lat, start_lon, season, total_walk_km, poi_types=POI_TYPES, tolerance=0.2):
+    """
+    poi_type 산책로를 반환점으로 하는 편도 경로(노드 인덱스 리스트)들을 한 번에 탐색
+
+    시작점에서 거리 기준 Dijkstra 를 한 번만 (최대 편도 거리까지) 실행하고
+    모든 poi_type 의 반환점 후보 선택에 같이 사용함
+    """
+    # 시작점 노드 찾기
+    start_node = int(get_snapper(wg).snap([start_lat, start_lon])[0][0])
+
+    # 서브그래프 (bbox 안 노드끼리 잇는 엣지만 사용하는 마스크 뷰)
+    view = filter_graph_by_bbox_and_type(wg, start_lat, start_lon, total_walk_km)
+    if not view.contains(start_node):
+        print("error: 시작점 주변에 탐색할 경로가 없습니다.")
+        return [None] * len(poi_types)
+
+    # 시작점에서 거리 기준 최단 경로 길이 (후보가 될 수 있는 최대 편도 거리까지만 탐색)
+    max_one_way_m = total_walk_km * 1000 / 2 * (1 + tolerance)
+    path_lengths = view.distances(start_node, wg.edge_length, limit=max_one_way_m)
+
+    targets = [select_poi(wg, table, view, path_lengths, season, total_walk_km, poi_type, tolerance)
+               for poi_type in poi_types]
+
+    # 가중치(매력도+거리) 반영해서 최적 경로 계산 (같은 뷰에 프로필별 가중치만 교체)
+    results = []
+    for poi_type, best_poi in zip(poi_types, targets):
+        if best_poi is None:
+            results.append(None)
+            continue
+        results.append(view.shortest_path(start_node, best_poi, table.weights_for(season, poi_type)))
+
+    return results
+
+
+def summarize_path(wg, path_nodes, poi_type, seasonal_trees):
+    """경로별 반환점 도로명과 경로에서 볼 수 있는 계절 수목"""
+    path_edges = wg.path_edges(path_nodes)
+    one_way_length = float(wg.edge_length[path_edges].sum())
+    print(f"--- {poi_type} POI 경로 추천 ---")
+    print(f"편도 거리: {one_way_length/1000:.2f} km")
+    print(f"왕복 시 예상 거리: {one_way_length*2/1000:.2f} km")
+    round_trip_time_min = one_way_length * 2 / (4000 / 60)
+    print(f"예상 소요 시간(왕복): {round_trip_time_min:.0f}분")
+
+    poi_road_name = wg.edge_road_names[path_edges[-1]]
+    if poi_road_name:
+        poi_road_name = f"{poi_road_name}-{poi_type}"  # ← 타입 붙이기
+    else:
+        poi_road_name = poi_type  # 도로명이 없으면 타입만
+
+    seasonal_trees_on_path = {
+        tree
+        for e in path_edges
+        for tree in wg.edge_trees(e)
+        if tree in seasonal_trees
+    }
+    if seasonal_trees_on_path:
+        print(f"경로에서 볼 수 있는 계절 수목: {', '.join(seasonal_trees_on_path)}")
+
+    return [poi_road_name, list(seasonal_trees_on_path)]
+
+
+def build_routes_geojson(wg, results, poi_types=POI_TYPES):
+    """최종 경로들을 LineString FeatureCollection으로 변환"""
+    geojson_features = []
+    for idx, path_nodes in enumerate(results):
+        if path_nodes:
+            coords = wg.path_latlon(path_nodes)
+            feature = {
+                "type": "Feature",
+                "properties": {
+                    "name": poi_types[idx]
+                },
+                "geometry": {
+                    "type": "LineString",
+                    "coordinates": [[lon, lat] for lat, lon in coords]
+                }
+            }
+            geojson_features.append(feature)
+    return {
+        "type": "FeatureCollection",
+        "features": geojson_features
+    }
+
+
+def recommend_routes(start_lat, start_lon, walk_km=5, season='가을', tolerance=0.3, walk_graph=None):
+    """
+    산/강/공원 유형별 추천 경로 생성
+
+    Args:
+        start_lat, start_lon: 시작 위치
+        walk_km: 총 왕복 산책 거리 (km)
+        season: 계절 ('봄', '여름', '가을', '겨울')
+        tolerance: 목표 편도 거리 허용 오차 비율
+        walk_graph: 사용할 WalkGraph (없으면 프로세스 공유 그래프)
+
+    Returns:
+        dict: {'geojson': FeatureCollection, 'poi_tree_list': [[반환점 도로명, [계절 수목]], ...],
+               'paths': {poi_type: [osmid, ...] 또는 None}}
+    """
+    wg = walk_graph or get_walk_graph()
+    table = get_weight_table(wg)
+    seasonal_trees = table.seasonal_trees[season]
+
+    results = recommend_paths(wg, table, start_lat, start_lon, season, walk_km, POI_TYPES, tolerance=tolerance)
+
+    poi_tree_list = []
+    for idx, path_nodes in enumerate(results):
+        if path_nodes:
+            poi_tree_list.append(summarize_path(wg, path_nodes, POI_TYPES[idx], seasonal_trees))
+        else:
+            print(f'error: {POI_TYPES[idx]} 경로를 찾지 못했습니다.')
+
+    return {
+        'geojson': build_routes_geojson(wg, results),
+        'poi_tree_list': poi_tree_list,
+        'paths': {poi_type: wg.path_osmids(path) if path else None for poi_type, path in zip(POI_TYPES, results)},
+    }
+
+
+def save_results(result, output_dir=CURRENT_DIR):
+    """description.py, /api/path 에서 읽는 결과 파일 저장"""
+    with open(os.path.join(output_dir, 'poi_tree_list.json'), 'w', encoding='utf-8') as f:
+        json.dump(result['poi_tree_list'], f, ensure_ascii=False, indent=2)
+    with open(os.path.join(output_dir, 'results_path.geojson'), 'w', encoding='utf-8') as f:
+        json.dump(result['geojson'], f, ensure_ascii=False, separators=(',', ':'))
@@ -1,8 +1,14 @@
 import json
-import pandas as pd
-import networkx as nx
-from scipy.spatial import KDTree
+import numpy as np
 import os
+import sys
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 공유 보행 네트워크 그래프
+sys.path.append(os.path.join(CURRENT_DIR, '..', 'walk_graph'))
+from walk_graph import get_walk_graph, EDGE_TYPES
+from snapping import get_snapper
 
 def get_preference_score(data):
     """매력도 계산 (단순화)"""
@@ -17,78 +23,43 @@ def get_preference_score(data):
     
     return type_weight_map.get(data.get('type'), 1.0)
 
-def edge_weight(u, v, G):
-    """엣지 가중치 계산 (단순화)"""
-    data = G[u][v]
-    preference_score = get_preference_score(data)
-    return preference_score * data['length']
+def edge_weight(wg):
+    """엣지 가중치 계산 (단순화, 엣지 전체를 한 번에)"""
+    preference_scores = np.array([get_preference_score({'type': t}) for t in EDGE_TYPES])[wg.edge_type]
+    return preference_scores * wg.edge_length
 
-def find_optimal_path(G, node_pos, start_osmid, dest_osmid):
-    """시작점에서 목적지까지의 최적 경로 찾기"""
-    # 경로 탐색용 가중치 적용 (매력도+거리)
-    for u, v in G.edges():
-        G[u][v]['weight'] = edge_weight(u, v, G)
-    
-    try:
-        # 최적 경로 계산 (가중치 반영)
-        optimal_path = nx.shortest_path(G, start_osmid, dest_osmid, weight='weight')
-        
-        # 경로 길이 계산
-        path_length = sum(G.edges[optimal_path[i], optimal_path[i+1]]['length'] 
-                         for i in range(len(optimal_path)-1))
-        
-        return optimal_path, path_length
-        
-    except nx.NetworkXNoPath:
-        print(f"error: 시작점 {start_osmid}에서 목적지 {dest_osmid}까지 경로를 찾을 수 없습니다.")
+def find_optimal_path(wg, start_node, dest_node):
+    """시작점에서 목적지까지의 최적 경로 찾기 (노드 인덱스)"""
+    # 최적 경로 계산 (가중치 반영: 매력도+거리)
+    optimal_path = wg.shortest_path(start_node, dest_node, edge_weight(wg))
+    
+    if optimal_path is None:
+        print(f"error: 시작점 {wg.osmids[start_node]}에서 목적지 {wg.osmids[dest_node]}까지 경로를 찾을 수 없습니다.")
         return None, None
+    
+    # 경로 길이 계산
+    path_length = wg.path_length(optimal_path)
+    
+    return optimal_path, path_length
 
 def generate_personalized_route(start_lat, start_lon, destination_lat, destination_lon, destination_name):
     """개인화된 경로 생성 메인 함수 (단순화)"""
     
-    # 데이터 로드
-    with open('data/04_final_data/final_edges.geojson', encoding='utf-8') as f:
-        edges_geo = json.load(f)
-    nodes_df = pd.read_csv('data/04_final_data/final_nodes.csv')
-    
-    # 노드 위치 정보
-    node_pos = {row['osmid']: (row['lat'], row['lon']) for _, row in nodes_df.iterrows()}
-    
-    # 동대문구 전체 그래프 생성
-    G = nx.Graph()
-    for feature in edges_geo['features']:
-        props = feature['properties']
-        u, v = props['u'], props['v']
-        length = props.get('length', 1)
-        type_keys = ['park', 'mountain', 'river', 'tree-line', 'road']
-        edge_type = next((k for k in type_keys if props.get(k, 0) == 1), 'road')
-        tree_names = props.get('tree', '').split()
-        road_name = props.get('name', '')
-        G.add_edge(u, v, length=length, type=edge_type, tree=tree_names, road_name=road_name)
-    
-    print(f"그래프 생성 완료: {G.number_of_nodes()}개 노드, {G.number_of_edges()}개 엣지")
-    
-    # 시작점과 목적지 노드 찾기
-    node_coords = list(node_pos.values())
-    node_osmids = list(node_pos.keys())
-    kdtree = KDTree(node_coords)
-    
-    # 시작점 노드 찾기
-    _, start_node_idx = kdtree.query([start_lat, start_lon])
-    start_osmid = node_osmids[start_node_idx]
-    start_node_pos = node_pos[start_osmid]
-    
-    # 목적지 노드 찾기
-    _, dest_node_idx = kdtree.query([destination_lat, destination_lon])
-    dest_osmid = node_osmids[dest_node_idx]
-    dest_node_pos = node_pos[dest_osmid]
-    
-    print(f"시작점: {start_osmid} ({start_node_pos[0]:.6f}, {start_node_pos[1]:.6f})")
-    print(f"목적지: {dest_osmid} ({dest_node_pos[0]:.6f}, {dest_node_pos[1]:.6f})")
+    # 공유 그래프 사용
+    wg = get_walk_graph()
+    
+    # 시작점과 목적지 노드 찾기 (공유 스냅 인덱스, 한 번에)
+    snapped, _ = get_snapper(wg).snap([[start_lat, start_lon], [destination_lat, destination_lon]])
+    start_node, dest_node = int(snapped[0]), int(snapped[1])
+    start_node_pos = wg.node_pos(start_node)
+    dest_node_pos = wg.node_pos(dest_node)
+    
+    print(f"시작점: {wg.osmids[start_node]} ({start_node_pos[0]:.6f}, {start_node_pos[1]:.6f})")
+    print(f"목적지: {wg.osmids[dest_node]} ({dest_node_pos[0]:.6f}, {dest_node_pos[1]:.6f})")
     print(f"목적지명: {destination_name}")
     
     # 경로 찾기
-    optimal_path, path_length = find_optimal_path(G, node_pos, start_osmid, dest_osmid)
+    optimal_path, path_length = find_optimal_path(wg, start_node, dest_node)
     
     if not optimal_path:
         print("경로를 찾을 수 없습니다.")
@@ -102,7 +73,7 @@ def generate_personalized_route(start_lat, start_lon, destination_lat, destinati
 
     
     # GeoJSON으로 경로 저장
-    coords = [node_pos[node] for node in optimal_path]
+    coords = wg.path_latlon(optimal_path)
     
     geojson_feature = {
         "type": "Feature",
@@ -125,8 +96,8 @@ def generate_personalized_route(start_lat, start_lon, destination_lat, destinati
     }
     
     # GeoJSON 파일 저장
-    with open('backend/app/services/personalization/personalized_route.geojson', 'w', encoding='utf-8') as f:
-        json.dump(geojson_obj, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(CURRENT_DIR, 'personalized_route.geojson'), 'w', encoding='utf-8') as f:
+        json.dump(geojson_obj, f, ensure_ascii=False, separators=(',', ':'))
     print('personalized_route.geojson 파일로 경로가 저장되었습니다.')
     
     # 감성적인 경로 설명 생성
@@ -149,7 +120,7 @@ def generate_personalized_route(start_lat, start_lon, destination_lat, destinati
         "description": selected_description
     }
     
-    with open('backend/app/services/personalization/personalized_description.json', 'w', encoding='utf-8') as f:
+    with open(os.path.join(CURRENT_DIR, 'personalized_description.json'), 'w', encoding='utf-8') as f:
         json.dump(description_data, f, ensure_ascii=False, indent=2)
     print('personalized_description.json 파일로 경로 설명이 저장되었습니다.')
     
@@ -3,11 +3,14 @@ import random
 import math
 import os
 import sys
-import pandas as pd
-import networkx as nx
-from scipy.spatial import KDTree
+import numpy as np
 from typing import Dict, List, Optional, Tuple
 
+# 공유 보행 네트워크 그래프
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'walk_graph'))
+from walk_graph import get_walk_graph, EDGE_TYPES
+from snapping import get_snapper
+
 # 거리 계산 함수
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """두 지점 간의 거리를 km 단위로 계산 (Haversine 공식)"""
@@ -47,31 +50,24 @@ def get_preference_score(data):
     
     return type_weight_map.get(data.get('type'), 1.0)
 
-def edge_weight(u, v, G):
-    """엣지 가중치 계산 (단순화)"""
-    data = G[u][v]
-    preference_score = get_preference_score(data)
-    return preference_score * data['length']
+def edge_weight(wg):
+    """엣지 가중치 계산 (단순화, 엣지 전체를 한 번에)"""
+    preference_scores = np.array([get_preference_score({'type': t}) for t in EDGE_TYPES])[wg.edge_type]
+    return preference_scores * wg.edge_length
 
-def find_optimal_path(G, node_pos, start_osmid, dest_osmid):
-    """시작점에서 목적지까지의 최적 경로 찾기"""
-    # 경로 탐색용 가중치 적용 (매력도+거리)
-    for u, v in G.edges():
-        G[u][v]['weight'] = edge_weight(u, v, G)
+def find_optimal_path(wg, start_node, dest_node):
+    """시작점에서 목적지까지의 최적 경로 찾기 (노드 인덱스)"""
+    # 최적 경로 계산 (가중치 반영: 매력도+거리)
+    optimal_path = wg.shortest_path(start_node, dest_node, edge_weight(wg))
     
-    try:
-        # 최적 경로 계산 (가중치 반영)
-        optimal_path = nx.shortest_path(G, start_osmid, dest_osmid, weight='weight')
-        
-        # 경로 길이 계산
-        path_length = sum(G.edges[optimal_path[i], optimal_path[i+1]]['length'] 
-                         for i in range(len(optimal_path)-1))
-        
-        return optimal_path, path_length
-        
-    except nx.NetworkXNoPath:
-        print(f"error: 시작점 {start_osmid}에서 목적지 {dest_osmid}까지 경로를 찾을 수 없습니다.")
+    if optimal_path is None:
+        print(f"error: 시작점 {wg.osmids[start_node]}에서 목적지 {wg.osmids[dest_node]}까지 경로를 찾을 수 없습니다.")
         return None, None
+    
+    # 경로 길이 계산
+    path_length = wg.path_length(optimal_path)
+    
+    return optimal_path, path_length
 
 def load_place_data():
     """data.json과 place_coordinates.py에서 장소 데이터 로드"""
@@ -227,52 +223,20 @@ def generate_duration_based_route(start_lat: float, start_lon: float, user_prefe
         
         # 실제 도로 경로 생성
         try:
-            # 데이터 로드
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            edges_path = os.path.join(current_dir, '..', '..', '..', '..', 'data', '04_final_data', 'final_edges.geojson')
-            nodes_path = os.path.join(current_dir, '..', '..', '..', '..', 'data', '04_final_data', 'final_nodes.csv')
-            
-            with open(edges_path, encoding='utf-8') as f:
-                edges_geo = json.load(f)
-            nodes_df = pd.read_csv(nodes_path)
-            
-            # 노드 위치 정보
-            node_pos = {row['osmid']: (row['lat'], row['lon']) for _, row in nodes_df.iterrows()}
-            
-            # 동대문구 전체 그래프 생성
-            G = nx.Graph()
-            for feature in edges_geo['features']:
-                props = feature['properties']
-                u, v = props['u'], props['v']
-                length = props.get('length', 1)
-                type_keys = ['park', 'mountain', 'river', 'tree-line', 'road']
-                edge_type = next((k for k in type_keys if props.get(k, 0) == 1), 'road')
-                tree_names = props.get('tree', '').split()
-                road_name = props.get('name', '')
-                G.add_edge(u, v, length=length, type=edge_type, tree=tree_names, road_name=road_name)
-            
-            print(f"그래프 생성 완료: {G.number_of_nodes()}개 노드, {G.number_of_edges()}개 엣지")
-            
-            # 시작점과 목적지 노드 찾기
-            node_coords = list(node_pos.values())
-            node_osmids = list(node_pos.keys())
-            kdtree = KDTree(node_coords)
-            
-            # 시작점 노드 찾기
-            _, start_node_idx = kdtree.query([start_lat, start_lon])
-            start_osmid = node_osmids[start_node_idx]
-            start_node_pos = node_pos[start_osmid]
+            # 공유 그래프 사용
+            wg = get_walk_graph()
             
-            # 목적지 노드 찾기
-            _, dest_node_idx = kdtree.query([destination_lat, destination_lon])
-            dest_osmid = node_osmids[dest_node_idx]
-            dest_node_pos = node_pos[dest_osmid]
+            # 시작점과 목적지 노드 찾기 (공유 스냅 인덱스, 한 번에)
+            snapped, _ = get_snapper(wg).snap([[start_lat, start_lon], [destination_lat, destination_lon]])
+            start_node, dest_node = int(snapped[0]), int(snapped[1])
+            start_node_pos = wg.node_pos(start_node)
+            dest_node_pos = wg.node_pos(dest_node)
             
-            print(f"시작점: {start_osmid} ({start_node_pos[0]:.6f}, {start_node_pos[1]:.6f})")
-            print(f"목적지: {dest_osmid} ({dest_node_pos[0]:.6f}, {dest_node_pos[1]:.6f})")
+            print(f"시작점: {wg.osmids[start_node]} ({start_node_pos[0]:.6f}, {start_node_pos[1]:.6f})")
+            print(f"목적지: {wg.osmids[dest_node]} ({dest_node_pos[0]:.6f}, {dest_node_pos[1]:.6f})")
             
             # 경로 찾기
-            optimal_path, path_length = find_optimal_path(G, node_pos, start_osmid, dest_osmid)
+            optimal_path, path_length = find_optimal_path(wg, start_node, dest_node)
             
             if not optimal_path:
                 print("경로를 찾을 수 없습니다. 직선 경로로 대체합니다.")
@@ -306,7 +270,7 @@ def generate_duration_based_route(start_lat: float, start_lon: float, user_prefe
                 print(f"경로 노드 수: {len(optimal_path)}개")
                 
                 # GeoJSON으로 경로 저장
-                coords = [node_pos[node] for node in optimal_path]
+                coords = wg.path_latlon(optimal_path)
                 
                 route_geojson = {
                     "type": "FeatureCollection",
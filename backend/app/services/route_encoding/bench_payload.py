@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+경로 응답 크기/직렬화 시간 벤치마크: 기존 JSON vs 압축 응답 모드
+
+경로 GeoJSON 파일마다 기존 방식(indent=2 파일, jsonify 응답)과 polyline/delta 인코딩,
+줌별 Douglas–Peucker 단순화 조합의 본문 크기(원본/gzip/brotli), 직렬화 시간, 좌표 오차를 출력합니다.
+
+사용법: python bench_payload.py [geojson 파일 ...]
+"""
+
+import gzip
+import json
+import math
+import os
+import sys
+import time
+import numpy as np
+from route_encoding import (
+    brotli, encode_route_geojson, decode_polyline, decode_delta, GZIP_LEVEL, BROTLI_QUALITY
+)
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICES_DIR = os.path.join(CURRENT_DIR, '..')
+DEFAULT_FILES = (
+    os.path.join(SERVICES_DIR, 'path_reccomendation', 'results_path.geojson'),
+    os.path.join(SERVICES_DIR, 'personalization', 'personalized_route.geojson'),
+    os.path.join(SERVICES_DIR, 'path_image', 'outputs', 'custom_route.geojson'),
+)
+REPEAT = 200
+
+# (이름, 직렬화 함수)
+MODES = (
+    ('indent=2 (file)', lambda g: json.dumps(g, ensure_ascii=False, indent=2)),
+    ('jsonify', lambda g: json.dumps(g, separators=(',', ':'), sort_keys=True)),
+    ('compact json', lambda g: json.dumps(g, ensure_ascii=False, separators=(',', ':'))),
+    ('polyline', lambda g: _dumps(encode_route_geojson(g, 'polyline', include_contour=False))),
+    ('polyline z15', lambda g: _dumps(encode_route_geojson(g, 'polyline', zoom=15, include_contour=False))),
+    ('delta', lambda g: _dumps(encode_route_geojson(g, 'delta', include_contour=False))),
+    ('delta z17', lambda g: _dumps(encode_route_geojson(g, 'delta', zoom=17, include_contour=False))),
+)
+
+
+def _dumps(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+
+
+def _lines(geojson):
+    features = geojson.get('features', [geojson])
+    return [np.asarray(f['geometry']['coordinates'], dtype=np.float64) for f in features
+            if f.get('geometry', {}).get('type') == 'LineString'
+            and (f.get('properties') or {}).get('type') != 'contour']
+
+
+def route_length_km(geojson):
+    total = 0.0
+    for coords in _lines(geojson):
+        lat = np.radians(coords[:, 1])
+        dlat, dlon = np.diff(lat), np.diff(np.radians(coords[:, 0]))
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(dlon / 2) ** 2
+        total += float(np.sum(2 * 6371.0088 * np.arcsin(np.sqrt(a))))
+    return total
+
+
+def max_error_m(geojson, body):
+    """인코딩 → 디코딩 좌표의 최대 오차 (단순화하지 않은 모드만)"""
+    encoded = json.loads(body)
+    if not encoded.get('encoding') or encoded['encoding']['zoom'] is not None:
+        return None
+    precision = encoded['encoding']['precision']
+    error = 0.0
+    features = [f for f in encoded.get('features', [encoded]) if f.get('geometry', {}).get('type') == 'LineString']
+    for original, feature in zip(_lines(geojson), features):
+        geometry = feature['geometry']
+        if 'polyline' in geometry:
+            decoded = np.asarray(decode_polyline(geometry['polyline'], precision))
+        else:
+            decoded = np.asarray(decode_delta(geometry['delta'], precision))
+        diff = np.radians(decoded - original) * 6371008.8
+        diff[:, 0] *= math.cos(math.radians(original[:, 1].mean()))
+        error = max(error, float(np.max(np.hypot(diff[:, 0], diff[:, 1]))))
+    return error
+
+
+def bench_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        geojson = json.load(f)
+    points = sum(len(coords) for coords in _lines(geojson))
+    print(f"📄 {os.path.relpath(path, SERVICES_DIR)}  (경로 {route_length_km(geojson):.2f} km, {points}개 점)")
+    print(f"   {'mode':<16}{'bytes':>9}{'gzip':>8}{'br':>8}{'serialize':>12}{'points':>8}{'max err':>10}")
+
+    baseline = None
+    for name, serialize in MODES:
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            body = serialize(geojson)
+        elapsed_us = (time.perf_counter() - started) / REPEAT * 1e6
+        raw = body.encode('utf-8')
+        gz = len(gzip.compress(raw, compresslevel=GZIP_LEVEL))
+        br = f"{len(brotli.compress(raw, quality=BROTLI_QUALITY)):>8}" if brotli is not None else f"{'-':>8}"
+        encoded = json.loads(body)
+        kept = encoded.get('encoding', {}).get('points', points)
+        error = max_error_m(geojson, body)
+        baseline = baseline or len(raw)
+        print(f"   {name:<16}{len(raw):>9}{gz:>8}{br}{elapsed_us:>10.0f}us{kept:>8}"
+              f"{(f'{error:.2f}m' if error is not None else '-'):>10}   x{baseline / len(raw):.1f}")
+    print()
+
+
+def main(paths):
+    if brotli is None:
+        print("⚠️ brotli 미설치: br 열은 생략합니다 (pip install brotli)")
+    for path in paths:
+        bench_file(path)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or DEFAULT_FILES)
@@ -0,0 +1,219 @@
+import gzip
+import math
+import numpy as np
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 gzip 만 사용
+    brotli = None
+
+# 경로 GeoJSON 압축 응답 모드: 좌표 인코딩(polyline / 양자화 델타) + 줌별 Douglas–Peucker 단순화 + 본문 압축
+
+ROUTE_FORMATS = ('geojson', 'polyline', 'delta')
+
+# 좌표 소수점 자리 (polyline 5자리 ≈ 1.1m, delta 6자리 ≈ 0.1m)
+POLYLINE_PRECISION = 5
+DELTA_PRECISION = 6
+
+# 단순화 허용 오차 (해당 줌의 화면 픽셀)
+SIMPLIFY_PX = 1.0
+MIN_ZOOM, MAX_ZOOM = 0, 22
+
+# 이보다 작은 본문은 압축하지 않음
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+EARTH_RADIUS_M = 6378137.0
+METERS_PER_PIXEL_Z0 = 2 * math.pi * EARTH_RADIUS_M / 256
+
+
+def zoom_tolerance(zoom, lat):
+    """줌 레벨 화면 픽셀 SIMPLIFY_PX 개에 해당하는 지상 거리 (m)"""
+    return METERS_PER_PIXEL_Z0 * math.cos(math.radians(lat)) / 2 ** zoom * SIMPLIFY_PX
+
+
+def simplify_mask(coords, tolerance_m):
+    """
+    Douglas–Peucker: 남길 점 마스크 (양 끝점은 항상 유지)
+
+    coords: (N, 2) [lon, lat], 국지 등장방형 투영(미터)에서 선분까지 거리로 판정
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    n = len(coords)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[[0, -1]] = True
+    if n < 3 or tolerance_m <= 0:
+        keep[:] = True
+        return keep
+
+    lat0 = math.radians(coords[:, 1].mean())
+    xy = np.radians(coords) * EARTH_RADIUS_M
+    xy[:, 0] *= math.cos(lat0)
+
+    # 단계별로 현재 남긴 점 사이 구간 전체를 한 번에 처리 (구간마다 허용 오차를 넘는 가장 먼 점 추가)
+    points = np.arange(n)
+    while True:
+        kept = np.flatnonzero(keep)
+        seg = np.minimum(np.searchsorted(kept, points, side='right') - 1, len(kept) - 2)
+        a, b = xy[kept[seg]], xy[kept[seg + 1]]
+        ab = b - a
+        denom = np.einsum('ij,ij->i', ab, ab)
+        t = np.einsum('ij,ij->i', xy - a, ab) / np.where(denom > 0, denom, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+        dist = np.hypot(*(xy - a - t[:, None] * ab).T)
+        seg_max = np.maximum.reduceat(dist, kept[:-1])
+        split = (dist == seg_max[seg]) & (dist > tolerance_m)
+        if not split.any():
+            break
+        _, first = np.unique(seg[split], return_index=True)
+        keep[np.flatnonzero(split)[first]] = True
+    return keep
+
+
+def _quantize(coords, precision):
+    return np.round(np.asarray(coords, dtype=np.float64) * 10 ** precision).astype(np.int64)
+
+
+def encode_polyline(coords, precision=POLYLINE_PRECISION):
+    """[[lon, lat], ...] → Google encoded polyline 문자열 (polyline 은 lat, lon 순서)"""
+    if not len(coords):
+        return ''
+    quantized = _quantize(coords, precision)[:, ::-1]
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    values = np.where(deltas < 0, ~(deltas << 1), deltas << 1).astype(np.uint64)
+    # 5비트 단위 청크, 다음 청크가 있으면 0x20 표시 후 63 더함 (벡터화)
+    shifts = np.arange(0, 35, 5, dtype=np.uint64)
+    chunks = (values[:, None] >> shifts) & np.uint64(0x1f)
+    used = (values[:, None] >> shifts) > 0
+    used[:, 0] = True
+    more = np.zeros_like(used)
+    more[:, :-1] = used[:, 1:]
+    chunks = (chunks | (more.astype(np.uint64) << np.uint64(5))) + np.uint64(63)
+    return chunks[used].astype(np.uint8).tobytes().decode('ascii')
+
+
+def decode_polyline(encoded, precision=POLYLINE_PRECISION):
+    """Google encoded polyline → [[lon, lat], ...]"""
+    values, value, shift = [], 0, 0
+    for char in encoded:
+        chunk = ord(char) - 63
+        value |= (chunk & 0x1f) << shift
+        shift += 5
+        if chunk < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value, shift = 0, 0
+    latlon = np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision
+    return latlon[:, ::-1].tolist()
+
+
+def encode_delta(coords, precision=DELTA_PRECISION):
+    """[[lon, lat], ...] → [lon0, lat0, dlon1, dlat1, ...] (10^precision 배 정수, 첫 점 이후는 직전 점과의 차)"""
+    if not len(coords):
+        return []
+    quantized = _quantize(coords, precision)
+    quantized[1:] = np.diff(quantized, axis=0)
+    return quantized.ravel().tolist()
+
+
+def decode_delta(values, precision=DELTA_PRECISION):
+    """encode_delta 결과 → [[lon, lat], ...]"""
+    return (np.cumsum(np.array(values, dtype=np.int64).reshape(-1, 2), axis=0) / 10 ** precision).tolist()
+
+
+def _encode_geometry(geometry, fmt, zoom, precision):
+    if not geometry or geometry.get('type') != 'LineString':
+        return geometry, 0, 0
+    coords = np.asarray(geometry['coordinates'], dtype=np.float64).reshape(-1, 2)
+    if zoom is not None and len(coords) > 2:
+        coords = coords[simplify_mask(coords, zoom_tolerance(zoom, coords[:, 1].mean()))]
+    if fmt == 'polyline':
+        encoded = {'type': 'LineString', 'polyline': encode_polyline(coords, precision)}
+    elif fmt == 'delta':
+        encoded = {'type': 'LineString', 'delta': encode_delta(coords, precision)}
+    else:
+        encoded = {'type': 'LineString', 'coordinates': np.round(coords, precision).tolist()}
+    return encoded, len(geometry['coordinates']), len(coords)
+
+
+def encode_route_geojson(geojson, fmt='polyline', zoom=None, precision=None, include_contour=True):
+    """
+    경로 GeoJSON (Feature 또는 FeatureCollection) 압축 인코딩
+
+    Args:
+        fmt: 'polyline' (geometry.polyline 문자열), 'delta' (geometry.delta 정수 배열),
+             'geojson' (좌표 배열 그대로, 단순화/반올림만)
+        zoom: 지정하면 해당 줌 화면 픽셀 기준 Douglas–Peucker 단순화
+        precision: 좌표 소수점 자리 (기본 polyline 5, 그 외 6)
+        include_contour: False 면 image 경로의 원본 윤곽선(properties.type == 'contour') 피처 제외
+
+    최상위 encoding 속성에 디코딩에 필요한 정보(format, precision, zoom, 점 개수)를 기록
+    """
+    if fmt not in ROUTE_FORMATS:
+        raise ValueError(f"지원하지 않는 경로 형식: {fmt}")
+    if precision is None:
+        precision = POLYLINE_PRECISION if fmt == 'polyline' else DELTA_PRECISION
+    if not geojson:
+        return geojson
+
+    encoding = {'format': fmt, 'precision': precision, 'zoom': zoom, 'points': 0, 'original_points': 0}
+
+    def encode_feature(feature):
+        geometry, original, kept = _encode_geometry(feature.get('geometry'), fmt, zoom, precision)
+        encoding['original_points'] += original
+        encoding['points'] += kept
+        return {**feature, 'geometry': geometry}
+
+    if geojson.get('type') == 'FeatureCollection':
+        features = [
+            feature for feature in geojson.get('features', [])
+            if include_contour or (feature.get('properties') or {}).get('type') != 'contour'
+        ]
+        encoded = {**geojson, 'features': [encode_feature(feature) for feature in features]}
+    elif geojson.get('type') == 'Feature':
+        encoded = encode_feature(geojson)
+    else:
+        return geojson
+    encoded['encoding'] = encoding
+    return encoded
+
+
+def parse_route_format(args):
+    """
+    요청 파라미터 → encode_route_geojson 옵션 (압축 모드를 요청하지 않았으면 None)
+
+    format=polyline|delta|geojson, zoom=<줌>, precision=<자리수>, contour=0|1
+    (polyline/delta 모드는 윤곽선 기본 제외)
+    """
+    fmt = args.get('format', 'geojson')
+    zoom = args.get('zoom')
+    if fmt not in ROUTE_FORMATS:
+        raise ValueError(f"지원하지 않는 경로 형식: {fmt} ({', '.join(ROUTE_FORMATS)})")
+    if fmt == 'geojson' and zoom is None:
+        return None
+    options = {'fmt': fmt, 'include_contour': args.get('contour', '1' if fmt == 'geojson' else '0') not in ('0', 'false')}
+    if zoom is not None:
+        options['zoom'] = min(max(float(zoom), MIN_ZOOM), MAX_ZOOM)
+    if args.get('precision') is not None:
+        options['precision'] = min(max(int(args.get('precision')), 1), 7)
+    return options
+
+
+def compress_body(body, accept_encodings):
+    """
+    응답 본문 압축 (brotli 우선, 다음 gzip)
+
+    accept_encodings: 인코딩 이름 → 품질 값 (werkzeug request.accept_encodings 등)
+
+    Returns:
+        (본문, Content-Encoding 또는 None)
+    """
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if brotli is not None and accept_encodings['br']:
+        return brotli.compress(body, quality=BROTLI_QUALITY), 'br'
+    if accept_encodings['gzip']:
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0), 'gzip'
+    return body, None
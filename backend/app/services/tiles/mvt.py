@@ -0,0 +1,159 @@
+import struct
+import numpy as np
+
+# Mapbox Vector Tile (spec 2.1) protobuf 인코더
+# 타일에 필요한 메시지(Tile/Layer/Feature/Value)만 직접 직렬화해서 protobuf 런타임 의존성 없이 사용
+
+EXTENT = 4096
+
+# Feature.type
+POINT = 1
+LINESTRING = 2
+
+# 지오메트리 명령
+MOVE_TO = 1
+LINE_TO = 2
+
+# protobuf wire type
+_VARINT = 0
+_FIXED64 = 1
+_BYTES = 2
+
+
+def _key(field, wire_type):
+    return _varint((field << 3) | wire_type)
+
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def packed_varints(values):
+    """uint32 배열 → packed varint 바이트 (벡터화)"""
+    values = np.asarray(values, dtype=np.uint64).ravel()
+    if not len(values):
+        return b''
+    shifts = np.arange(0, 35, 7, dtype=np.uint64)
+    groups = (values[:, None] >> shifts) & np.uint64(0x7f)
+    # 각 값이 차지하는 바이트 수 (최소 1바이트)
+    used = (values[:, None] >> shifts) > 0
+    used[:, 0] = True
+    more = np.zeros_like(used)
+    more[:, :-1] = used[:, 1:]
+    groups |= more.astype(np.uint64) << np.uint64(7)
+    return groups[used].astype(np.uint8).tobytes()
+
+
+def zigzag(values):
+    """부호 있는 정수 배열 → zigzag 인코딩"""
+    values = np.asarray(values, dtype=np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _command(command, count):
+    return (command & 0x7) | (count << 3)
+
+
+def line_geometry(parts):
+    """
+    [(K, 2) 정수 타일 좌표, ...] → LINESTRING 지오메트리 명령열
+
+    파트 사이 커서는 이어지므로 첫 점도 직전 파트 끝점 기준 델타로 인코딩
+    """
+    commands = []
+    cursor = np.zeros(2, dtype=np.int64)
+    for part in parts:
+        part = np.asarray(part, dtype=np.int64)
+        deltas = np.diff(part, axis=0, prepend=cursor[None, :])
+        params = zigzag(deltas).ravel()
+        commands.append(np.array([_command(MOVE_TO, 1)], dtype=np.uint64))
+        commands.append(params[:2])
+        commands.append(np.array([_command(LINE_TO, len(part) - 1)], dtype=np.uint64))
+        commands.append(params[2:])
+        cursor = part[-1]
+    return np.concatenate(commands) if commands else np.zeros(0, dtype=np.uint64)
+
+
+def point_geometry(point):
+    """(x, y) 정수 타일 좌표 → POINT 지오메트리 명령열"""
+    return np.concatenate((np.array([_command(MOVE_TO, 1)], dtype=np.uint64), zigzag(point)))
+
+
+def _encode_value(value):
+    if isinstance(value, bool):
+        body = _key(7, _VARINT) + _varint(int(value))
+    elif isinstance(value, (int, np.integer)):
+        value = int(value)
+        if value >= 0:
+            body = _key(5, _VARINT) + _varint(value)
+        else:
+            body = _key(6, _VARINT) + _varint(int(zigzag([value])[0]))
+    elif isinstance(value, (float, np.floating)):
+        body = _key(3, _FIXED64) + struct.pack('<d', float(value))
+    else:
+        encoded = str(value).encode('utf-8')
+        body = _key(1, _BYTES) + _varint(len(encoded)) + encoded
+    return body
+
+
+def _message(field, body):
+    return _key(field, _BYTES) + _varint(len(body)) + body
+
+
+class Layer:
+    """
+    MVT 레이어 하나 (속성 키/값 사전은 레이어 단위로 중복 제거)
+    """
+
+    def __init__(self, name, extent=EXTENT):
+        self.name = name
+        self.extent = extent
+        self.keys = {}
+        self.values = {}
+        self.features = []
+
+    def _index(self, table, item):
+        index = table.get(item)
+        if index is None:
+            index = table[item] = len(table)
+        return index
+
+    def add_feature(self, geom_type, geometry, properties=None, feature_id=None):
+        tags = []
+        for key, value in (properties or {}).items():
+            if value is None or value == '':
+                continue
+            # 값 사전 키에 타입을 포함 (1 과 True, 1.0 구분)
+            tags.append(self._index(self.keys, key))
+            tags.append(self._index(self.values, (type(value).__name__, value)))
+        body = b''
+        if feature_id is not None:
+            body += _key(1, _VARINT) + _varint(int(feature_id))
+        if tags:
+            packed = packed_varints(tags)
+            body += _key(2, _BYTES) + _varint(len(packed)) + packed
+        body += _key(3, _VARINT) + _varint(geom_type)
+        packed = packed_varints(geometry)
+        body += _key(4, _BYTES) + _varint(len(packed)) + packed
+        self.features.append(body)
+
+    def encode(self):
+        name = self.name.encode('utf-8')
+        out = [_key(15, _VARINT) + _varint(2), _key(1, _BYTES) + _varint(len(name)) + name]
+        out.extend(_message(2, feature) for feature in self.features)
+        for key in self.keys:
+            encoded = key.encode('utf-8')
+            out.append(_key(3, _BYTES) + _varint(len(encoded)) + encoded)
+        out.extend(_message(4, _encode_value(value)) for _, value in self.values)
+        out.append(_key(5, _VARINT) + _varint(self.extent))
+        return b''.join(out)
+
+
+def encode_tile(layers):
+    """레이어 목록 → 타일 바이트 (피처가 없는 레이어는 생략)"""
+    return b''.join(_message(3, layer.encode()) for layer in layers if layer.features)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+보행 네트워크 벡터 타일 미리 생성
+
+그래프 범위(동대문구)를 덮는 줌 12~17 타일을 모두 만들어 디스크 타일 캐시에 저장합니다.
+/api/tiles/{z}/{x}/{y}.mvt 는 캐시된 타일을 바로 반환하고, 없는 타일만 요청 시 생성합니다.
+그래프 스냅샷이 바뀌면 다시 실행해야 합니다. (이전 버전 타일은 자동 삭제)
+
+사용법: python seed_tiles.py [최소 줌] [최대 줌]
+"""
+
+import sys
+import time
+from vector_tiles import SEED_ZOOMS, get_tile_source, get_tile_cache, tile_range
+
+
+def seed_tiles(min_zoom=SEED_ZOOMS[0], max_zoom=SEED_ZOOMS[1]):
+    started = time.time()
+    source = get_tile_source()
+    cache = get_tile_cache()
+    print(f"🗺️ 그래프 버전 {source.version}, 범위 {source.bounds}")
+    cache.use_version(source.version)
+
+    total_tiles, total_bytes = 0, 0
+    for z in range(min_zoom, max_zoom + 1):
+        zoom_started = time.time()
+        x0, x1, y0, y1 = tile_range(z, *source.bounds)
+        zoom_bytes, empty = 0, 0
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                tile = source.render(z, x, y)
+                cache.put(source.version, z, x, y, tile)
+                zoom_bytes += len(tile)
+                empty += not tile
+        count = (x1 - x0 + 1) * (y1 - y0 + 1)
+        total_tiles += count
+        total_bytes += zoom_bytes
+        print(f"✅ z{z:<2} 타일 {count:>4}개 (빈 타일 {empty}개)  {zoom_bytes / 1024:8.1f} KB  "
+              f"({time.time() - zoom_started:.1f}s)")
+
+    print("=" * 60)
+    print(f"✅ 타일 {total_tiles}개 생성 완료: {cache.cache_dir}")
+    print(f"   - 총 크기: {total_bytes / 1024 / 1024:.2f} MB")
+    print(f"   - 소요 시간: {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    seed_tiles(int(sys.argv[1]) if len(sys.argv) > 1 else SEED_ZOOMS[0],
+               int(sys.argv[2]) if len(sys.argv) > 2 else SEED_ZOOMS[1])
@@ -0,0 +1,272 @@
+import math
+import os
+import shutil
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import shapely
+from mvt import EXTENT, POINT, LINESTRING, Layer, encode_tile, line_geometry, point_geometry
+
+# 공유 보행 네트워크 그래프
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'walk_graph'))
+from walk_graph import get_walk_graph
+
+# 태그된 보행 네트워크(엣지 유형/수목/도로명, 노드) Mapbox Vector Tile 생성 + 메모리/디스크 캐시
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+TILE_CACHE_DIR = os.environ.get('SOOMGIL_TILE_CACHE_DIR', os.path.join(CURRENT_DIR, 'cache'))
+TILE_MEMORY_TILES = int(os.environ.get('SOOMGIL_TILE_MEMORY_TILES', 2048))
+
+# 제공 줌 범위 / 미리 생성(seed_tiles.py) 줌 범위
+MIN_ZOOM = 10
+MAX_ZOOM = 20
+SEED_ZOOMS = (12, 17)
+# 노드 레이어는 이 줌부터 포함 (저줌에서는 점이 너무 많음)
+NODE_MIN_ZOOM = 15
+
+# 타일 경계 밖으로 포함할 여유 (타일 좌표 단위, 선 끝이 경계에서 끊겨 보이지 않도록)
+TILE_BUFFER = 64
+# 단순화 허용 오차 (256px 타일 기준 화면 픽셀)
+SIMPLIFY_PX = 0.5
+
+# Web Mercator (EPSG:3857)
+EARTH_RADIUS_M = 6378137.0
+ORIGIN_SHIFT = math.pi * EARTH_RADIUS_M
+
+TILE_MIMETYPE = 'application/vnd.mapbox-vector-tile'
+
+
+def lonlat_to_mercator(lon, lat):
+    """위경도 배열 → Web Mercator (x, y) 미터"""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878)
+    x = np.radians(lon) * EARTH_RADIUS_M
+    y = np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) * EARTH_RADIUS_M
+    return x, y
+
+
+def tile_bounds(z, x, y):
+    """타일 (z, x, y) → Mercator 경계 (min_x, min_y, max_x, max_y)"""
+    size = 2 * ORIGIN_SHIFT / (1 << z)
+    min_x = -ORIGIN_SHIFT + x * size
+    max_y = ORIGIN_SHIFT - y * size
+    return min_x, max_y - size, min_x + size, max_y
+
+
+def tile_range(z, min_lon, min_lat, max_lon, max_lat):
+    """위경도 범위를 덮는 타일 x, y 범위 (x0, x1, y0, y1, 양 끝 포함)"""
+    n = 1 << z
+
+    def to_tile(lon, lat):
+        lat = math.radians(lat)
+        tx = int((lon + 180.0) / 360.0 * n)
+        ty = int((1.0 - math.asinh(math.tan(lat)) / math.pi) / 2.0 * n)
+        return min(max(tx, 0), n - 1), min(max(ty, 0), n - 1)
+
+    x0, y0 = to_tile(min_lon, max_lat)
+    x1, y1 = to_tile(max_lon, min_lat)
+    return x0, x1, y0, y1
+
+
+def valid_tile(z, x, y):
+    return MIN_ZOOM <= z <= MAX_ZOOM and 0 <= x < (1 << z) and 0 <= y < (1 << z)
+
+
+class TileSource:
+    """
+    그래프 버전별 타일 생성기
+
+    엣지 geometry 를 Mercator LineString 배열 + STRtree 로 한 번만 만들어 두고,
+    타일마다 후보 엣지 조회 → 경계(+버퍼) 클리핑 → 줌별 단순화 → 타일 좌표 양자화
+    """
+
+    def __init__(self, wg):
+        self.version = wg.version
+        self.bounds = (float(wg.lon.min()), float(wg.lat.min()), float(wg.lon.max()), float(wg.lat.max()))
+
+        gx, gy = lonlat_to_mercator(wg.edge_geom[:, 0], wg.edge_geom[:, 1])
+        part_index = np.repeat(np.arange(wg.num_edges), np.diff(wg.edge_geom_ptr))
+        self.lines = shapely.linestrings(np.column_stack((gx, gy)), indices=part_index)
+        self.tree = shapely.STRtree(self.lines)
+        self.edge_properties = [
+            {
+                'type': wg.edge_type_name(e),
+                'length': round(float(wg.edge_length[e]), 1),
+                'trees': ','.join(wg.edge_trees(e)),
+                'road': wg.edge_road_names[e],
+                'u': int(wg.osmids[wg.edge_u[e]]),
+                'v': int(wg.osmids[wg.edge_v[e]]),
+            }
+            for e in range(wg.num_edges)
+        ]
+
+        self.node_x, self.node_y = lonlat_to_mercator(wg.lon, wg.lat)
+        self.osmids = wg.osmids
+
+    def render(self, z, x, y):
+        """타일 (z, x, y) → MVT 바이트 (해당 범위에 피처가 없으면 b'')"""
+        min_x, min_y, max_x, max_y = tile_bounds(z, x, y)
+        size = max_x - min_x
+        scale = EXTENT / size
+        buffer = TILE_BUFFER / scale
+        clip = (min_x - buffer, min_y - buffer, max_x + buffer, max_y + buffer)
+
+        edges = Layer('edges')
+        candidates = np.sort(self.tree.query(shapely.box(*clip)))
+        if len(candidates):
+            clipped = shapely.clip_by_rect(self.lines[candidates], *clip)
+            simplified = shapely.simplify(clipped, size / 256 * SIMPLIFY_PX, preserve_topology=False)
+            parts, part_edge = shapely.get_parts(simplified, return_index=True)
+            coords, coord_part = shapely.get_coordinates(parts, return_index=True)
+            # Mercator → 타일 좌표 (y 는 위쪽이 0)
+            tile_coords = np.empty(coords.shape, dtype=np.int64)
+            tile_coords[:, 0] = np.round((coords[:, 0] - min_x) * scale)
+            tile_coords[:, 1] = np.round((max_y - coords[:, 1]) * scale)
+            # 양자화 후 연속 중복 점 제거 (같은 파트 안에서만)
+            keep = np.ones(len(tile_coords), dtype=bool)
+            keep[1:] = np.any(tile_coords[1:] != tile_coords[:-1], axis=1) | (coord_part[1:] != coord_part[:-1])
+            tile_coords, coord_part = tile_coords[keep], coord_part[keep]
+
+            part_ptr = np.searchsorted(coord_part, np.arange(len(parts) + 1))
+            edge_parts = {}
+            for p in range(len(parts)):
+                start, end = part_ptr[p], part_ptr[p + 1]
+                if end - start >= 2:
+                    edge_parts.setdefault(int(candidates[part_edge[p]]), []).append(tile_coords[start:end])
+            for e, lines in edge_parts.items():
+                edges.add_feature(LINESTRING, line_geometry(lines), self.edge_properties[e], feature_id=e)
+
+        nodes = Layer('nodes')
+        if z >= NODE_MIN_ZOOM:
+            inside = np.flatnonzero(
+                (self.node_x >= clip[0]) & (self.node_x <= clip[2]) &
+                (self.node_y >= clip[1]) & (self.node_y <= clip[3])
+            )
+            px = np.round((self.node_x[inside] - min_x) * scale).astype(np.int64)
+            py = np.round((max_y - self.node_y[inside]) * scale).astype(np.int64)
+            for i, tx, ty in zip(inside.tolist(), px.tolist(), py.tolist()):
+                nodes.add_feature(POINT, point_geometry((tx, ty)), {'osmid': int(self.osmids[i])}, feature_id=i)
+
+        return encode_tile([edges, nodes])
+
+
+_tile_sources = {}
+_tile_source_lock = threading.Lock()
+
+
+def get_tile_source(wg=None):
+    """그래프 버전별 TileSource (한 번만 생성)"""
+    wg = wg or get_walk_graph()
+    with _tile_source_lock:
+        if wg.version not in _tile_sources:
+            _tile_sources[wg.version] = TileSource(wg)
+        return _tile_sources[wg.version]
+
+
+class TileCache:
+    """
+    타일 캐시: 메모리 LRU (max_tiles 개) + 디스크 (<cache_dir>/<그래프 버전>/<z>/<x>/<y>.mvt)
+
+    그래프 버전이 바뀌면 이전 버전 디스크 타일을 모두 삭제
+    """
+
+    def __init__(self, cache_dir=TILE_CACHE_DIR, max_tiles=TILE_MEMORY_TILES):
+        self.cache_dir = cache_dir
+        self.max_tiles = max_tiles
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _path(self, version, z, x, y):
+        return os.path.join(self.cache_dir, version, str(z), str(x), f"{y}.mvt")
+
+    def _use_version(self, version):
+        """그래프 버전이 바뀌었으면 메모리 캐시를 비우고 다른 버전 디스크 타일 삭제"""
+        if version == self._version:
+            return
+        self._memory.clear()
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name != version:
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                    print(f"🗑️ 그래프 버전 변경으로 타일 캐시 삭제: {name}")
+        self._version = version
+
+    def use_version(self, version):
+        """현재 그래프 버전 지정 (타일을 미리 생성할 때 이전 버전 타일 정리용)"""
+        with self._lock:
+            self._use_version(version)
+
+    def _remember(self, key, tile):
+        self._memory[key] = tile
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_tiles:
+            self._memory.popitem(last=False)
+
+    def get(self, source, z, x, y):
+        """캐시된 타일 또는 새로 생성해서 저장한 타일 바이트"""
+        key = (z, x, y)
+        with self._lock:
+            self._use_version(source.version)
+            tile = self._memory.get(key)
+            if tile is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return tile
+        path = self._path(source.version, z, x, y)
+        try:
+            with open(path, 'rb') as f:
+                tile = f.read()
+            self.disk_hits += 1
+        except FileNotFoundError:
+            tile = source.render(z, x, y)
+            self.put(source.version, z, x, y, tile)
+            self.misses += 1
+        with self._lock:
+            self._remember(key, tile)
+        return tile
+
+    def put(self, version, z, x, y, tile):
+        path = self._path(version, z, x, y)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(tile)
+        os.replace(tmp_path, path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'version': self._version,
+                'memory_tiles': len(self._memory),
+                'memory_bytes': sum(len(tile) for tile in self._memory.values()),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+            }
+
+
+_tile_cache = None
+
+
+def get_tile_cache():
+    """프로세스 공유 TileCache"""
+    global _tile_cache
+    if _tile_cache is None:
+        _tile_cache = TileCache()
+    return _tile_cache
+
+
+def get_tile(z, x, y):
+    """
+    현재 그래프의 타일 (z, x, y)
+
+    Returns:
+        (tile 바이트, 그래프 버전)
+    """
+    source = get_tile_source()
+    return get_tile_cache().get(source, z, x, y), source.version
@@ -0,0 +1,94 @@
+import json
+import os
+import threading
+import folium
+from branca.element import MacroElement
+from jinja2 import Template
+
+# 디버그용 HTML 지도 공통: 보행 네트워크 전체(회색) 레이어를 그래프 버전당 한 번만 직렬화해서 재사용
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_LAYER_DIR = os.environ.get('SOOMGIL_MAP_CACHE_DIR', os.path.join(CURRENT_DIR, 'cache'))
+
+# HTML 지도 생성 여부 (기본 꺼짐, SOOMGIL_MAP_DEBUG=1 일 때만 map_*.html 등 생성)
+MAP_DEBUG = os.environ.get('SOOMGIL_MAP_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+# 좌표 소수점 자리 (1e-6도 ≈ 0.1m)
+COORD_DIGITS = 6
+
+
+def base_layer_path(version):
+    return os.path.join(BASE_LAYER_DIR, f"base_network_{version}.geojson")
+
+
+def render_base_network(wg):
+    """전체 엣지 geometry → MultiLineString 하나짜리 GeoJSON 문자열"""
+    coords = wg.edge_geom.round(COORD_DIGITS).tolist()
+    ptr = wg.edge_geom_ptr.tolist()
+    lines = [coords[ptr[e]:ptr[e + 1]] for e in range(wg.num_edges)]
+    geojson = {
+        'type': 'Feature',
+        'properties': {'graph_version': wg.version},
+        'geometry': {'type': 'MultiLineString', 'coordinates': lines},
+    }
+    return json.dumps(geojson, separators=(',', ':'))
+
+
+_base_layers = {}
+_base_layer_lock = threading.Lock()
+
+
+def get_base_network(wg):
+    """
+    그래프 버전별 네트워크 GeoJSON 문자열 (메모리 → 디스크 → 새로 생성 순)
+    """
+    with _base_layer_lock:
+        data = _base_layers.get(wg.version)
+        if data is not None:
+            return data
+        path = base_layer_path(wg.version)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = f.read()
+        else:
+            data = render_base_network(wg)
+            os.makedirs(BASE_LAYER_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            print(f"🗺️ 네트워크 기본 레이어 생성: {path} ({len(data) / 1024:.0f} KB)")
+        _base_layers[wg.version] = data
+        return data
+
+
+class BaseNetworkLayer(MacroElement):
+    """
+    미리 직렬화한 네트워크 GeoJSON 을 그대로 삽입하는 지도 레이어
+
+    엣지마다 folium.PolyLine 을 만드는 대신 L.geoJSON 하나로 그리므로
+    지도 생성 시 네트워크를 다시 직렬화하지 않음
+    """
+
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = L.geoJSON({{ this.data }}, {
+            style: {{ this.style }},
+            interactive: false
+        }).addTo({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, wg, color="gray", weight=1, opacity=0.3):
+        super().__init__()
+        self._name = 'BaseNetworkLayer'
+        self.data = get_base_network(wg)
+        self.style = json.dumps({'color': color, 'weight': weight, 'opacity': opacity})
+
+
+def debug_map(wg, location, zoom_start=14, base_network=True, **kwargs):
+    """디버그용 folium 지도 (canvas 렌더러 + 네트워크 기본 레이어)"""
+    m = folium.Map(location=location, zoom_start=zoom_start, prefer_canvas=True, **kwargs)
+    if base_network:
+        BaseNetworkLayer(wg).add_to(m)
+    return m
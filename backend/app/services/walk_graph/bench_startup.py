@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+그래프 로딩 시간 벤치마크: GeoJSON/CSV 원본 파싱 vs 서버 로딩 경로(load_walk_graph)
+
+각 방식을 새 프로세스에서 실행해서 콜드 스타트 시간을 측정합니다.
+load_walk_graph 는 서버와 같이 스냅샷 최신 여부 확인(snapshot_status) + mmap 로딩을 포함하고,
+'snapshot (mmap only)' 는 확인 없이 스냅샷만 여는 시간입니다.
+스냅샷이 없으면 먼저 compile_snapshot.py 를 실행하세요.
+
+사용법: python bench_startup.py [반복 횟수]
+"""
+
+import os
+import subprocess
+import sys
+import statistics
+from walk_graph import DATA_DIR, SNAPSHOT_DIRNAME, snapshot_status
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LOADERS = {
+    'geojson': "WalkGraph.from_source_files(DATA_DIR)",
+    'load_walk_graph': "load_walk_graph(DATA_DIR)",
+    'snapshot (mmap only)': "WalkGraph.from_snapshot(os.path.join(DATA_DIR, SNAPSHOT_DIRNAME))",
+}
+
+SCRIPT = """
+import os, time
+started = time.perf_counter()
+from walk_graph import DATA_DIR, SNAPSHOT_DIRNAME, WalkGraph, load_walk_graph
+imported = time.perf_counter()
+wg = {loader}
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def run_once(loader):
+    """새 인터프리터에서 그래프 로딩 (import 시간, 로딩 시간) 측정"""
+    output = subprocess.run(
+        [sys.executable, '-c', SCRIPT.format(loader=loader)],
+        cwd=CURRENT_DIR, capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    import_s, load_s = map(float, output.split())
+    return import_s, load_s
+
+
+def main(repeat=5):
+    status = snapshot_status(DATA_DIR)
+    if status != 'ok':
+        print(f"❌ 스냅샷 상태: {status} → compile_snapshot.py 를 먼저 실행하세요.")
+        return
+
+    print(f"📁 데이터: {os.path.abspath(DATA_DIR)}")
+    print(f"🔁 반복: {repeat}회 (프로세스별 콜드 스타트)")
+    print("=" * 60)
+    results = {}
+    for name, loader in LOADERS.items():
+        load_times = [run_once(loader)[1] for _ in range(repeat)]
+        results[name] = statistics.median(load_times)
+        print(f"{name:<20} median {results[name]*1000:8.1f} ms   min {min(load_times)*1000:8.1f} ms")
+    print("=" * 60)
+    base = results['geojson']
+    for name, value in results.items():
+        if name != 'geojson':
+            print(f"{name}: {base / value:.1f}x faster than geojson")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+보행 네트워크 바이너리 스냅샷 컴파일
+
+data/04_final_data 의 final_nodes.csv / final_edges.geojson 을 읽어서
+walk_graph_snapshot/ 에 .npy 배열 + manifest.json(내용 해시) 으로 저장합니다.
+원본 데이터가 바뀌면 다시 실행해야 합니다. (해시가 다르면 백엔드는 원본 데이터로 폴백)
+
+사용법: python compile_snapshot.py [data_dir]
+"""
+
+import os
+import sys
+import time
+from walk_graph import DATA_DIR, SNAPSHOT_DIRNAME, WalkGraph, source_stats
+
+
+def compile_snapshot(data_dir=DATA_DIR):
+    started = time.time()
+    # 파싱 전에 기록 (파싱 중 원본이 바뀌면 다음 시작 때 해시로 다시 확인)
+    sources = source_stats(data_dir)
+    wg = WalkGraph.from_source_files(data_dir)
+    snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIRNAME)
+    manifest = wg.save_snapshot(snapshot_dir, sources)
+    print(f"✅ 스냅샷 생성 완료: {snapshot_dir}")
+    print(f"   - 노드 {manifest['nodes']}개, 엣지 {manifest['edges']}개, 수목 {manifest['trees']}종")
+    print(f"   - 내용 해시: {manifest['content_hash']}")
+    print(f"   - 소요 시간: {time.time() - started:.2f}s")
+    return manifest
+
+
+if __name__ == '__main__':
+    compile_snapshot(sys.argv[1] if len(sys.argv) > 1 else DATA_DIR)
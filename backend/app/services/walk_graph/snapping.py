@@ -0,0 +1,77 @@
+import threading
+import numpy as np
+from scipy.spatial import cKDTree
+from walk_graph import get_walk_graph, add_load_hook
+
+# 위경도 좌표를 가장 가까운 보행 네트워크 노드로 스냅하는 프로세스 공유 인덱스
+
+EARTH_RADIUS_M = 6371008.8
+
+
+class NodeSnapper:
+    """
+    그래프 중심 기준 국지 평면 투영(미터)에서 만든 KD-tree
+
+    위경도 그대로 KD-tree 를 만들면 서울 위도에서 경도 1도가 위도 1도보다 짧아서
+    거리 비교가 왜곡되므로, 등장방형 투영으로 x/y 를 미터 단위로 맞춤
+    """
+
+    def __init__(self, wg):
+        self.version = wg.version
+        self.lat0 = float(np.mean(wg.lat))
+        self.lon0 = float(np.mean(wg.lon))
+        self._m_per_deg_lat = np.radians(1.0) * EARTH_RADIUS_M
+        self._m_per_deg_lon = self._m_per_deg_lat * np.cos(np.radians(self.lat0))
+        self.node_xy = self.project(np.column_stack((wg.lat, wg.lon)))
+        self.tree = cKDTree(self.node_xy)
+
+    def project(self, points):
+        """(lat, lon) 배열 (N, 2) → 국지 평면 (x, y) 미터 배열 (N, 2)"""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return np.column_stack((
+            (points[:, 1] - self.lon0) * self._m_per_deg_lon,
+            (points[:, 0] - self.lat0) * self._m_per_deg_lat,
+        ))
+
+    def unproject(self, xy):
+        """국지 평면 (x, y) 미터 배열 (N, 2) → (lat, lon) 배열 (N, 2)"""
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        return np.column_stack((
+            self.lat0 + xy[:, 1] / self._m_per_deg_lat,
+            self.lon0 + xy[:, 0] / self._m_per_deg_lon,
+        ))
+
+    def snap(self, points):
+        """
+        (lat, lon) 좌표들을 가장 가까운 노드로 스냅
+
+        Args:
+            points: (lat, lon) 하나 또는 (N, 2) 배열
+        Returns:
+            (노드 인덱스 배열 (N,), 거리 미터 배열 (N,))
+        """
+        distances, indices = self.tree.query(self.project(points), k=1)
+        return indices, distances
+
+    def snap_xy(self, xy):
+        """이미 투영된 (x, y) 미터 좌표들을 스냅"""
+        distances, indices = self.tree.query(np.asarray(xy, dtype=np.float64).reshape(-1, 2), k=1)
+        return indices, distances
+
+
+_snappers = {}
+_snapper_lock = threading.Lock()
+
+
+def get_snapper(wg=None):
+    """그래프 버전별 NodeSnapper (한 번만 생성)"""
+    wg = wg or get_walk_graph()
+    key = wg.version or id(wg)
+    with _snapper_lock:
+        if key not in _snappers:
+            _snappers[key] = NodeSnapper(wg)
+        return _snappers[key]
+
+
+# 공유 그래프 로딩 시 스냅 인덱스도 같이 생성
+add_load_hook(get_snapper)
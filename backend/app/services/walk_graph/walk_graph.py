@@ -0,0 +1,614 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+# 동대문구 보행 네트워크를 프로세스당 한 번만 로딩해서 모든 경로 탐색 코드가 공유하는 그래프 서비스
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get('SOOMGIL_DATA_DIR') or os.path.join(CURRENT_DIR, '..', '..', '..', '..', 'data', '04_final_data')
+
+# 엣지 유형 코드 (우선순위 순서, 해당 속성이 1인 첫 번째 유형을 사용)
+EDGE_TYPES = ('park', 'mountain', 'river', 'tree-line', 'road')
+EDGE_TYPE_CODES = {name: code for code, name in enumerate(EDGE_TYPES)}
+ROAD_TYPE = EDGE_TYPE_CODES['road']
+
+# 바이너리 스냅샷 (compile_snapshot.py 로 생성)
+SNAPSHOT_DIRNAME = 'walk_graph_snapshot'
+SNAPSHOT_FORMAT_VERSION = 2
+SOURCE_FILES = ('final_nodes.csv', 'final_edges.geojson')
+SNAPSHOT_ARRAYS = (
+    'osmids', 'lat', 'lon', 'edge_u', 'edge_v', 'edge_length', 'edge_type',
+    'edge_tree_ptr', 'edge_tree_ids', 'edge_geom_ptr', 'edge_geom',
+    'indptr', 'indices', 'arc_edge', 'cell_ptr',
+)
+
+# 공간 격자 셀 크기 (위도, 경도 도 단위, 약 280m x 220m)
+GRID_CELL_DEG = (0.0025, 0.0025)
+
+
+def _frozen(array):
+    """읽기 전용 배열로 변환"""
+    array = np.ascontiguousarray(array)
+    array.flags.writeable = False
+    return array
+
+
+def make_grid(lat, lon, cell_deg=GRID_CELL_DEG):
+    """노드 좌표를 덮는 균일 격자 정보"""
+    cell_lat, cell_lon = cell_deg
+    lat0 = float(np.floor(lat.min() / cell_lat) * cell_lat)
+    lon0 = float(np.floor(lon.min() / cell_lon) * cell_lon)
+    return {
+        'lat0': lat0, 'lon0': lon0, 'cell_lat': cell_lat, 'cell_lon': cell_lon,
+        'rows': int((lat.max() - lat0) // cell_lat) + 1,
+        'cols': int((lon.max() - lon0) // cell_lon) + 1,
+    }
+
+
+def grid_cells(grid, lat, lon):
+    """좌표 → 격자 셀 번호 (row * cols + col, 격자 밖이면 가장자리 셀로 고정)"""
+    rows = np.clip(((np.asarray(lat) - grid['lat0']) // grid['cell_lat']).astype(np.int64), 0, grid['rows'] - 1)
+    cols = np.clip(((np.asarray(lon) - grid['lon0']) // grid['cell_lon']).astype(np.int64), 0, grid['cols'] - 1)
+    return rows * grid['cols'] + cols
+
+
+class WalkGraph:
+    """
+    불변 보행 네트워크
+
+    - 노드: osmid → 0..N-1 정수 인덱스, 위경도 배열
+    - 엣지: 0..E-1 인덱스, 양 끝 노드/길이/유형 코드/수목/도로명/geometry 컬럼
+    - 인접: 양방향 arc 기준 CSR (indptr, indices, arc_edge)
+    - 공간 격자: 노드 인덱스가 격자 셀 순서로 정렬되어 있어서
+      셀 c 의 노드는 cell_ptr[c]..cell_ptr[c+1] 연속 범위
+    """
+
+    def __init__(self, osmids, lat, lon, edge_u, edge_v, edge_length, edge_type,
+                 edge_tree_ptr, edge_tree_ids, tree_names, edge_road_names,
+                 edge_geom_ptr, edge_geom, version=None, csr=None, grid=None, cell_ptr=None):
+        self.osmids = _frozen(np.asarray(osmids, dtype=np.int64))
+        self.lat = _frozen(np.asarray(lat, dtype=np.float64))
+        self.lon = _frozen(np.asarray(lon, dtype=np.float64))
+        self.edge_u = _frozen(np.asarray(edge_u, dtype=np.int32))
+        self.edge_v = _frozen(np.asarray(edge_v, dtype=np.int32))
+        self.edge_length = _frozen(np.asarray(edge_length, dtype=np.float64))
+        self.edge_type = _frozen(np.asarray(edge_type, dtype=np.uint8))
+        self.edge_tree_ptr = _frozen(np.asarray(edge_tree_ptr, dtype=np.int32))
+        self.edge_tree_ids = _frozen(np.asarray(edge_tree_ids, dtype=np.int32))
+        self.tree_names = tuple(tree_names)
+        self.edge_road_names = tuple(edge_road_names)
+        self.edge_geom_ptr = _frozen(np.asarray(edge_geom_ptr, dtype=np.int32))
+        self.edge_geom = _frozen(np.asarray(edge_geom, dtype=np.float64).reshape(-1, 2))
+
+        self.num_nodes = len(self.osmids)
+        self.num_edges = len(self.edge_u)
+        self.version = version
+        self._index = {int(osmid): i for i, osmid in enumerate(self.osmids.tolist())}
+        if csr is None:
+            self._build_csr()
+        else:
+            self.indptr, self.indices, self.arc_edge = (_frozen(a) for a in csr)
+        if cell_ptr is None:
+            self._build_grid(grid or make_grid(self.lat, self.lon))
+        else:
+            self.grid = grid
+            self.cell_ptr = _frozen(cell_ptr)
+        self._nx_graph = None
+        self._nx_lock = threading.Lock()
+
+    def _build_csr(self):
+        """양방향 arc를 출발 노드 기준으로 정렬해서 CSR 인접 배열 생성"""
+        src = np.concatenate([self.edge_u, self.edge_v])
+        dst = np.concatenate([self.edge_v, self.edge_u])
+        arc_edge = np.concatenate([np.arange(self.num_edges), np.arange(self.num_edges)])
+        order = np.argsort(src, kind='stable')
+        counts = np.bincount(src, minlength=self.num_nodes)
+        indptr = np.zeros(self.num_nodes + 1, dtype=np.int32)
+        np.cumsum(counts, out=indptr[1:])
+        self.indptr = _frozen(indptr)
+        self.indices = _frozen(dst[order].astype(np.int32))
+        self.arc_edge = _frozen(arc_edge[order].astype(np.int32))
+
+    def _build_grid(self, grid):
+        """격자 셀별 노드 범위 (cell_ptr) 생성, 노드는 셀 순서로 정렬되어 있어야 함"""
+        cells = grid_cells(grid, self.lat, self.lon)
+        if np.any(np.diff(cells) < 0):
+            raise ValueError("노드가 격자 셀 순서로 정렬되어 있지 않습니다.")
+        cell_ptr = np.zeros(grid['rows'] * grid['cols'] + 1, dtype=np.int32)
+        np.cumsum(np.bincount(cells, minlength=grid['rows'] * grid['cols']), out=cell_ptr[1:])
+        self.grid = grid
+        self.cell_ptr = _frozen(cell_ptr)
+
+    @classmethod
+    def from_source_files(cls, data_dir=DATA_DIR):
+        """final_nodes.csv / final_edges.geojson 에서 그래프 생성"""
+        nodes_df = pd.read_csv(os.path.join(data_dir, 'final_nodes.csv'))
+        with open(os.path.join(data_dir, 'final_edges.geojson'), encoding='utf-8') as f:
+            edges_geo = json.load(f)
+
+        # 노드 인덱스를 격자 셀 순서로 부여 (창 영역 노드가 연속된 인덱스 범위가 되도록)
+        grid = make_grid(nodes_df['lat'].to_numpy(), nodes_df['lon'].to_numpy())
+        order = np.argsort(grid_cells(grid, nodes_df['lat'], nodes_df['lon']), kind='stable')
+        nodes_df = nodes_df.iloc[order].reset_index(drop=True)
+
+        osmids = nodes_df['osmid'].to_numpy(dtype=np.int64)
+        index = {int(osmid): i for i, osmid in enumerate(osmids)}
+
+        # 같은 노드 쌍의 엣지가 여러 개면 nx.Graph 처럼 마지막 엣지 속성 사용
+        edge_slots = {}
+        edges = []
+        skipped = 0
+        for feature in edges_geo['features']:
+            props = feature['properties']
+            u, v = index.get(props['u']), index.get(props['v'])
+            if u is None or v is None:
+                skipped += 1
+                continue
+            if u == v:
+                continue
+            edge_type = next((k for k in EDGE_TYPES if props.get(k, 0) == 1), 'road')
+            coords = (feature.get('geometry') or {}).get('coordinates') or [
+                [nodes_df['lon'].iat[u], nodes_df['lat'].iat[u]],
+                [nodes_df['lon'].iat[v], nodes_df['lat'].iat[v]],
+            ]
+            edge = (u, v, props.get('length', 1), EDGE_TYPE_CODES[edge_type],
+                    (props.get('tree') or '').split(), props.get('name') or '', coords)
+            key = (min(u, v), max(u, v))
+            if key in edge_slots:
+                edges[edge_slots[key]] = edge
+            else:
+                edge_slots[key] = len(edges)
+                edges.append(edge)
+        if skipped:
+            print(f"⚠️ 노드 테이블에 없는 엣지 {skipped}개 제외")
+
+        # 수목명 인턴 (문자열 → 정수 ID)
+        tree_ids = {}
+        edge_tree_ptr = [0]
+        edge_tree_ids = []
+        edge_geom_ptr = [0]
+        edge_geom = []
+        for edge in edges:
+            for name in edge[4]:
+                edge_tree_ids.append(tree_ids.setdefault(name, len(tree_ids)))
+            edge_tree_ptr.append(len(edge_tree_ids))
+            edge_geom.extend(edge[6])
+            edge_geom_ptr.append(len(edge_geom))
+
+        return cls(
+            osmids=osmids,
+            lat=nodes_df['lat'].to_numpy(dtype=np.float64),
+            lon=nodes_df['lon'].to_numpy(dtype=np.float64),
+            edge_u=[e[0] for e in edges],
+            edge_v=[e[1] for e in edges],
+            edge_length=[e[2] for e in edges],
+            edge_type=[e[3] for e in edges],
+            edge_tree_ptr=edge_tree_ptr,
+            edge_tree_ids=edge_tree_ids,
+            tree_names=sorted(tree_ids, key=tree_ids.get),
+            edge_road_names=[e[5] for e in edges],
+            edge_geom_ptr=edge_geom_ptr,
+            edge_geom=edge_geom,
+            version=source_content_hash(data_dir),
+            grid=grid,
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot_dir, mmap=True):
+        """
+        바이너리 스냅샷에서 그래프 로딩
+
+        mmap=True 이면 .npy 배열을 읽기 전용 memory-map 으로 열어서
+        fork 된 워커 프로세스들이 같은 페이지를 공유함
+        """
+        with open(os.path.join(snapshot_dir, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 버전: {manifest.get('format_version')}")
+        with open(os.path.join(snapshot_dir, 'strings.json'), encoding='utf-8') as f:
+            strings = json.load(f)
+
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(snapshot_dir, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in SNAPSHOT_ARRAYS}
+        csr = (arrays.pop('indptr'), arrays.pop('indices'), arrays.pop('arc_edge'))
+        return cls(
+            tree_names=strings['tree_names'],
+            edge_road_names=strings['edge_road_names'],
+            version=manifest['content_hash'],
+            csr=csr,
+            grid=manifest['grid'],
+            **arrays
+        )
+
+    def save_snapshot(self, snapshot_dir, sources=None):
+        """
+        그래프를 버전이 붙은 바이너리 스냅샷(.npy + manifest.json)으로 저장
+
+        sources: 원본 파일 크기/mtime (source_stats), 시작 시 스냅샷 최신 여부를 해시 없이 확인하는 데 사용
+        """
+        os.makedirs(snapshot_dir, exist_ok=True)
+        for name in SNAPSHOT_ARRAYS:
+            np.save(os.path.join(snapshot_dir, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(snapshot_dir, 'strings.json'), 'w', encoding='utf-8') as f:
+            json.dump({'tree_names': list(self.tree_names), 'edge_road_names': list(self.edge_road_names)},
+                      f, ensure_ascii=False)
+        # manifest 는 마지막에 저장 (중간에 실패하면 스냅샷으로 인식되지 않음)
+        manifest = {
+            'format_version': SNAPSHOT_FORMAT_VERSION,
+            'content_hash': self.version,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'grid': self.grid,
+            'sources': sources,
+            **self.summary()
+        }
+        with open(os.path.join(snapshot_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        return manifest
+
+    # ---- 노드 / 엣지 조회 ----
+
+    def node_index(self, osmid):
+        """osmid → 정수 노드 인덱스"""
+        return self._index[int(osmid)]
+
+    def node_pos(self, i):
+        """정수 노드 인덱스 → (lat, lon)"""
+        return float(self.lat[i]), float(self.lon[i])
+
+    def edge_between(self, i, j):
+        """두 노드를 잇는 엣지 인덱스 (없으면 None)"""
+        start, end = self.indptr[i], self.indptr[i + 1]
+        hits = np.nonzero(self.indices[start:end] == j)[0]
+        if len(hits) == 0:
+            return None
+        return int(self.arc_edge[start + hits[0]])
+
+    def path_edges(self, path):
+        """노드 인덱스 경로 → 엣지 인덱스 리스트"""
+        return [self.edge_between(a, b) for a, b in zip(path, path[1:])]
+
+    def edge_type_name(self, e):
+        return EDGE_TYPES[self.edge_type[e]]
+
+    def edge_trees(self, e):
+        """엣지에 있는 수목명 리스트"""
+        ids = self.edge_tree_ids[self.edge_tree_ptr[e]:self.edge_tree_ptr[e + 1]]
+        return [self.tree_names[t] for t in ids]
+
+    def edge_coords(self, e):
+        """엣지 geometry 좌표 [(lon, lat), ...]"""
+        return self.edge_geom[self.edge_geom_ptr[e]:self.edge_geom_ptr[e + 1]]
+
+    def tree_ids_for(self, names):
+        """수목명 집합 → 그래프에 존재하는 수목 ID 배열"""
+        lookup = {name: i for i, name in enumerate(self.tree_names)}
+        return np.array(sorted(lookup[name] for name in names if name in lookup), dtype=np.int32)
+
+    def edges_with_trees(self, tree_ids):
+        """주어진 수목 ID 중 하나라도 있는 엣지 마스크 (E,)"""
+        has_tree = np.isin(self.edge_tree_ids, tree_ids)
+        tree_edge = np.repeat(np.arange(self.num_edges), np.diff(self.edge_tree_ptr))
+        mask = np.zeros(self.num_edges, dtype=bool)
+        mask[tree_edge[has_tree]] = True
+        return mask
+
+    def path_length(self, path):
+        """노드 인덱스 경로의 길이 (m)"""
+        return float(sum(self.edge_length[e] for e in self.path_edges(path)))
+
+    def path_latlon(self, path):
+        """노드 인덱스 경로 → [(lat, lon), ...]"""
+        return [self.node_pos(i) for i in path]
+
+    def path_osmids(self, path):
+        return [int(self.osmids[i]) for i in path]
+
+    # ---- 공간 질의 ----
+
+    def window_ranges(self, min_lat, max_lat, min_lon, max_lon):
+        """
+        위경도 창과 겹치는 격자 셀들의 노드 인덱스 범위 [(start, end), ...]
+
+        격자 행마다 창에 걸치는 셀들이 연속이므로 범위는 최대 행 개수만큼
+        (가장자리 셀에는 창 밖 노드도 섞여 있음)
+        """
+        grid = self.grid
+        row_lo, row_hi = (np.clip(((np.array([min_lat, max_lat]) - grid['lat0']) // grid['cell_lat']).astype(int),
+                                  0, grid['rows'] - 1))
+        col_lo, col_hi = (np.clip(((np.array([min_lon, max_lon]) - grid['lon0']) // grid['cell_lon']).astype(int),
+                                  0, grid['cols'] - 1))
+        if max_lat < grid['lat0'] or max_lon < grid['lon0'] or min_lat > grid['lat0'] + grid['rows'] * grid['cell_lat'] \
+                or min_lon > grid['lon0'] + grid['cols'] * grid['cell_lon']:
+            return []
+        ranges = []
+        for row in range(row_lo, row_hi + 1):
+            start = int(self.cell_ptr[row * grid['cols'] + col_lo])
+            end = int(self.cell_ptr[row * grid['cols'] + col_hi + 1])
+            if start == end:
+                continue
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def window_view(self, min_lat, max_lat, min_lon, max_lon):
+        """위경도 창 안 노드/엣지만 사용하는 마스크 뷰 (GraphView)"""
+        return GraphView(self, self.window_ranges(min_lat, max_lat, min_lon, max_lon),
+                         (min_lat, max_lat, min_lon, max_lon))
+
+    # ---- 최단 경로 ----
+
+    def arc_sources(self):
+        """arc 별 출발 노드 인덱스 (CSR arc 순서, indices 가 도착 노드)"""
+        return np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr))
+
+    def arc_matrix(self, arc_weights):
+        """arc 가중치 (2E,, CSR arc 순서) → 방향별 가중치 scipy CSR 인접 행렬 (N, N)"""
+        return csr_matrix((np.asarray(arc_weights, dtype=np.float64), self.indices, self.indptr),
+                          shape=(self.num_nodes, self.num_nodes))
+
+    def matrix(self, edge_weights):
+        """엣지 가중치 (E,) → scipy CSR 인접 행렬 (N, N)"""
+        return self.arc_matrix(np.asarray(edge_weights, dtype=np.float64)[self.arc_edge])
+
+    def shortest_path(self, source, target, edge_weights):
+        """edge_weights 기준 source → target 최단 경로 (노드 인덱스 리스트, 없으면 None)"""
+        _, predecessors = dijkstra(self.matrix(edge_weights), indices=source, return_predecessors=True)
+        return reconstruct_path(predecessors, source, target)
+
+    def arc_shortest_path(self, source, target, arc_weights):
+        """방향별 arc 가중치 기준 source → target 최단 경로 (노드 인덱스 리스트, 없으면 None)"""
+        _, predecessors = dijkstra(self.arc_matrix(arc_weights), indices=source, return_predecessors=True)
+        return reconstruct_path(predecessors, source, target)
+
+    # ---- 호환용 ----
+
+    def nodes_frame(self):
+        """osmid, lat, lon 컬럼의 노드 DataFrame"""
+        return pd.DataFrame({'osmid': self.osmids, 'lat': self.lat, 'lon': self.lon})
+
+    def to_networkx(self):
+        """읽기 전용 nx.Graph (노드 x=lon, y=lat / 엣지 length, weight, type, tree, road_name), 한 번만 생성"""
+        with self._nx_lock:
+            if self._nx_graph is None:
+                import networkx as nx
+                G = nx.Graph()
+                for i in range(self.num_nodes):
+                    G.add_node(int(self.osmids[i]), x=float(self.lon[i]), y=float(self.lat[i]))
+                for e in range(self.num_edges):
+                    G.add_edge(
+                        int(self.osmids[self.edge_u[e]]), int(self.osmids[self.edge_v[e]]),
+                        length=float(self.edge_length[e]), weight=float(self.edge_length[e]),
+                        type=self.edge_type_name(e), tree=self.edge_trees(e),
+                        road_name=self.edge_road_names[e]
+                    )
+                self._nx_graph = nx.freeze(G)
+        return self._nx_graph
+
+    def summary(self):
+        return {'nodes': self.num_nodes, 'edges': self.num_edges, 'trees': len(self.tree_names), 'version': self.version}
+
+
+class GraphView:
+    """
+    공유 WalkGraph 의 창 영역 마스크 뷰
+
+    창 안 노드(연속 인덱스 범위들)와 그 노드끼리 잇는 엣지만 사용하는 로컬 CSR 을
+    공유 배열 슬라이스로 만들어서 최단 경로 탐색에 사용 (속성 복사 없음)
+    로컬 노드 번호는 범위를 이어 붙인 순서
+    """
+
+    def __init__(self, wg, ranges, bbox):
+        self.wg = wg
+        self.ranges = np.array(ranges, dtype=np.int64).reshape(-1, 2)
+        self._offsets = np.concatenate(([0], np.cumsum(self.ranges[:, 1] - self.ranges[:, 0])))
+        self.nodes = np.concatenate([np.arange(a, b) for a, b in self.ranges]) if len(self.ranges) else \
+            np.zeros(0, dtype=np.int64)
+        self.num_nodes = len(self.nodes)
+
+        # 가장자리 셀의 창 밖 노드 제외
+        min_lat, max_lat, min_lon, max_lon = bbox
+        lat, lon = wg.lat[self.nodes], wg.lon[self.nodes]
+        self.node_inside = (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+
+        # 범위별 arc 는 공유 CSR 에서 연속 구간
+        arc_pos = np.concatenate([np.arange(wg.indptr[a], wg.indptr[b]) for a, b in self.ranges]) \
+            if len(self.ranges) else np.zeros(0, dtype=np.int64)
+        degree = wg.indptr[self.nodes + 1] - wg.indptr[self.nodes]
+        self.indptr = np.concatenate(([0], np.cumsum(degree))).astype(np.int32)
+        self.arc_pos = arc_pos
+        self.arc_edge = wg.arc_edge[arc_pos]
+        targets = self.local(wg.indices[arc_pos])
+        sources = np.repeat(np.arange(self.num_nodes), degree)
+        self.arc_valid = (targets >= 0) & self.node_inside[sources] & self.node_inside[np.maximum(targets, 0)]
+        # 창 밖으로 나가는 arc 는 자기 자신을 가리키는 inf 가중치 arc 로 둠
+        self.indices = np.where(self.arc_valid, targets, sources).astype(np.int32)
+        # 양 끝 노드가 모두 창 안에 있는 엣지
+        self.edges = np.unique(self.arc_edge[self.arc_valid])
+
+    def local(self, nodes):
+        """전역 노드 인덱스 → 로컬 인덱스 (뷰 밖이면 -1)"""
+        nodes = np.asarray(nodes, dtype=np.int64)
+        if len(self.ranges) == 0:
+            return np.full(nodes.shape, -1, dtype=np.int64)
+        pos = np.searchsorted(self.ranges[:, 0], nodes, side='right') - 1
+        safe = np.maximum(pos, 0)
+        inside = (pos >= 0) & (nodes < self.ranges[safe, 1])
+        return np.where(inside, self._offsets[safe] + nodes - self.ranges[safe, 0], -1)
+
+    def contains(self, node):
+        local = int(self.local([node])[0])
+        return local >= 0 and bool(self.node_inside[local])
+
+    def matrix(self, edge_weights):
+        """엣지 가중치 (E,) → 로컬 CSR 인접 행렬 (창 밖 arc 는 inf)"""
+        return self.arc_matrix(np.asarray(edge_weights, dtype=np.float64)[self.arc_edge])
+
+    def arc_matrix(self, arc_weights):
+        """로컬 arc 가중치 (arc_pos 순서) → 방향별 가중치 로컬 CSR 인접 행렬 (창 밖 arc 는 inf)"""
+        arc_weights = np.where(self.arc_valid, np.asarray(arc_weights, dtype=np.float64), np.inf)
+        return csr_matrix((arc_weights, self.indices, self.indptr), shape=(self.num_nodes, self.num_nodes))
+
+    def distances(self, source, edge_weights, limit=np.inf):
+        """전역 source 에서 뷰 안 노드까지 최단 거리 (로컬 인덱스 순서 배열)"""
+        return dijkstra(self.matrix(edge_weights), indices=int(self.local([source])[0]), limit=limit)
+
+    def shortest_path(self, source, target, edge_weights):
+        """뷰 안에서 전역 source → target 최단 경로 (전역 노드 인덱스 리스트, 없으면 None)"""
+        return self._shortest_path(self.matrix(edge_weights), source, target)
+
+    def arc_shortest_path(self, source, target, arc_weights):
+        """뷰 안에서 방향별 로컬 arc 가중치 기준 최단 경로 (전역 노드 인덱스 리스트, 없으면 None)"""
+        return self._shortest_path(self.arc_matrix(arc_weights), source, target)
+
+    def _shortest_path(self, matrix, source, target):
+        local_source, local_target = (int(i) for i in self.local([source, target]))
+        if local_source < 0 or local_target < 0:
+            return None
+        _, predecessors = dijkstra(matrix, indices=local_source, return_predecessors=True)
+        path = reconstruct_path(predecessors, local_source, local_target)
+        return [int(self.nodes[i]) for i in path] if path else None
+
+
+def source_content_hash(data_dir=DATA_DIR):
+    """원본 데이터 파일(final_nodes.csv, final_edges.geojson) 내용 해시 = 그래프 버전"""
+    digest = hashlib.sha256()
+    for name in SOURCE_FILES:
+        digest.update(name.encode('utf-8'))
+        with open(os.path.join(data_dir, name), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def source_stats(data_dir=DATA_DIR):
+    """원본 데이터 파일 {이름: {size, mtime_ns}} (스냅샷 manifest 에 기록해서 시작 시 해시 대신 비교)"""
+    stats = {}
+    for name in SOURCE_FILES:
+        stat = os.stat(os.path.join(data_dir, name))
+        stats[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    return stats
+
+
+def _update_manifest_sources(manifest_path, manifest, sources):
+    """내용은 같고 mtime 만 바뀐 경우(git checkout, 복사 등) manifest 의 원본 파일 정보 갱신"""
+    try:
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({**manifest, 'sources': sources}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        # 읽기 전용 배포 환경이면 다음 시작 때 다시 해시
+        pass
+
+
+def snapshot_status(data_dir=DATA_DIR):
+    """
+    스냅샷 사용 가능 여부 ('missing' / 'stale' / 'ok')
+
+    원본 파일 크기/mtime 이 manifest 에 기록된 값과 같으면 그대로 사용하고,
+    다를 때만 내용 해시를 계산해서 비교 (매 시작마다 GeoJSON 전체를 해시하지 않음)
+    """
+    snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIRNAME)
+    manifest_path = os.path.join(snapshot_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return 'missing'
+    # 원본 파일이 있으면 같은 내용인지 확인 (원본 없이 스냅샷만 배포한 경우는 그대로 사용)
+    if all(os.path.exists(os.path.join(data_dir, name)) for name in SOURCE_FILES):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        sources = source_stats(data_dir)
+        if manifest.get('sources') != sources:
+            if manifest.get('content_hash') != source_content_hash(data_dir):
+                return 'stale'
+            _update_manifest_sources(manifest_path, manifest, sources)
+    return 'ok'
+
+
+def load_walk_graph(data_dir=DATA_DIR):
+    """스냅샷이 있으면 mmap 으로, 없으면 GeoJSON/CSV 원본에서 그래프 로딩"""
+    status = snapshot_status(data_dir)
+    if status == 'ok':
+        try:
+            return WalkGraph.from_snapshot(os.path.join(data_dir, SNAPSHOT_DIRNAME))
+        except Exception as e:
+            print(f"⚠️ 스냅샷 로딩 실패, 원본 데이터 사용: {e}")
+    elif status == 'stale':
+        print("⚠️ 스냅샷이 원본 데이터와 다름, 원본 데이터 사용 (compile_snapshot.py 를 다시 실행하세요)")
+    return WalkGraph.from_source_files(data_dir)
+
+
+def reconstruct_path(predecessors, source, target):
+    """dijkstra predecessor 배열 → source부터 target까지 노드 인덱스 리스트"""
+    if source == target:
+        return [int(source)]
+    if predecessors[target] < 0:
+        return None
+    path = [int(target)]
+    while path[-1] != source:
+        path.append(int(predecessors[path[-1]]))
+    return path[::-1]
+
+
+# ---- 프로세스 공유 인스턴스 ----
+
+_walk_graph = None
+_load_lock = threading.Lock()
+_load_error = None
+_load_hooks = []
+
+
+def add_load_hook(hook):
+    """그래프 로딩 직후 호출할 함수 등록 (그래프별 사전 계산용, 이미 로딩됐으면 바로 호출)"""
+    with _load_lock:
+        _load_hooks.append(hook)
+        if _walk_graph is not None:
+            hook(_walk_graph)
+
+
+def get_walk_graph():
+    """프로세스 공유 WalkGraph (처음 호출 시 한 번만 로딩)"""
+    global _walk_graph, _load_error
+    if _walk_graph is None:
+        with _load_lock:
+            if _walk_graph is None:
+                started = time.time()
+                try:
+                    wg = load_walk_graph(DATA_DIR)
+                    for hook in _load_hooks:
+                        hook(wg)
+                except Exception as e:
+                    _load_error = str(e)
+                    raise
+                _walk_graph = wg
+                _load_error = None
+                print(f"✅ 보행 네트워크 로딩 완료: {_walk_graph.summary()} ({time.time() - started:.2f}s)")
+    return _walk_graph
+
+
+def start_warm_up():
+    """앱 시작 시 백그라운드 스레드에서 그래프 로딩"""
+    def _warm_up():
+        try:
+            get_walk_graph()
+        except Exception as e:
+            print(f"❌ 보행 네트워크 로딩 실패: {e}")
+
+    thread = threading.Thread(target=_warm_up, name='walk-graph-warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness():
+    """readiness probe 용 상태"""
+    if _walk_graph is not None:
+        return {'ready': True, 'graph': _walk_graph.summary()}
+    return {'ready': False, 'error': _load_error}
@@ -1,17 +1,18 @@
 import { useRef, useState, useEffect } from 'react'
 
-export default function AudioPlayer({ mood }) {
+export default function AudioPlayer({ mood, minutes }) {
   const audioRef = useRef(null)
   const [playing, setPlaying] = useState(false)
   const [audioSrc, setAudioSrc] = useState('')
 
   useEffect(() => {
     if (mood) {
-      // 무드에 따른 음악 파일 URL 생성
-      const musicUrl = `http://localhost:5001/api/music/${encodeURIComponent(mood)}`
+      // 무드에 따른 음악 파일 URL 생성 (산책 시간이 있으면 그 길이만큼 이어 붙인 음악)
+      const query = minutes ? `?minutes=${encodeURIComponent(minutes)}` : ''
+      const musicUrl = `http://localhost:5001/api/music/${encodeURIComponent(mood)}${query}`
       setAudioSrc(musicUrl)
     }
-  }, [mood])
+  }, [mood, minutes])
 
   function toggle() {
     const a = audioRef.current
@@ -1,5 +1,6 @@
 import React, { useEffect, useMemo, useRef, useState } from "react";
 import { useLocation, useNavigate } from "react-router-dom";
+import { uploadStrokes } from "../services/api";
 
 export default function CustomLoadingPage() {
   const location = useLocation();
@@ -9,22 +10,15 @@ export default function CustomLoadingPage() {
 
   // 업로드 로직 (중복 호출 방지)
   useEffect(() => {
-    if (!location.state?.drawingBlob || isUploading || uploadRef.current) return;
+    if (!location.state?.strokes || isUploading || uploadRef.current) return;
 
     uploadRef.current = true;
 
     setIsUploading(true);
     console.log("🚀 API 호출 시작");
-    console.log("📁 Blob 크기:", location.state.drawingBlob.size, "bytes");
+    console.log("✏️ 획 개수:", location.state.strokes.length);
 
-    const formData = new FormData();
-    formData.append("file", location.state.drawingBlob, "drawing.png");
-
-    fetch("http://localhost:5001/api/upload", {
-      method: "POST",
-      body: formData,
-    })
-      .then((res) => res.json())
+    uploadStrokes(location.state.strokes)
       .then((data) => {
         console.log("✅ API 응답 받음");
         console.log("📊 API 응답 데이터:", data);
@@ -40,7 +34,7 @@ export default function CustomLoadingPage() {
         setIsUploading(false);
         uploadRef.current = false;
       });
-  }, [location.state?.drawingBlob]); // nav 제거, drawingBlob만 의존
+  }, [location.state?.strokes]); // nav 제거, strokes만 의존
 
   // 렌더링할 이미지들
   const SPRITES = useMemo(
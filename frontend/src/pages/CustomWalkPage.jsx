@@ -4,6 +4,8 @@ import { useNavigate } from "react-router-dom";
 export default function CustomWalkPage() {
   const canvasRef = useRef(null);
   const [drawing, setDrawing] = useState(false);
+  // 그린 획 좌표 (캔버스 픽셀 기준 [[x, y], ...] 목록) - 이미지 대신 서버로 전송
+  const strokesRef = useRef([]);
   const nav = useNavigate();
 
   useEffect(() => {
@@ -27,7 +29,10 @@ export default function CustomWalkPage() {
     ctx.strokeStyle = "black";
   }, []);
 
-  const startDrawing = () => setDrawing(true);
+  const startDrawing = () => {
+    strokesRef.current.push([]);
+    setDrawing(true);
+  };
   const stopDrawing = () => {
     setDrawing(false);
     const ctx = canvasRef.current.getContext("2d");
@@ -43,6 +48,7 @@ export default function CustomWalkPage() {
     // 마우스 좌표를 캔버스 좌표로 변환 (CSS 크기 기준)
     const x = e.clientX - rect.left;
     const y = e.clientY - rect.top;
+    strokesRef.current[strokesRef.current.length - 1].push([x, y]);
 
     ctx.lineWidth = 2;
     ctx.lineCap = "round";
@@ -55,11 +61,14 @@ export default function CustomWalkPage() {
 
 
   const handleNext = () => {
-    const canvas = canvasRef.current;
-    canvas.toBlob((blob) => {
-      console.log("🎨 캔버스 Blob 생성:", blob.size, "bytes");
-      nav("/custom-loading", { state: { drawingBlob: blob } });
-    }, "image/png", 1.0);
+    const strokes = strokesRef.current.filter((stroke) => stroke.length > 0);
+    const points = strokes.reduce((count, stroke) => count + stroke.length, 0);
+    if (points < 3) {
+      alert("산책로 모양을 그려주세요.");
+      return;
+    }
+    console.log("🎨 획 좌표:", strokes.length, "개 획,", points, "개 점");
+    nav("/custom-loading", { state: { strokes } });
   };
 
   return (
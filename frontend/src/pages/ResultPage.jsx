@@ -169,7 +169,7 @@ const makeSummary = (txt, max = 110) =>
         <div style={{ marginTop: 20 }}>
           <h2 style={styles.subtitle}>🎵 추천 음악</h2>
           <div style={{ marginTop: 20, marginBottom: 40 }}>
-            <AudioPlayer mood={mood} />
+            <AudioPlayer mood={mood} minutes={duration} />
           </div>
         </div>
       </div>
@@ -130,3 +130,15 @@ export async function generateDurationRoute(startLat, startLon, userPreference)
     })
   });
 }
+
+// 커스텀 경로 생성 API (캔버스 획 좌표)
+export async function uploadStrokes(strokes, targetLen = 5000, name = "drawing") {
+  return apiCall('/upload-strokes', {
+    method: 'POST',
+    body: JSON.stringify({
+      strokes: strokes,
+      target_len: targetLen,
+      name: name
+    })
+  });
+}